@@ -1,27 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
-from app.controllers.flight import FlightController
+from app.controllers.flight import LEADERBOARD_TABLES, FlightController
 from app.schemas.responses.countries import CountryDetailResponse, CountryStatsResponse
 from core.factory import Factory
+from core.fastapi.dependencies import Validators, conditional_get
+from core.geo import COUNTRY_NAMES, normalize_country_code
 
-countries_router = APIRouter(prefix="/countries", tags=["Countries"])
+country_validators = conditional_get(
+    *LEADERBOARD_TABLES, max_age=60, stale_while_revalidate=600
+)
+countries_router = APIRouter(
+    prefix="/countries",
+    tags=["Countries"],
+    dependencies=[Depends(country_validators)],
+)
 
-# Minimal static metadata – extend as needed.
-COUNTRY_NAMES: dict[str, str] = {
-    "GR": "Greece",
-    "US": "United States",
-    "DE": "Germany",
-}
 
-COUNTRY_FLAGS: dict[str, str] = {
-    "GR": "https://flagcdn.com/gr.svg",
-    "US": "https://flagcdn.com/us.svg",
-    "DE": "https://flagcdn.com/de.svg",
-}
+def _flag_url(code: str) -> str | None:
+    return f"https://flagcdn.com/{code.lower()}.svg" if code in COUNTRY_NAMES else None
 
 
 def _enrich_country_row(row: dict) -> CountryStatsResponse:
@@ -29,7 +30,7 @@ def _enrich_country_row(row: dict) -> CountryStatsResponse:
     return CountryStatsResponse(
         code=code,
         name=COUNTRY_NAMES.get(code),
-        flag_url=COUNTRY_FLAGS.get(code),
+        flag_url=_flag_url(code),
         total_flights=row.get("flights_count", 0),
         total_pilots=row.get("unique_pilots", 0),
         total_credits=row.get("total_credits", 0),
@@ -42,6 +43,8 @@ def _enrich_country_row(row: dict) -> CountryStatsResponse:
     response_model=list[CountryStatsResponse],
 )
 async def list_countries(
+    request: Request,
+    response: Response,
     metric: str = Query(
         "flights",
         pattern="^(flights|credits|views)$",
@@ -49,6 +52,7 @@ async def list_countries(
     period_start: date | None = Query(None),
     period_end: date | None = Query(None),
     limit: int = Query(200, ge=1, le=300),
+    validators: Validators = Depends(country_validators),
     flight_controller: FlightController = Depends(Factory().get_flight_controller),
 ) -> list[CountryStatsResponse]:
     metric = flight_controller.validate_metric(metric)
@@ -63,10 +67,15 @@ async def list_countries(
         else datetime.combine(period_end, datetime.min.time())
     )
 
-    rows = await flight_controller.flight_repository.top_countries(
-        metric=metric, start=start_dt, end=end_dt, limit=limit
+    ranking = await flight_controller.top_countries(
+        metric=metric,
+        start=start_dt,
+        end=end_dt,
+        limit=limit,
+        versions=validators.versions,
     )
-    return [_enrich_country_row(row) for row in rows]
+    validators.retag(request, response, ranking.version)
+    return [_enrich_country_row(row) for row in ranking.value]
 
 
 @countries_router.get(
@@ -74,6 +83,8 @@ async def list_countries(
     response_model=CountryDetailResponse,
 )
 async def get_country_details(
+    request: Request,
+    response: Response,
     country_code: str,
     metric: str = Query(
         "flights",
@@ -81,6 +92,7 @@ async def get_country_details(
     ),
     period_start: date | None = Query(None),
     period_end: date | None = Query(None),
+    validators: Validators = Depends(country_validators),
     flight_controller: FlightController = Depends(Factory().get_flight_controller),
 ) -> CountryDetailResponse:
     metric = flight_controller.validate_metric(metric)
@@ -95,39 +107,35 @@ async def get_country_details(
         else datetime.combine(period_end, datetime.min.time())
     )
 
-    rows = await flight_controller.flight_repository.top_countries(
-        metric=metric, start=start_dt, end=end_dt, limit=500
-    )
-    code = country_code.upper()
-    row = next(
-        (r for r in rows if (r["country_code"] or "").upper() == code),
-        None,
-    )
-
-    if not row:
-        base = CountryStatsResponse(
-            code=code,
-            name=COUNTRY_NAMES.get(code),
-            flag_url=COUNTRY_FLAGS.get(code),
-            total_flights=0,
-            total_pilots=0,
-            total_credits=0,
-            total_views=0,
-        )
-        top_pilots: list[dict] = []
-    else:
-        base = _enrich_country_row(row)
-        top_pilots = await flight_controller.flight_repository.top_pilots(
+    code = normalize_country_code(country_code)
+    # A country without flights simply has no top pilots, so both queries
+    # can run at once.
+    stats, pilots = await asyncio.gather(
+        flight_controller.country_stats(
+            code, start=start_dt, end=end_dt, versions=validators.versions
+        ),
+        flight_controller.top_pilots(
             country_code=code,
             metric=metric,
             start=start_dt,
             end=end_dt,
             limit=10,
-        )
+            versions=validators.versions,
+        ),
+    )
+    # Tag the body with the stale result's versions, if one is stale.
+    stale = stats.version != validators.versions
+    validators.retag(request, response, (stats if stale else pilots).version)
+
+    row = stats.value
+    base = _enrich_country_row({**row, "country_code": code})
+    bounding_box = None
+    if row["flights_count"]:
+        bounding_box = [row["min_lng"], row["min_lat"], row["max_lng"], row["max_lat"]]
 
     return CountryDetailResponse(
         **base.dict(),
         recent_flights=base.total_flights,
-        top_pilots=top_pilots,
-        bounding_box=None,
+        top_pilots=pilots.value,
+        bounding_box=bounding_box,
     )
@@ -1,32 +1,96 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from functools import partial
 from typing import Any
 
-from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
 from app.controllers.flight import FlightController
 from app.models import Role
 from app.models.flight import FlightStatus, FlightTheme
-from app.schemas.requests.flights import FlightSubmissionRequest, FlightUpdateRequest
-from app.schemas.responses.flights import FlightResponse
+from app.repositories.flights import MAX_CLUSTER_ZOOM, matches_public_filters
+from app.schemas.requests.flights import (
+    FlightBatchSubmissionRequest,
+    FlightModerationRequest,
+    FlightSubmissionRequest,
+    FlightUpdateRequest,
+)
+from app.schemas.responses.flights import (
+    FacetValueCount,
+    FlightBatchResponse,
+    FlightClusterResponse,
+    FlightModerationResponse,
+    FlightResponse,
+    FlightStatusCountsResponse,
+    FlightTagCountResponse,
+    PilotSummary,
+)
+from core.cache import cache_key, response_cache
 from core.exceptions import BadRequestException
 from core.factory import Factory
-from core.fastapi.dependencies import AuthenticationRequired
+from core.fastapi.dependencies import (
+    AuthenticationRequired,
+    Validators,
+    conditional_get,
+    serialize_sparse,
+    sparse_fields,
+)
+from core.geo import TILE_MEDIA_TYPE, BBox, normalize_country_code
+from core.pagination import decode_cursor, encode_cursor
 from core.security.require_role import require_role
 
 flights_router = APIRouter(prefix="/flights", tags=["Flights"])
 
+TILE_MAX_AGE_SECONDS = 60
+
+# Flights change often; clients revalidate after a few seconds.
+flight_validators = conditional_get(
+    "flights", "users", max_age=5, stale_while_revalidate=30
+)
+
+FLIGHT = TypeAdapter(FlightResponse)
+FLIGHT_LIST = TypeAdapter(list[FlightResponse])
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# CSV columns: the flat FlightResponse fields, then the pilot's prefixed.
+EXPORT_CSV_COLUMNS = [
+    *(name for name in FlightResponse.model_fields if name != "pilot"),
+    *(f"pilot_{name}" for name in PilotSummary.model_fields),
+]
+
 
-def _parse_bbox(bbox: str | None) -> tuple[float, float, float, float] | None:
+def _parse_bbox(bbox: str | None) -> BBox | None:
     if not bbox:
         return None
     parts = bbox.split(",")
     if len(parts) != 4:
         raise ValueError("bbox must be 'min_lng,min_lat,max_lng,max_lat'")
     min_lng, min_lat, max_lng, max_lat = map(float, parts)
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    if not (-90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox latitudes must be within [-90, 90] and ordered")
+    # min_lng > max_lng is allowed: the bbox crosses the antimeridian.
     return min_lng, min_lat, max_lng, max_lat
 
 
+def _parse_flight_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+    created_at, flight_id = decode_cursor(cursor, size=2)
+    try:
+        return datetime.fromisoformat(created_at), int(flight_id)
+    except (TypeError, ValueError):
+        raise BadRequestException("Invalid cursor")
+
+
 @flights_router.post(
     "",
     response_model=FlightResponse,
@@ -41,15 +105,74 @@ async def submit_flight(
     return flight
 
 
+def _validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+@flights_router.post(
+    "/batch",
+    response_model=FlightBatchResponse,
+    dependencies=[Depends(AuthenticationRequired), Depends(require_role(Role.MODERATOR))],
+)
+async def submit_flight_batch(
+    payload: FlightBatchSubmissionRequest,
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> FlightBatchResponse:
+    items: list[dict[str, Any]] = []
+    valid: list[tuple[int, FlightSubmissionRequest]] = []
+    for index, item in enumerate(payload.flights):
+        try:
+            valid.append((index, FlightSubmissionRequest.model_validate(item)))
+        except ValidationError as exc:
+            items.append({"index": index, "error": _validation_error(exc)})
+
+    if valid:
+        results = await flight_controller.submit_flights([item for _, item in valid])
+        items += [
+            {"index": index, **result}
+            for (index, _), result in zip(valid, results, strict=True)
+        ]
+
+    items.sort(key=lambda item: item["index"])
+    created = sum(1 for item in items if item.get("id") is not None)
+    return FlightBatchResponse(
+        created=created, failed=len(items) - created, items=items
+    )
+
+
+@flights_router.post(
+    "/moderation/bulk",
+    response_model=FlightModerationResponse,
+    dependencies=[Depends(AuthenticationRequired), Depends(require_role(Role.MODERATOR))],
+)
+async def moderate_flights(
+    payload: FlightModerationRequest,
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> FlightModerationResponse:
+    items = await flight_controller.moderate(payload.items)
+    return FlightModerationResponse(
+        updated=sum(1 for item in items if item.get("updated")),
+        failed=sum(1 for item in items if item.get("error")),
+        items=items,
+    )
+
+
 @flights_router.get(
-    "",
-    response_model=list[FlightResponse],
+    "/moderation/counts",
+    response_model=FlightStatusCountsResponse,
+    dependencies=[Depends(AuthenticationRequired), Depends(require_role(Role.MODERATOR))],
 )
-async def list_flights(
-    bbox: str | None = Query(
-        None,
-        description="Bounding box as 'min_lng,min_lat,max_lng,max_lat'",
-    ),
+async def flight_status_counts(
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> FlightStatusCountsResponse:
+    counts = await flight_controller.status_counts()
+    return FlightStatusCountsResponse(**counts)
+
+
+def _flight_filters(
     country: str | None = Query(None),
     drone_type: str | None = Query(None),
     theme: FlightTheme | None = Query(None),
@@ -61,19 +184,17 @@ async def list_flights(
     duration_max: int | None = Query(None, ge=0),
     q: str | None = Query(
         None,
-        description="Free-text search over title and description",
+        description="Full-text search over title, description and tags",
     ),
     status_: FlightStatus = Query(
         FlightStatus.APPROVED,
         alias="status",
         description="Flight status to filter on",
     ),
-    limit: int = Query(500, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-    flight_controller: FlightController = Depends(Factory().get_flight_controller),
-) -> list[FlightResponse]:
+) -> dict[str, Any]:
+    """Collect the flight filter query parameters shared by the list endpoints."""
     filters: dict[str, Any] = {
-        "country": country,
+        "country": normalize_country_code(country),
         "drone_type": drone_type,
         "theme": theme,
         "pilot_name": pilot_name,
@@ -85,18 +206,246 @@ async def list_flights(
 
     if tags:
         filters["tags"] = [t.strip() for t in tags.split(",") if t.strip()]
+    return filters
 
-    bbox_tuple = None
-    if bbox:
-        try:
-            bbox_tuple = _parse_bbox(bbox)
-        except ValueError as exc:
-            raise BadRequestException(str(exc))
+
+def _bbox_filter(
+    bbox: str | None = Query(
+        None,
+        description=(
+            "Bounding box as 'min_lng,min_lat,max_lng,max_lat'; "
+            "min_lng > max_lng selects a box crossing the antimeridian"
+        ),
+    ),
+) -> BBox | None:
+    try:
+        return _parse_bbox(bbox)
+    except ValueError as exc:
+        raise BadRequestException(str(exc))
+
+
+@flights_router.get(
+    "",
+    response_model=list[FlightResponse],
+)
+async def list_flights(
+    request: Request,
+    bbox: BBox | None = Depends(_bbox_filter),
+    filters: dict[str, Any] = Depends(_flight_filters),
+    limit: int = Query(500, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
+    sort: str = Query(
+        "recent",
+        pattern="^(recent|relevance)$",
+        description="'relevance' ranks full-text matches of q first",
+    ),
+    fields: list[str] | None = Depends(sparse_fields(FlightResponse)),
+    validators: Validators = Depends(flight_validators),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> Response:
+    accept_encoding = request.headers.get("accept-encoding")
+    key = cache_key(
+        "flights",
+        # Embedded pilots are only invalidated through the users version.
+        validators.versions["users"],
+        bbox=bbox,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        sort=sort,
+        fields=tuple(fields) if fields else None,
+        **filters,
+    )
+    # Taken before the read, so a body that races a write isn't stored.
+    generation = response_cache.generation
+    if cached := response_cache.get(key):
+        return cached.render(
+            accept_encoding,
+            hit=True,
+            headers=validators.headers_for(request, cached.versions),
+        )
+
+    after = _parse_flight_cursor(cursor)
+    # Relevance order has no stable seek key; it pages with offset only.
+    ranked = sort == "relevance" and bool(filters.get("q"))
 
     flights = await flight_controller.list_public(
-        bbox=bbox_tuple, filters=filters, limit=limit, offset=offset
+        bbox=bbox,
+        filters=filters,
+        limit=limit,
+        offset=offset,
+        after=after,
+        fields=fields,
+        sort=sort,
+    )
+    if fields:
+        body = json.dumps(
+            serialize_sparse(FlightResponse, flights, fields), separators=(",", ":")
+        ).encode()
+    else:
+        body = FLIGHT_LIST.dump_json(
+            FLIGHT_LIST.validate_python(flights, from_attributes=True)
+        )
+    headers = {}
+    if len(flights) == limit and not ranked:
+        last = flights[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    cached = response_cache.set(
+        key,
+        body,
+        depends_on=partial(matches_public_filters, bbox=bbox, filters=filters),
+        headers=headers,
+        versions=validators.versions,
+        generation=generation,
+    )
+    return cached.render(accept_encoding, hit=False, headers=validators.headers)
+
+
+async def _ndjson_chunks(
+    batches: AsyncIterator[Sequence[Any]],
+) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(
+            FLIGHT.dump_json(FLIGHT.validate_python(row, from_attributes=True)) + b"\n"
+            for row in rows
+        )
+
+
+async def _csv_chunks(batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_COLUMNS)
+    writer.writeheader()
+    async for rows in batches:
+        for row in rows:
+            record = FLIGHT.dump_python(
+                FLIGHT.validate_python(row, from_attributes=True), mode="json"
+            )
+            pilot = record.pop("pilot") or {}
+            record["tags"] = ";".join(record["tags"])
+            record.update({f"pilot_{key}": value for key, value in pilot.items()})
+            writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+@flights_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()},
+            "description": "Every matching flight, one per line",
+        }
+    },
+)
+async def export_flights(
+    format_: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"
+    ),
+    bbox: BBox | None = Depends(_bbox_filter),
+    filters: dict[str, Any] = Depends(_flight_filters),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> StreamingResponse:
+    # The rows are read while the body is sent, through a server-side
+    # cursor, so memory stays flat however large the catalog is.
+    batches = flight_controller.export_public(bbox=bbox, filters=filters)
+    chunks = _ndjson_chunks(batches) if format_ == "ndjson" else _csv_chunks(batches)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format_],
+        headers={
+            "Content-Disposition": f'attachment; filename="flights.{format_}"'
+        },
+    )
+
+
+@flights_router.get(
+    "/clusters",
+    response_model=list[FlightClusterResponse],
+)
+async def list_flight_clusters(
+    zoom: int = Query(..., ge=0, le=MAX_CLUSTER_ZOOM, description="Map zoom level"),
+    bbox: BBox | None = Depends(_bbox_filter),
+    filters: dict[str, Any] = Depends(_flight_filters),
+    limit: int = Query(
+        2000,
+        ge=1,
+        le=10000,
+        description="Largest clusters to return; smaller ones are left out",
+    ),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> list[FlightClusterResponse]:
+    return await flight_controller.list_clusters(
+        bbox=bbox, filters=filters, zoom=zoom, limit=limit
+    )
+
+
+@flights_router.get(
+    "/facets",
+    response_model=dict[str, list[FacetValueCount]],
+)
+async def list_flight_facets(
+    facets: str = Query(
+        ...,
+        description=(
+            "Comma-separated facets to count: theme, drone_type, country, "
+            "duration"
+        ),
+    ),
+    bbox: BBox | None = Depends(_bbox_filter),
+    filters: dict[str, Any] = Depends(_flight_filters),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> dict[str, list[FacetValueCount]]:
+    return await flight_controller.facet_counts(
+        bbox=bbox,
+        filters=filters,
+        facets=[f.strip() for f in facets.split(",") if f.strip()],
+    )
+
+
+@flights_router.get(
+    "/tags",
+    response_model=list[FlightTagCountResponse],
+)
+async def list_flight_tags(
+    tag: str | None = Query(
+        None, description="Return the tags most often used together with this one"
+    ),
+    limit: int = Query(20, ge=1, le=200),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> list[FlightTagCountResponse]:
+    return await flight_controller.list_tags(tag=tag, limit=limit)
+
+
+@flights_router.get(
+    "/tiles/{z}/{x}/{y}",
+    response_class=Response,
+    responses={
+        200: {
+            "content": {TILE_MEDIA_TYPE: {}},
+            "description": "Binary marker tile; see core/geo/tiles.py for the layout",
+        }
+    },
+)
+async def get_flight_tile(
+    z: int,
+    x: int,
+    y: int,
+    filters: dict[str, Any] = Depends(_flight_filters),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> Response:
+    body = await flight_controller.render_tile(z, x, y, filters)
+    return Response(
+        content=body,
+        media_type=TILE_MEDIA_TYPE,
+        headers={"Cache-Control": f"public, max-age={TILE_MAX_AGE_SECONDS}"},
     )
-    return list(flights)
 
 
 @flights_router.get(
@@ -104,10 +453,46 @@ async def list_flights(
     response_model=FlightResponse,
 )
 async def get_flight(
+    request: Request,
     flight_id: int,
+    validators: Validators = Depends(flight_validators),
     flight_controller: FlightController = Depends(Factory().get_flight_controller),
-) -> FlightResponse:
-    return await flight_controller.get_by_id(flight_id)
+) -> Response:
+    accept_encoding = request.headers.get("accept-encoding")
+    key = cache_key("flight", flight_id, validators.versions["users"])
+    # Taken before the read, so a body that races a write isn't stored.
+    generation = response_cache.generation
+    if cached := response_cache.get(key):
+        return cached.render(
+            accept_encoding,
+            hit=True,
+            headers=validators.headers_for(request, cached.versions),
+        )
+
+    flight = await flight_controller.get_by_id(flight_id)
+    body = FLIGHT.dump_json(FLIGHT.validate_python(flight, from_attributes=True))
+    cached = response_cache.set(
+        key,
+        body,
+        depends_on=lambda changed: changed["id"] == flight_id,
+        versions=validators.versions,
+        generation=generation,
+    )
+    return cached.render(accept_encoding, hit=False, headers=validators.headers)
+
+
+@flights_router.post(
+    "/{flight_id}/view",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_class=Response,
+)
+async def record_flight_view(
+    flight_id: int = Path(..., ge=1),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> Response:
+    # Counted in memory and written in batches; see WriteBehindCounter.
+    await flight_controller.record_view(flight_id)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
 
 
 @flights_router.put(
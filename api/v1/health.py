@@ -1,6 +1,12 @@
 from fastapi import APIRouter
 
-from app.schemas.extras import Health
+from app.schemas.extras import (
+    CacheStats,
+    FlightViewStats,
+    Health,
+    LeaderboardCacheStats,
+)
+from core.cache import flight_views, leaderboard_cache, response_cache
 from core.config import config
 
 health_router = APIRouter(prefix="/health", tags=["Health"])
@@ -13,3 +19,30 @@ async def health() -> Health:
     :returns: The health check response.
     """
     return Health(version=config.RELEASE_VERSION, status="OK")
+
+
+@health_router.get("/cache")
+async def cache_stats() -> CacheStats:
+    """Response cache counters of this process.
+
+    :returns: The cache statistics.
+    """
+    return CacheStats(**response_cache.stats())
+
+
+@health_router.get("/leaderboard-cache")
+async def leaderboard_cache_stats() -> LeaderboardCacheStats:
+    """Leaderboard cache counters of this process.
+
+    :returns: The cache statistics.
+    """
+    return LeaderboardCacheStats(**leaderboard_cache.stats())
+
+
+@health_router.get("/flight-views")
+async def flight_view_stats() -> FlightViewStats:
+    """Counters of the flight view buffer of this process.
+
+    :returns: The buffer statistics.
+    """
+    return FlightViewStats(**flight_views.stats())
@@ -2,16 +2,58 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
-from app.controllers.flight import FlightController
+from app.controllers.flight import LEADERBOARD_TABLES, FlightController
 from app.schemas.responses.leaderboards import (
     CountryLeaderboardEntry,
+    CountryRankResponse,
     PilotLeaderboardEntry,
+    PilotRankResponse,
 )
+from core.exceptions import BadRequestException
 from core.factory import Factory
+from core.fastapi.dependencies import Validators, conditional_get
+from core.pagination import decode_cursor, encode_cursor
+
+leaderboard_validators = conditional_get(
+    *LEADERBOARD_TABLES, max_age=30, stale_while_revalidate=300
+)
+leaderboards_router = APIRouter(
+    prefix="/leaderboards",
+    tags=["Leaderboards"],
+    dependencies=[Depends(leaderboard_validators)],
+)
+
+CURSOR_DESCRIPTION = "Opaque cursor from the X-Next-Cursor header of the previous page"
 
-leaderboards_router = APIRouter(prefix="/leaderboards", tags=["Leaderboards"])
+
+def _parse_ranking_cursor(
+    cursor: str | None, key: type[int] | type[str]
+) -> tuple[int, int | str, int] | None:
+    if not cursor:
+        return None
+    metric_value, last, rank = decode_cursor(cursor, size=3)
+    if not (
+        isinstance(metric_value, int)
+        and isinstance(last, key)
+        and isinstance(rank, int)
+    ):
+        raise BadRequestException("Invalid cursor")
+    return metric_value, last, rank
+
+
+def _set_next_cursor(
+    response: Response, rows: list[dict], limit: int, key: str
+) -> None:
+    if len(rows) < limit:
+        return
+    last = rows[-1]
+    # Unknown countries rank under "" but are listed as null.
+    last_key = "" if last[key] is None else last[key]
+    response.headers["X-Next-Cursor"] = encode_cursor(
+        last["metric_value"], last_key, last["rank"]
+    )
 
 
 @leaderboards_router.get(
@@ -19,6 +61,8 @@ leaderboards_router = APIRouter(prefix="/leaderboards", tags=["Leaderboards"])
     response_model=list[PilotLeaderboardEntry],
 )
 async def global_pilot_leaderboard(
+    request: Request,
+    response: Response,
     metric: str = Query(
         "credits",
         pattern="^(flights|credits|views)$",
@@ -31,13 +75,15 @@ async def global_pilot_leaderboard(
         None, description="End date (exclusive) in YYYY-MM-DD"
     ),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    validators: Validators = Depends(leaderboard_validators),
     flight_controller: FlightController = Depends(Factory().get_flight_controller),
 ) -> list[PilotLeaderboardEntry]:
     metric = flight_controller.validate_metric(metric)
     start = period_start
     end = period_end or date.today()
 
-    rows = await flight_controller.flight_repository.top_pilots(
+    ranking = await flight_controller.top_pilots(
         country_code=None,
         metric=metric,
         start=None
@@ -45,16 +91,20 @@ async def global_pilot_leaderboard(
         else datetime.combine(start, datetime.min.time()),
         end=None if end is None else datetime.combine(end, datetime.min.time()),
         limit=limit,
+        after=_parse_ranking_cursor(cursor, int),
+        versions=validators.versions,
     )
+    validators.retag(request, response, ranking.version)
+    _set_next_cursor(response, ranking.value, limit, "pilot_id")
     entries: list[PilotLeaderboardEntry] = []
-    for idx, row in enumerate(rows, start=1):
+    for row in ranking.value:
         entries.append(
             PilotLeaderboardEntry(
                 pilot_id=row["pilot_id"],
                 username=row["username"],
                 display_name=row["display_name"],
                 country_code=row["country_code"],
-                rank=idx,
+                rank=row["rank"],
                 metric_value=row["metric_value"],
                 flights_count=row["flights_count"],
                 total_credits=row["total_credits"],
@@ -69,6 +119,8 @@ async def global_pilot_leaderboard(
     response_model=list[PilotLeaderboardEntry],
 )
 async def country_pilot_leaderboard(
+    request: Request,
+    response: Response,
     country_code: str,
     metric: str = Query(
         "credits",
@@ -77,6 +129,8 @@ async def country_pilot_leaderboard(
     period_start: date | None = Query(None),
     period_end: date | None = Query(None),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    validators: Validators = Depends(leaderboard_validators),
     flight_controller: FlightController = Depends(Factory().get_flight_controller),
 ) -> list[PilotLeaderboardEntry]:
     metric = flight_controller.validate_metric(metric)
@@ -84,7 +138,7 @@ async def country_pilot_leaderboard(
     end = period_end or date.today()
     cc = country_code.upper()
 
-    rows = await flight_controller.flight_repository.top_pilots(
+    ranking = await flight_controller.top_pilots(
         country_code=cc,
         metric=metric,
         start=None
@@ -92,16 +146,20 @@ async def country_pilot_leaderboard(
         else datetime.combine(start, datetime.min.time()),
         end=None if end is None else datetime.combine(end, datetime.min.time()),
         limit=limit,
+        after=_parse_ranking_cursor(cursor, int),
+        versions=validators.versions,
     )
+    validators.retag(request, response, ranking.version)
+    _set_next_cursor(response, ranking.value, limit, "pilot_id")
     entries: list[PilotLeaderboardEntry] = []
-    for idx, row in enumerate(rows, start=1):
+    for row in ranking.value:
         entries.append(
             PilotLeaderboardEntry(
                 pilot_id=row["pilot_id"],
                 username=row["username"],
                 display_name=row["display_name"],
                 country_code=row["country_code"],
-                rank=idx,
+                rank=row["rank"],
                 metric_value=row["metric_value"],
                 flights_count=row["flights_count"],
                 total_credits=row["total_credits"],
@@ -111,11 +169,50 @@ async def country_pilot_leaderboard(
     return entries
 
 
+@leaderboards_router.get(
+    "/pilots/{pilot_id}/rank",
+    response_model=PilotRankResponse,
+)
+async def pilot_rank(
+    pilot_id: int,
+    metric: str = Query(
+        "credits",
+        pattern="^(flights|credits|views)$",
+    ),
+    country_code: str | None = Query(
+        None, description="Rank among the pilots of this country"
+    ),
+    period_start: date | None = Query(None),
+    period_end: date | None = Query(None),
+    neighbours: int = Query(
+        5, ge=0, le=50, description="Pilots to return above and below"
+    ),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> PilotRankResponse:
+    metric = flight_controller.validate_metric(metric)
+    start = period_start
+    end = period_end or date.today()
+
+    ranked = await flight_controller.pilot_rank(
+        pilot_id,
+        country_code=None if country_code is None else country_code.upper(),
+        metric=metric,
+        start=None
+        if start is None
+        else datetime.combine(start, datetime.min.time()),
+        end=datetime.combine(end, datetime.min.time()),
+        neighbours=neighbours,
+    )
+    return PilotRankResponse.model_validate(ranked)
+
+
 @leaderboards_router.get(
     "/countries",
     response_model=list[CountryLeaderboardEntry],
 )
 async def country_leaderboard(
+    request: Request,
+    response: Response,
     metric: str = Query(
         "flights",
         pattern="^(flights|credits|views)$",
@@ -123,26 +220,32 @@ async def country_leaderboard(
     period_start: date | None = Query(None),
     period_end: date | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    validators: Validators = Depends(leaderboard_validators),
     flight_controller: FlightController = Depends(Factory().get_flight_controller),
 ) -> list[CountryLeaderboardEntry]:
     metric = flight_controller.validate_metric(metric)
     start = period_start
     end = period_end or date.today()
 
-    rows = await flight_controller.flight_repository.top_countries(
+    ranking = await flight_controller.top_countries(
         metric=metric,
         start=None
         if start is None
         else datetime.combine(start, datetime.min.time()),
         end=None if end is None else datetime.combine(end, datetime.min.time()),
         limit=limit,
+        after=_parse_ranking_cursor(cursor, str),
+        versions=validators.versions,
     )
+    validators.retag(request, response, ranking.version)
+    _set_next_cursor(response, ranking.value, limit, "country_code")
     entries: list[CountryLeaderboardEntry] = []
-    for idx, row in enumerate(rows, start=1):
+    for row in ranking.value:
         entries.append(
             CountryLeaderboardEntry(
                 country_code=row["country_code"],
-                rank=idx,
+                rank=row["rank"],
                 metric_value=row["metric_value"],
                 flights_count=row["flights_count"],
                 unique_pilots=row["unique_pilots"],
@@ -151,3 +254,36 @@ async def country_leaderboard(
             )
         )
     return entries
+
+
+@leaderboards_router.get(
+    "/countries/{country_code}/rank",
+    response_model=CountryRankResponse,
+)
+async def country_rank(
+    country_code: str,
+    metric: str = Query(
+        "flights",
+        pattern="^(flights|credits|views)$",
+    ),
+    period_start: date | None = Query(None),
+    period_end: date | None = Query(None),
+    neighbours: int = Query(
+        5, ge=0, le=50, description="Countries to return above and below"
+    ),
+    flight_controller: FlightController = Depends(Factory().get_flight_controller),
+) -> CountryRankResponse:
+    metric = flight_controller.validate_metric(metric)
+    start = period_start
+    end = period_end or date.today()
+
+    ranked = await flight_controller.country_rank(
+        country_code,
+        metric=metric,
+        start=None
+        if start is None
+        else datetime.combine(start, datetime.min.time()),
+        end=datetime.combine(end, datetime.min.time()),
+        neighbours=neighbours,
+    )
+    return CountryRankResponse.model_validate(ranked)
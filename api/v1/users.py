@@ -1,9 +1,11 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.responses import JSONResponse
 
 from app.controllers import UserController
 from app.models import Role, User
+from app.repositories.users import USER_SEARCH_LIMIT
 from app.schemas.requests import (
     RegisterUserRequest,
     UpdateSelfRequest,
@@ -12,7 +14,12 @@ from app.schemas.requests import (
 )
 from app.schemas.responses import UserResponse
 from core.factory import Factory
-from core.fastapi.dependencies import AuthenticationRequired, get_current_user
+from core.fastapi.dependencies import (
+    AuthenticationRequired,
+    get_current_user,
+    serialize_sparse,
+    sparse_fields,
+)
 from core.security.require_role import require_role
 
 users_router = APIRouter(tags=["Users"])
@@ -41,6 +48,7 @@ async def create_user(
 )
 async def get_users(
     query_params: UserPagination = Depends(),
+    fields: list[str] | None = Depends(sparse_fields(UserResponse)),
     user_controller: UserController = Depends(Factory().get_user_controller),
 ):
     filters = {}
@@ -49,9 +57,15 @@ async def get_users(
         end_date = datetime(query_params.creation_year + 1, 1, 1)
         filters["created_at"] = (start_date, end_date)
 
-    return await user_controller.get_filtered(
-        filters=filters, skip=query_params.skip, limit=query_params.limit
+    users = await user_controller.get_filtered(
+        filters=filters,
+        skip=query_params.skip,
+        limit=query_params.limit,
+        fields=fields,
     )
+    if fields:
+        return JSONResponse(serialize_sparse(UserResponse, users, fields))
+    return users
 
 
 @users_router.get(
@@ -72,9 +86,11 @@ async def get_user_by_id(
     response_model=list[UserResponse],
 )
 async def search_users_by_username(
-    query: str, user_controller: UserController = Depends(Factory().get_user_controller)
+    query: str = Query(..., min_length=1),
+    limit: int = Query(USER_SEARCH_LIMIT, ge=1, le=100),
+    user_controller: UserController = Depends(Factory().get_user_controller),
 ):
-    return await user_controller.search_by_username(query)
+    return await user_controller.search_by_username(query, limit=limit)
 
 
 @users_router.put(
@@ -1,15 +1,56 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Sequence
 from datetime import date, datetime
-from typing import Any
+from typing import Any, TypeVar
 
-from app.models.flight import Flight, FlightStatus
-from app.repositories.flights import FlightRepository
-from app.repositories.users import UserRepository
-from app.schemas.requests.flights import FlightSubmissionRequest
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+
+from app.models.flight import Flight, FlightStatus, FlightTheme
+from app.models.table_version import VIEWS_VERSION
+from app.models.user import User
+from app.repositories.flights import FLIGHT_FACETS, FlightRepository, flight_snapshot
+from app.repositories.users import (
+    UserRepository,
+    new_pilot_attributes,
+    pilot_updates,
+    random_password_hash,
+)
+from app.schemas.requests.flights import (
+    FlightModerationItem,
+    FlightSubmissionRequest,
+    ModerationAction,
+)
+from core.cache import (
+    ResponseCache,
+    StaleCache,
+    StaleEntry,
+    WriteBehindCounter,
+    cache_key,
+)
 from core.controller import BaseController
-from core.exceptions import BadRequestException
+from core.exceptions import BadRequestException, NotFoundException
+from core.geo import (
+    TileMarker,
+    encode_tile,
+    normalize_country_code,
+    reverse_geocode_many,
+    tile_bbox,
+)
+
+ResultType = TypeVar("ResultType")
+
+# Marker theme indexes in encoded tiles; 0 means "no theme".
+TILE_THEMES: list[FlightTheme] = list(FlightTheme)
+TILE_MARKER_LIMIT = 5000
+# Rows fetched per round trip by catalog exports.
+EXPORT_BATCH_SIZE = 1000
+# Tables the rankings and country stats are read from; cached results carry
+# their versions. View flushes only bump ``VIEWS_VERSION``.
+LEADERBOARD_TABLES = ("flights", "users", VIEWS_VERSION)
 
 
 class FlightController(BaseController[Flight]):
@@ -17,12 +58,33 @@ class FlightController(BaseController[Flight]):
         self,
         flight_repository: FlightRepository,
         user_repository: UserRepository,
+        response_cache: ResponseCache | None = None,
+        leaderboard_cache: StaleCache | None = None,
+        flight_views: WriteBehindCounter | None = None,
+        viewable_flights: StaleCache | None = None,
     ):
         super().__init__(model=Flight, repository=flight_repository)
         self.flight_repository = flight_repository
         self.user_repository = user_repository
+        self.response_cache = response_cache
+        self.leaderboard_cache = leaderboard_cache
+        self.flight_views = flight_views
+        self.viewable_flights = viewable_flights
+
+    def _snapshot(self, flight: Flight) -> dict[str, object] | None:
+        """Capture a flight state for cache invalidation, if caching is on."""
+        if self.response_cache is None:
+            return None
+        return flight_snapshot(flight)
+
+    def _invalidate(self, *snapshots: dict[str, object] | None) -> None:
+        """Drop cached responses showing any of the given flight states."""
+        for snapshot in snapshots:
+            if snapshot is not None:
+                self.response_cache.invalidate(snapshot)
 
     async def submit_flight(self, payload: FlightSubmissionRequest) -> Flight:
+        (payload,) = await self._with_countries([payload])
         pilot = None
         if payload.pilot:
             pilot = await self.user_repository.get_or_create_pilot(
@@ -33,8 +95,151 @@ class FlightController(BaseController[Flight]):
                 social=payload.pilot.social_links,
             )
 
-        attributes: dict[str, Any] = {
-            "pilot_id": pilot.id if pilot else None,
+        attributes = self._flight_attributes(payload)
+        attributes["pilot_id"] = pilot.id if pilot else None
+
+        flight = await self.repository.create(attributes)
+        self._invalidate(self._snapshot(flight))
+        return flight
+
+    async def submit_flights(
+        self, payloads: Sequence[FlightSubmissionRequest]
+    ) -> list[dict[str, Any]]:
+        """Submit many flights in one transaction.
+
+        Pilots are resolved with one lookup query and the flights are written
+        with multi-row inserts. Items whose pilot can't be resolved are
+        skipped and reported; the others are still submitted. If a concurrent
+        submission creates one of the new pilots first, the batch is rolled
+        back and resolved once more, so the pilots it created are reused or
+        the conflicting items reported.
+
+        :param payloads: The flight submissions.
+
+        :return: An ``id``/``error`` result per payload, in order.
+        """
+        payloads = await self._with_countries(payloads)
+        session = self.flight_repository.session
+        for attempt in range(2):
+            pilots, errors = await self._resolve_pilots(payloads)
+            try:
+                # Inserts the new pilots, so the flights can reference them.
+                await session.flush()
+                rows = [
+                    {
+                        **self._flight_attributes(payload),
+                        "pilot_id": pilot.id if pilot else None,
+                    }
+                    for payload, pilot, error in zip(
+                        payloads, pilots, errors, strict=True
+                    )
+                    if error is None
+                ]
+                flights = iter(await self.flight_repository.insert_many(rows))
+                await session.commit()
+                break
+            except IntegrityError as e:
+                await session.rollback()
+                if attempt:
+                    raise BadRequestException(f"Database Integrity Error: {e.orig}")
+
+        results = []
+        for error in errors:
+            flight = next(flights) if error is None else None
+            if flight is not None:
+                self._invalidate(self._snapshot(flight))
+            results.append({"id": flight.id if flight else None, "error": error})
+        return results
+
+    async def _resolve_pilots(
+        self, payloads: Sequence[FlightSubmissionRequest]
+    ) -> tuple[list[User | None], list[str | None]]:
+        """Find or stage the pilot of every submission, like ``get_or_create_pilot``.
+
+        Existing pilots are looked up in a single query and updated in place.
+        New pilots are only added to the session; a flush inserts them.
+
+        :param payloads: The flight submissions.
+
+        :return: The pilot of each payload and the error of each payload.
+        """
+        submissions = [payload.pilot for payload in payloads if payload.pilot]
+        emails = {pilot.email for pilot in submissions if pilot.email}
+        # Generated usernames are looked up too, to report them when taken.
+        usernames = {
+            pilot.username or pilot.email.split("@")[0]
+            for pilot in submissions
+            if pilot.username or pilot.email
+        }
+        users = await self.user_repository.get_pilot_candidates(usernames, emails)
+        by_username = {user.username: user for user in users}
+        by_email = {user.email: user for user in users if user.email}
+
+        # Nobody knows the random password, so one (slow) hash serves all.
+        password_hash: str | None = None
+        pilots: list[User | None] = []
+        errors: list[str | None] = []
+        for payload in payloads:
+            submission = payload.pilot
+            pilot, error = None, None
+            if submission:
+                username, email = submission.username, submission.email
+                social = submission.social_links
+                pilot = by_username.get(username) or by_email.get(email)
+                generated_username = username or (email.split("@")[0] if email else None)
+                if pilot:
+                    updates = pilot_updates(
+                        pilot, submission.name, email, payload.country_code, social
+                    )
+                    if updates.get("email") in by_email:
+                        # The email belongs to another user.
+                        del updates["email"]
+                    for key, value in updates.items():
+                        setattr(pilot, key, value)
+                elif not generated_username:
+                    error = "The pilot needs a username or an email"
+                elif generated_username in by_username:
+                    error = f"Username '{generated_username}' is already taken"
+                else:
+                    password_hash = password_hash or random_password_hash()
+                    pilot = self.user_repository.add(
+                        new_pilot_attributes(
+                            username,
+                            email,
+                            submission.name,
+                            payload.country_code,
+                            social,
+                            password_hash=password_hash,
+                        )
+                    )
+                if pilot:
+                    by_username[pilot.username] = pilot
+                    if pilot.email:
+                        by_email[pilot.email] = pilot
+            pilots.append(pilot)
+            errors.append(error)
+        return pilots, errors
+
+    async def _with_countries(
+        self, payloads: Sequence[FlightSubmissionRequest]
+    ) -> list[FlightSubmissionRequest]:
+        """Fill missing country codes from the flights' coordinates."""
+        missing = [payload for payload in payloads if payload.country_code is None]
+        codes = iter(
+            await reverse_geocode_many(
+                (payload.lat, payload.lng) for payload in missing
+            )
+        )
+        return [
+            payload
+            if payload.country_code is not None
+            else payload.model_copy(update={"country_code": next(codes)})
+            for payload in payloads
+        ]
+
+    def _flight_attributes(self, payload: FlightSubmissionRequest) -> dict[str, Any]:
+        """Map a submission onto the columns of a new, pending flight."""
+        return {
             "status": FlightStatus.PENDING,
             "video_url": str(payload.video_url),
             "title": payload.title,
@@ -48,19 +253,101 @@ class FlightController(BaseController[Flight]):
             "tags": payload.tags or [],
         }
 
-        return await self.repository.create(attributes)
-
     async def list_public(
         self,
         bbox: tuple[float, float, float, float] | None,
         filters: dict[str, object] | None,
         limit: int,
         offset: int,
-    ) -> Sequence[Flight]:
+        after: tuple[datetime, int] | None = None,
+        fields: Sequence[str] | None = None,
+        sort: str = "recent",
+    ) -> Sequence[Flight] | Sequence[Row]:
+        if sort == "relevance" and after:
+            raise BadRequestException(
+                "Cursor pagination is not available with sort=relevance"
+            )
         return await self.flight_repository.list_public(
-            bbox=bbox, filters=filters, limit=limit, offset=offset
+            bbox=bbox,
+            filters=filters,
+            limit=limit,
+            offset=offset,
+            after=after,
+            fields=fields,
+            sort=sort,
+        )
+
+    def export_public(
+        self,
+        bbox: tuple[float, float, float, float] | None,
+        filters: dict[str, object] | None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Row]]:
+        return self.flight_repository.stream_public(
+            bbox=bbox, filters=filters, batch_size=batch_size
         )
 
+    async def facet_counts(
+        self,
+        bbox: tuple[float, float, float, float] | None,
+        filters: dict[str, object] | None,
+        facets: Sequence[str],
+    ) -> dict[str, list[dict]]:
+        facets = list(dict.fromkeys(facets))
+        if not facets:
+            raise BadRequestException("At least one facet is required")
+        unknown = [facet for facet in facets if facet not in FLIGHT_FACETS]
+        if unknown:
+            raise BadRequestException(
+                f"Invalid facet '{unknown[0]}'. Allowed: {', '.join(FLIGHT_FACETS)}"
+            )
+        return await self.flight_repository.facet_counts(
+            bbox=bbox, filters=filters, facets=facets
+        )
+
+    async def list_clusters(
+        self,
+        bbox: tuple[float, float, float, float] | None,
+        filters: dict[str, object] | None,
+        zoom: int,
+        limit: int,
+    ) -> list[dict]:
+        return await self.flight_repository.clusters(
+            bbox=bbox, filters=filters, zoom=zoom, limit=limit
+        )
+
+    async def render_tile(
+        self,
+        z: int,
+        x: int,
+        y: int,
+        filters: dict[str, object] | None,
+    ) -> bytes:
+        try:
+            bbox = tile_bbox(z, x, y)
+        except ValueError as exc:
+            raise BadRequestException(str(exc))
+
+        rows = await self.flight_repository.tile_markers(
+            bbox=bbox, filters=filters, limit=TILE_MARKER_LIMIT
+        )
+        markers = (
+            TileMarker(
+                id=row["id"],
+                lat=row["lat"],
+                lng=row["lng"],
+                theme=TILE_THEMES.index(row["theme"]) + 1 if row["theme"] else 0,
+                country_code=row["country_code"],
+            )
+            for row in rows
+        )
+        return encode_tile(z, x, y, markers)
+
+    async def list_tags(self, tag: str | None, limit: int) -> list[dict]:
+        if tag:
+            return await self.flight_repository.related_tags(tag, limit)
+        return await self.flight_repository.tag_counts(limit)
+
     async def update_flight(
         self, flight_id: int, attributes: dict[str, Any]
     ) -> Flight:
@@ -71,12 +358,16 @@ class FlightController(BaseController[Flight]):
             return await self.reject(flight_id, attributes.get("rejected_reason"))
 
         flight = await self.get_by_id(flight_id)
-        return await self.repository.update(flight, attributes)
+        before = self._snapshot(flight)
+        flight = await self.repository.update(flight, attributes)
+        self._invalidate(before, self._snapshot(flight))
+        return flight
 
     async def approve(self, flight_id: int, credits: int | None) -> Flight:
         flight = await self.get_by_id(flight_id)
         if flight.status == FlightStatus.APPROVED:
             return flight
+        before = self._snapshot(flight)
 
         flight.status = FlightStatus.APPROVED
         flight.approved_at = datetime.utcnow()
@@ -84,27 +375,111 @@ class FlightController(BaseController[Flight]):
             flight.credits = credits
         flight.rejected_reason = None
 
+        self.flight_repository.session.add(flight)
         if flight.pilot_id:
-            pilot = await self.user_repository.get_by(
-                field="id", value=flight.pilot_id, unique=True
+            await self.user_repository.award_credits(
+                [
+                    {
+                        "user_id": flight.pilot_id,
+                        "flight_id": flight.id,
+                        "amount": flight.credits,
+                    }
+                ]
             )
-            if pilot:
-                pilot.total_credits = (pilot.total_credits or 0) + flight.credits
-                self.flight_repository.session.add(pilot)
-
-        self.flight_repository.session.add(flight)
         await self.flight_repository.session.commit()
+        self._invalidate(before, self._snapshot(flight))
         return flight
 
     async def reject(self, flight_id: int, reason: str | None) -> Flight:
         flight = await self.get_by_id(flight_id)
+        before = self._snapshot(flight)
         flight.status = FlightStatus.REJECTED
         flight.rejected_reason = reason
         flight.approved_at = None
         self.flight_repository.session.add(flight)
         await self.flight_repository.session.commit()
+        self._invalidate(before, self._snapshot(flight))
         return flight
 
+    async def moderate(
+        self, items: Sequence[FlightModerationItem]
+    ) -> list[dict[str, Any]]:
+        """Approve and reject many flights in one transaction.
+
+        Flights getting the same new values are updated by one statement;
+        the credit ledger and the pilot totals take one statement each.
+        Approving an approved flight changes nothing, like ``approve``.
+
+        :param items: The moderation decision of each flight.
+
+        :return: A ``status``/``updated``/``error`` result per item, in order.
+        """
+        ids = [item.id for item in items]
+        if len(set(ids)) != len(ids):
+            raise BadRequestException("Each flight can only be moderated once")
+
+        groups: defaultdict[tuple[ModerationAction, Any], list[int]] = defaultdict(list)
+        for item in items:
+            value = (
+                item.credits
+                if item.action == ModerationAction.APPROVE
+                else item.rejected_reason
+            )
+            groups[(item.action, value)].append(item.id)
+
+        approved_at = datetime.utcnow()
+        rows: list[Row] = []
+        for (action, value), group in groups.items():
+            if action == ModerationAction.APPROVE:
+                values: dict[str, object] = {
+                    "status": FlightStatus.APPROVED,
+                    "approved_at": approved_at,
+                    "rejected_reason": None,
+                }
+                if value is not None:
+                    values["credits"] = value
+                rows += await self.flight_repository.moderate(
+                    group, values, skip_status=FlightStatus.APPROVED
+                )
+            else:
+                values = {
+                    "status": FlightStatus.REJECTED,
+                    "rejected_reason": value,
+                    "approved_at": None,
+                }
+                rows += await self.flight_repository.moderate(group, values)
+
+        await self.user_repository.award_credits(
+            [
+                {"user_id": row.pilot_id, "flight_id": row.id, "amount": row.credits}
+                for row in rows
+                if row.status == FlightStatus.APPROVED and row.pilot_id
+            ]
+        )
+        await self.flight_repository.session.commit()
+
+        for row in rows:
+            after = self._snapshot(row)
+            before = after and {**after, "status": row.previous_status}
+            self._invalidate(before, after)
+
+        updated = {row.id: row.status for row in rows}
+        statuses = dict(updated)
+        if missing := [id_ for id_ in ids if id_ not in statuses]:
+            statuses.update(await self.flight_repository.statuses(missing))
+        return [
+            {"id": id_, "status": statuses[id_], "updated": id_ in updated}
+            if id_ in statuses
+            else {"id": id_, "error": "Flight not found"}
+            for id_ in ids
+        ]
+
+    async def delete(self, id_: int) -> None:
+        flight = await self.get_by_id(id_)
+        before = self._snapshot(flight)
+        await self.repository.delete(flight)
+        self._invalidate(before)
+
     async def stats_overview(
         self,
         start: date,
@@ -117,35 +492,280 @@ class FlightController(BaseController[Flight]):
 
         metric = self.validate_metric(metric)
 
-        flights_per_day = await self.flight_repository.flights_per_day(start, end)
-
         start_dt = datetime.combine(start, datetime.min.time())
         end_dt = datetime.combine(end, datetime.min.time())
 
-        top_countries = await self.flight_repository.top_countries(
-            metric=metric, start=start_dt, end=end_dt, limit=top_limit
-        )
-        top_pilots = await self.flight_repository.top_pilots(
-            country_code=None,
-            metric=metric,
-            start=start_dt,
-            end=end_dt,
-            limit=top_limit,
-        )
-
-        pending = await self.flight_repository.get_filtered(
-            filters={"status": FlightStatus.PENDING},
-            skip=0,
-            limit=1_000_000,
+        (
+            flights_per_day,
+            top_countries,
+            top_pilots,
+            counts,
+        ) = await self.flight_repository.concurrently(
+            lambda repository: repository.flights_per_day(start, end),
+            lambda repository: repository.top_countries(
+                metric=metric, start=start_dt, end=end_dt, limit=top_limit
+            ),
+            lambda repository: repository.top_pilots(
+                country_code=None,
+                metric=metric,
+                start=start_dt,
+                end=end_dt,
+                limit=top_limit,
+            ),
+            lambda repository: repository.status_counts(),
         )
+        status_counts = {status.value: count for status, count in counts.items()}
 
         return {
             "flights_per_day": flights_per_day,
             "top_countries": top_countries,
             "top_pilots": top_pilots,
-            "pending_flights": len(pending),
+            "pending_flights": status_counts[FlightStatus.PENDING.value],
+            "status_counts": status_counts,
         }
 
+    async def record_view(self, flight_id: int) -> None:
+        """Count a view of a flight; it is written with the next batch.
+
+        Only ids of approved flights are buffered, so made-up ids can't fill
+        the buffer. Whether a flight is approved is cached; views of flights
+        rejected since are dropped when written.
+
+        :param flight_id: The viewed flight.
+        """
+        if not await self._is_viewable(flight_id):
+            raise NotFoundException(f"Flight with id: {flight_id} does not exist")
+        self.flight_views.add(flight_id)
+
+    async def _is_viewable(self, flight_id: int) -> bool:
+        async def load() -> bool:
+            # Refreshes outlive the request, so they read on their own session.
+            (approved,) = await self.flight_repository.concurrently(
+                lambda repository: repository.is_approved(flight_id)
+            )
+            return approved
+
+        if self.viewable_flights is None:
+            return await load()
+        return (await self.viewable_flights.get(flight_id, load)).value
+
+    async def write_views(self, counts: dict[int, int]) -> int:
+        """Add a batch of buffered views to the flights.
+
+        :param counts: The new views per flight id.
+
+        :return: The number of flights updated.
+        """
+        return await self.flight_repository.add_views(counts)
+
+    async def top_pilots(
+        self,
+        country_code: str | None,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int,
+        versions: dict[str, int] | None = None,
+        *,
+        after: tuple[int, int, int] | None = None,
+    ) -> StaleEntry[list[dict]]:
+        """Rank the pilots, from the leaderboard cache when possible.
+
+        :param country_code: Only rank pilots from this country.
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive).
+        :param end: End of the period (exclusive).
+        :param limit: The number of pilots to return.
+        :param versions: The current versions of ``LEADERBOARD_TABLES``.
+        :param after: The ``(metric_value, pilot_id, rank)`` cursor of the
+            previous page.
+
+        :return: The cached ranking and the versions it was read at.
+        """
+        return await self._cached(
+            cache_key(
+                "top_pilots",
+                country_code=country_code,
+                metric=metric,
+                start=start,
+                end=end,
+                limit=limit,
+                after=after,
+            ),
+            lambda repository: repository.top_pilots(
+                country_code=country_code,
+                metric=metric,
+                start=start,
+                end=end,
+                limit=limit,
+                after=after,
+            ),
+            versions,
+        )
+
+    async def top_countries(
+        self,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int,
+        versions: dict[str, int] | None = None,
+        *,
+        after: tuple[int, str, int] | None = None,
+    ) -> StaleEntry[list[dict]]:
+        """Rank the flight countries, from the leaderboard cache when possible.
+
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive).
+        :param end: End of the period (exclusive).
+        :param limit: The number of countries to return.
+        :param versions: The current versions of ``LEADERBOARD_TABLES``.
+        :param after: The ``(metric_value, country_code, rank)`` cursor of the
+            previous page.
+
+        :return: The cached ranking and the versions it was read at.
+        """
+        return await self._cached(
+            cache_key(
+                "top_countries",
+                metric=metric,
+                start=start,
+                end=end,
+                limit=limit,
+                after=after,
+            ),
+            lambda repository: repository.top_countries(
+                metric=metric, start=start, end=end, limit=limit, after=after
+            ),
+            versions,
+        )
+
+    async def pilot_rank(
+        self,
+        pilot_id: int,
+        country_code: str | None,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        neighbours: int,
+    ) -> dict[str, Any]:
+        """Find a pilot's rank and the pilots ranked around it.
+
+        :param pilot_id: The pilot to look up.
+        :param country_code: Only rank pilots from this country.
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive).
+        :param end: End of the period (exclusive).
+        :param neighbours: The number of pilots to return on each side.
+
+        :return: The ``entry`` of the pilot, and the pilots ``above`` and
+            ``below`` it, best first.
+        """
+        rows = await self.flight_repository.pilot_rank(
+            pilot_id, country_code, metric, start, end, neighbours
+        )
+        return self._around(rows, "pilot_id", pilot_id, "Pilot")
+
+    async def country_rank(
+        self,
+        country_code: str,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        neighbours: int,
+    ) -> dict[str, Any]:
+        """Find a country's rank and the countries ranked around it.
+
+        :param country_code: The country code, in any case.
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive).
+        :param end: End of the period (exclusive).
+        :param neighbours: The number of countries to return on each side.
+
+        :return: The ``entry`` of the country, and the countries ``above``
+            and ``below`` it, best first.
+        """
+        code = normalize_country_code(country_code)
+        rows = await self.flight_repository.country_rank(
+            code, metric, start, end, neighbours
+        )
+        return self._around(rows, "country_code", code, "Country")
+
+    @staticmethod
+    def _around(
+        rows: list[dict], key: str, value: object, name: str
+    ) -> dict[str, Any]:
+        index = next((i for i, row in enumerate(rows) if row[key] == value), None)
+        if index is None:
+            raise NotFoundException(f"{name} '{value}' is not ranked in this period")
+        return {
+            "entry": rows[index],
+            "above": rows[:index],
+            "below": rows[index + 1 :],
+        }
+
+    async def country_stats(
+        self,
+        country_code: str,
+        start: datetime | None,
+        end: datetime | None,
+        versions: dict[str, int] | None = None,
+    ) -> StaleEntry[dict[str, object]]:
+        """Aggregate one country, from the leaderboard cache when possible.
+
+        :param country_code: The country code, in any case.
+        :param start: Start of the period (inclusive).
+        :param end: End of the period (exclusive).
+        :param versions: The current versions of ``LEADERBOARD_TABLES``.
+
+        :return: The cached ``FlightRepository.country_stats`` and the
+            versions they were read at.
+        """
+        code = normalize_country_code(country_code)
+        return await self._cached(
+            cache_key("country_stats", country_code=code, start=start, end=end),
+            lambda repository: repository.country_stats(code, start, end),
+            versions,
+        )
+
+    async def _cached(
+        self,
+        key: Hashable,
+        read: Callable[[FlightRepository], Awaitable[ResultType]],
+        versions: dict[str, int] | None,
+    ) -> StaleEntry[ResultType]:
+        async def load() -> ResultType:
+            # Refreshes outlive the request, so they read on their own session.
+            (result,) = await self.flight_repository.concurrently(read)
+            return result
+
+        if self.leaderboard_cache is None:
+            return StaleEntry(await load(), versions, 0.0)
+        return await self.leaderboard_cache.get(key, load, versions)
+
+    async def warm_leaderboards(self, versions: dict[str, int]) -> None:
+        """Load the rankings behind the default leaderboard and country pages.
+
+        :param versions: The current versions of ``LEADERBOARD_TABLES``.
+        """
+        today = datetime.combine(date.today(), datetime.min.time())
+        results = await asyncio.gather(
+            *(
+                self.top_pilots(None, metric, None, today, 50, versions=versions)
+                for metric in ("credits", "flights", "views")
+            ),
+            self.top_countries("flights", None, today, 50, versions=versions),
+            self.top_countries("flights", None, None, 200, versions=versions),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    async def status_counts(self) -> dict[str, int]:
+        counts = await self.flight_repository.status_counts()
+        return {status.value: count for status, count in counts.items()}
+
     def validate_metric(self, metric: str) -> str:
         allowed = {"flights", "credits", "views"}
         if metric not in allowed:
@@ -1,4 +1,5 @@
 from collections.abc import Sequence
+from typing import Any
 
 from app.models import User
 from app.repositories import UserRepository
@@ -13,14 +14,28 @@ class UserController(BaseController[User]):
         super().__init__(model=User, repository=user_repository)
         self.user_repository = user_repository
 
-    async def search_by_username(self, query: str) -> Sequence[User]:
+    async def update(self, id_: int, attributes: dict[str, Any]) -> User:
+        """Update a user; a new credit total is recorded in the ledger.
+
+        :param id_: The id of the user to update.
+        :param attributes: The attributes to update the user with.
+
+        :return: The updated user.
+        """
+        user = await self.get_by_id(id_)
+        if attributes.get("total_credits") is not None:
+            await self.user_repository.set_credits(id_, attributes["total_credits"])
+        return await self.repository.update(user, attributes)
+
+    async def search_by_username(self, query: str, limit: int) -> Sequence[User]:
         """Search for users by username using a query.
 
         :param query: The query to search for.
+        :param limit: The maximum number of users to return.
 
         :return: A list of users that match the query.
         """
-        return await self.user_repository.search_by_username(query)
+        return await self.user_repository.search_by_username(query, limit=limit)
 
     async def login(self, username: str, password: str) -> Token | None:
         """Login a user with a username and password.
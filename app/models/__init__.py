@@ -3,6 +3,10 @@ from core.database import Base
 from .role import Role
 from .user import User
 from .flight import Flight, FlightStatus, FlightTheme
+from .tag_stats import FlightStatusCount, FlightTagCount, FlightTagPair
+from .table_version import TableVersion
+from .credit_entry import CreditEntry, CreditKind
+from .rollup import FlightDailyRollup
 
 __all__ = [
     "Base",
@@ -11,4 +15,11 @@ __all__ = [
     "Flight",
     "FlightStatus",
     "FlightTheme",
+    "FlightTagCount",
+    "FlightTagPair",
+    "FlightStatusCount",
+    "TableVersion",
+    "CreditEntry",
+    "CreditKind",
+    "FlightDailyRollup",
 ]
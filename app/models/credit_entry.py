@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import enum
+from datetime import datetime
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from core.database import Base
+
+
+class CreditKind(str, enum.Enum):
+    APPROVAL = "approval"
+    ADJUSTMENT = "adjustment"
+    OPENING_BALANCE = "opening_balance"
+
+
+class CreditEntry(Base):
+    """A change to the credits of a user. Rows are only ever inserted.
+
+    ``users.total_credits`` is the running sum of a user's entries; the
+    ``reconcile-credits`` command recomputes it from here.
+    """
+
+    __tablename__ = "credit_entries"
+
+    id: so.Mapped[int] = so.mapped_column(sa.BigInteger, primary_key=True)
+    user_id: so.Mapped[int] = so.mapped_column(
+        sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+    flight_id: so.Mapped[int | None] = so.mapped_column(
+        sa.Integer, sa.ForeignKey("flights.id", ondelete="SET NULL"), nullable=True
+    )
+    kind: so.Mapped[CreditKind] = so.mapped_column(
+        sa.Enum(CreditKind, name="credit_kind")
+    )
+    amount: so.Mapped[int] = so.mapped_column(sa.Integer)
+    created_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime, default=datetime.utcnow, nullable=False
+    )
@@ -5,10 +5,11 @@ from datetime import datetime
 
 import sqlalchemy as sa
 import sqlalchemy.orm as so
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 
 from core.database import Base
 from core.database.mixins import TimestampMixin
+from core.geo import cell_key, normalize_country_code
 
 
 class FlightStatus(str, enum.Enum):
@@ -17,6 +18,10 @@ class FlightStatus(str, enum.Enum):
     REJECTED = "rejected"
 
 
+# Text search configuration used for both the stored vector and queries.
+SEARCH_CONFIG = "english"
+
+
 class FlightTheme(str, enum.Enum):
     URBAN = "urban"
     RACING = "racing"
@@ -27,6 +32,20 @@ class FlightTheme(str, enum.Enum):
 
 class Flight(Base, TimestampMixin):
     __tablename__ = "flights"
+    __table_args__ = (
+        # Backs the keyset pagination of the public feed.
+        sa.Index("ix_flights_status_created_at_id", "status", "created_at", "id"),
+        sa.Index("ix_flights_search_vector", "search_vector", postgresql_using="gin"),
+        # Serves the ``tags @>`` containment filter.
+        sa.Index("ix_flights_tags", "tags", postgresql_using="gin"),
+        # Serves per-country aggregates of approved flights over a period.
+        sa.Index(
+            "ix_flights_country_code_status_created_at",
+            "country_code",
+            "status",
+            "created_at",
+        ),
+    )
 
     id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
     pilot_id: so.Mapped[int | None] = so.mapped_column(
@@ -46,7 +65,9 @@ class Flight(Base, TimestampMixin):
 
     lat: so.Mapped[float] = so.mapped_column(sa.Float, index=True)
     lng: so.Mapped[float] = so.mapped_column(sa.Float, index=True)
-    country_code: so.Mapped[str | None] = so.mapped_column(sa.String(2), index=True)
+    # Morton key of (lat, lng); kept in sync by ``_sync_geo_cell``.
+    geo_cell: so.Mapped[int | None] = so.mapped_column(sa.BigInteger, index=True)
+    country_code: so.Mapped[str | None] = so.mapped_column(sa.String(2))
 
     drone_type: so.Mapped[str | None] = so.mapped_column(sa.String(64), index=True)
     duration_seconds: so.Mapped[int | None] = so.mapped_column(sa.Integer)
@@ -60,6 +81,10 @@ class Flight(Base, TimestampMixin):
         default=list,
     )
 
+    # Maintained by the flights_search_vector trigger from title, description
+    # and tags; deferred so regular reads never fetch it.
+    search_vector: so.Mapped[str | None] = so.mapped_column(TSVECTOR, deferred=True)
+
     credits: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
     views: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
     likes: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
@@ -71,5 +96,17 @@ class Flight(Base, TimestampMixin):
         "User", back_populates="flights", lazy="joined"
     )
 
+    @so.validates("lat", "lng")
+    def _sync_geo_cell(self, key: str, value: float) -> float:
+        lat = value if key == "lat" else self.lat
+        lng = value if key == "lng" else self.lng
+        if lat is not None and lng is not None:
+            self.geo_cell = cell_key(lat, lng)
+        return value
+
+    @so.validates("country_code")
+    def _normalize_country_code(self, key: str, value: str | None) -> str | None:
+        return normalize_country_code(value)
+
     def __repr__(self) -> str:  # pragma: no cover - debug helper
         return f"<Flight {self.id} status={self.status}>"
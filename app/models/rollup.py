@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import date
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from core.database import Base
+
+
+class FlightDailyRollup(Base):
+    """Totals of the approved flights of a pilot in a country on a day.
+
+    Maintained by the ``flights_daily_rollup`` trigger; see
+    ``core/database/migration.py``. Flights without a pilot are kept under
+    ``pilot_id`` 0 and flights without a country under ``country_code`` '',
+    since primary key columns can't be null.
+    """
+
+    __tablename__ = "flight_daily_rollups"
+
+    day: so.Mapped[date] = so.mapped_column(sa.Date, primary_key=True)
+    pilot_id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
+    country_code: so.Mapped[str] = so.mapped_column(sa.String(2), primary_key=True)
+
+    flights: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
+    credits: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
+    views: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
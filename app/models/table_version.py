@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from core.database import Base
+
+# Bumped by view count flushes, which don't bump the flights version.
+VIEWS_VERSION = "flight_views"
+
+
+class TableVersion(Base):
+    """Change counter of a table, bumped by a statement-level trigger on
+    every write. Read endpoints derive their ETags from it."""
+
+    __tablename__ = "table_versions"
+
+    name: so.Mapped[str] = so.mapped_column(sa.String(63), primary_key=True)
+    version: so.Mapped[int] = so.mapped_column(sa.BigInteger, default=0)
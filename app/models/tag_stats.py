@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from app.models.flight import FlightStatus
+from core.database import Base
+
+
+class FlightTagCount(Base):
+    """Number of approved flights carrying each tag.
+
+    Maintained by the ``flights_tag_stats`` trigger; see
+    ``core/database/migration.py``.
+    """
+
+    __tablename__ = "flight_tag_counts"
+    __table_args__ = (sa.Index("ix_flight_tag_counts_count", "count"),)
+
+    tag: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    count: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
+
+
+class FlightTagPair(Base):
+    """Number of approved flights carrying both ``tag`` and ``other_tag``.
+
+    Every pair is stored in both directions so the co-occurrences of a tag
+    are a single primary key range.
+    """
+
+    __tablename__ = "flight_tag_pairs"
+
+    tag: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    other_tag: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    count: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
+
+
+class FlightStatusCount(Base):
+    """Number of flights in each status.
+
+    Maintained by the ``flights_status_counts`` trigger, so counting the
+    moderation queue reads one row instead of scanning it.
+    """
+
+    __tablename__ = "flight_status_counts"
+
+    status: so.Mapped[FlightStatus] = so.mapped_column(
+        sa.Enum(FlightStatus, name="flight_status"), primary_key=True
+    )
+    count: so.Mapped[int] = so.mapped_column(sa.BigInteger, default=0)
@@ -5,6 +5,7 @@ import sqlalchemy.orm as so
 
 from core.database import Base
 from core.database.mixins import TimestampMixin
+from core.geo import normalize_country_code
 from core.security import password_handler
 
 from .role import Role
@@ -12,6 +13,21 @@ from .role import Role
 
 class User(Base, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        # Trigram indexes serve ILIKE '%term%' name searches.
+        sa.Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+        sa.Index(
+            "ix_users_display_name_trgm",
+            "display_name",
+            postgresql_using="gin",
+            postgresql_ops={"display_name": "gin_trgm_ops"},
+        ),
+    )
 
     id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
     username: so.Mapped[str] = so.mapped_column(sa.String(64), unique=True, index=True)
@@ -27,13 +43,19 @@ class User(Base, TimestampMixin):
     youtube_url: so.Mapped[str | None] = so.mapped_column(sa.String(256))
     website_url: so.Mapped[str | None] = so.mapped_column(sa.String(256))
 
+    # Loaded only on access: a pilot can have thousands of flights, and
+    # every flight read joins its pilot.
     flights: so.Mapped[list["Flight"]] = so.relationship(
-        "Flight", back_populates="pilot", lazy="selectin"
+        "Flight", back_populates="pilot", lazy="select"
     )
 
     def __repr__(self) -> str:
         return f"<User {self.username}>"
 
+    @so.validates("country_code")
+    def _normalize_country_code(self, key: str, value: str | None) -> str | None:
+        return normalize_country_code(value)
+
     @property
     def password(self):
         raise AttributeError("Password is not a readable attribute")
@@ -44,3 +66,16 @@ class User(Base, TimestampMixin):
 
     def verify_password(self, password: str) -> bool:
         return password_handler.check_password_hash(self.password_hash, password)
+
+
+# Case-insensitive prefix matches for search terms too short for trigrams.
+sa.Index(
+    "ix_users_username_lower",
+    sa.func.lower(User.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+)
+sa.Index(
+    "ix_users_display_name_lower",
+    sa.func.lower(User.display_name).label("display_name_lower"),
+    postgresql_ops={"display_name_lower": "text_pattern_ops"},
+)
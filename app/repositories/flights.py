@@ -1,46 +1,478 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections import namedtuple
+from collections.abc import AsyncIterator, Collection, Mapping, Sequence
 from datetime import date, datetime
 
 import sqlalchemy as sa
+import sqlalchemy.orm as so
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import selectinload
 
 from app.models import Role
-from app.models.flight import Flight, FlightStatus, FlightTheme
+from app.models.flight import SEARCH_CONFIG, Flight, FlightStatus, FlightTheme
+from app.models.rollup import FlightDailyRollup
+from app.models.tag_stats import FlightStatusCount, FlightTagCount, FlightTagPair
 from app.models.user import User
+from app.repositories.users import name_match
+from core.geo import (
+    CELL_BITS,
+    BBox,
+    bbox_cell_ranges,
+    cell_key,
+    normalize_country_code,
+    reverse_geocode_many,
+    split_antimeridian,
+)
 from core.repository import BaseRepository
 
+# Cluster cells are this many grid levels finer than the map zoom, i.e.
+# roughly 4x4 clusters per slippy-map tile.
+CLUSTER_LEVEL_OFFSET = 2
+MAX_CLUSTER_ZOOM = CELL_BITS - CLUSTER_LEVEL_OFFSET
+
+PILOT_SUMMARY_COLUMNS = (
+    User.id,
+    User.username,
+    User.display_name,
+    User.country_code,
+    User.email,
+)
+
+# The flight columns of ``FlightResponse``, read by the row projection.
+FLIGHT_ROW_COLUMNS = (
+    Flight.id,
+    Flight.created_at,
+    Flight.updated_at,
+    Flight.status,
+    Flight.video_url,
+    Flight.title,
+    Flight.description,
+    Flight.lat,
+    Flight.lng,
+    Flight.country_code,
+    Flight.drone_type,
+    Flight.duration_seconds,
+    Flight.theme,
+    Flight.tags,
+    Flight.credits,
+    Flight.views,
+    Flight.likes,
+    Flight.approved_at,
+    Flight.rejected_reason,
+)
+
+
+# Leaderboard totals by metric, summed over ``FlightDailyRollup`` rows.
+ROLLUP_TOTALS = {
+    "flights": func.sum(FlightDailyRollup.flights).label("flights_count"),
+    "credits": func.sum(FlightDailyRollup.credits).label("total_credits"),
+    "views": func.sum(FlightDailyRollup.views).label("total_views"),
+}
+
+
+class PilotBundle(so.Bundle):
+    """Nests the pilot columns under ``row.pilot``; ``None`` without a pilot."""
+
+    def create_row_processor(self, query, procs, labels):
+        pilot_row = namedtuple("PilotRow", labels)
+
+        def proc(row):
+            values = [processor(row) for processor in procs]
+            return None if values[0] is None else pilot_row(*values)
+
+        return proc
+
+
+# Upper bounds (exclusive, in seconds) of the duration facet buckets; the
+# last bucket is open ended.
+DURATION_BUCKET_BOUNDS = (60, 180, 600)
+
+
+def _duration_bucket():
+    whens = [(Flight.duration_seconds.is_(None), sa.null())]
+    lower = 0
+    for upper in DURATION_BUCKET_BOUNDS:
+        whens.append((Flight.duration_seconds < upper, f"{lower}-{upper}"))
+        lower = upper
+    return sa.case(*whens, else_=f"{lower}+")
+
+
+# Facet name -> the expression its values are grouped by. There is no status
+# facet: the public queries always filter on one status, so it would have a
+# single value.
+FLIGHT_FACETS = {
+    "theme": Flight.theme,
+    "drone_type": Flight.drone_type,
+    "country": Flight.country_code,
+    "duration": _duration_bucket(),
+}
+
+
+def flight_snapshot(flight: Flight) -> dict[str, object]:
+    """Capture the attributes the public list filters on.
+
+    :param flight: The flight to capture.
+
+    :return: A plain dictionary safe to keep after the flight changes.
+    """
+    return {
+        "id": flight.id,
+        "status": flight.status,
+        "country_code": flight.country_code,
+        "drone_type": flight.drone_type,
+        "theme": flight.theme,
+        "tags": list(flight.tags or ()),
+        "duration_seconds": flight.duration_seconds,
+        "lat": flight.lat,
+        "lng": flight.lng,
+    }
+
+
+def matches_public_filters(
+    flight: dict[str, object],
+    bbox: BBox | None,
+    filters: dict[str, object] | None,
+) -> bool:
+    """Check a flight snapshot against the filters of ``_public_query``.
+
+    Filters only SQL can evaluate (``q`` and ``pilot_name``) are assumed to
+    match, so the answer errs towards ``True``.
+
+    :param flight: A ``flight_snapshot``.
+    :param bbox: The bounding box of the list.
+    :param filters: The filters of the list.
+
+    :return: Whether the flight may appear in the list.
+    """
+    filters = filters or {}
+    if flight["status"] != (filters.get("status") or FlightStatus.APPROVED):
+        return False
+
+    for name, attribute in (
+        ("country", "country_code"),
+        ("drone_type", "drone_type"),
+        ("theme", "theme"),
+    ):
+        if (value := filters.get(name)) and flight[attribute] != value:
+            return False
+
+    if (tags := filters.get("tags")) and not set(tags) <= set(flight["tags"]):
+        return False
+
+    duration = flight["duration_seconds"]
+    duration_min = filters.get("duration_min")
+    duration_max = filters.get("duration_max")
+    if duration_min is not None and (duration is None or duration < duration_min):
+        return False
+    if duration_max is not None and (duration is None or duration > duration_max):
+        return False
+
+    if bbox:
+        return any(
+            min_lat <= flight["lat"] <= max_lat and min_lng <= flight["lng"] <= max_lng
+            for min_lng, min_lat, max_lng, max_lat in split_antimeridian(bbox)
+        )
+    return True
+
 
 class FlightRepository(BaseRepository[Flight]):
+    async def insert_many(self, rows: Sequence[dict[str, object]]) -> Sequence[Flight]:
+        """Insert flights with multi-row ``INSERT ... RETURNING`` statements.
+
+        Nothing is committed. Attribute validators don't run on this path,
+        so the geo cell and the country code are derived here.
+
+        :param rows: The attributes of each flight; every row has the same keys.
+
+        :return: The inserted flights, in the order of ``rows``.
+        """
+        if not rows:
+            return []
+        rows = [
+            {
+                **row,
+                "geo_cell": cell_key(row["lat"], row["lng"]),
+                "country_code": normalize_country_code(row.get("country_code")),
+            }
+            for row in rows
+        ]
+        result = await self.session.scalars(
+            sa.insert(Flight).returning(Flight, sort_by_parameter_order=True), rows
+        )
+        return result.all()
+
+    async def moderate(
+        self,
+        ids: Collection[int],
+        values: dict[str, object],
+        skip_status: FlightStatus | None = None,
+    ) -> Sequence[sa.Row]:
+        """Update the moderation state of many flights in one statement.
+
+        Nothing is committed. The returned rows hold the pilot, the credits
+        and the ``flight_snapshot`` attributes after the update, plus the
+        status before it as ``previous_status``.
+
+        :param ids: The flights to update.
+        :param values: The attributes to set.
+        :param skip_status: Leave flights that already have this status alone.
+
+        :return: A row per updated flight.
+        """
+        previous = (
+            select(Flight.id, Flight.status).where(Flight.id.in_(ids)).subquery("previous")
+        )
+        query = (
+            sa.update(Flight)
+            .where(Flight.id == previous.c.id)
+            .values(values)
+            .returning(
+                Flight.id,
+                Flight.pilot_id,
+                Flight.credits,
+                Flight.status,
+                Flight.country_code,
+                Flight.drone_type,
+                Flight.theme,
+                Flight.tags,
+                Flight.duration_seconds,
+                Flight.lat,
+                Flight.lng,
+                previous.c.status.label("previous_status"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if skip_status is not None:
+            query = query.where(Flight.status != skip_status)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def statuses(self, ids: Collection[int]) -> dict[int, FlightStatus]:
+        """Get the status of each of the flights that exist.
+
+        :param ids: The flights to look up.
+
+        :return: The status by flight id.
+        """
+        result = await self.session.execute(
+            select(Flight.id, Flight.status).where(Flight.id.in_(ids))
+        )
+        return dict(result.tuples().all())
+
     async def list_public(
         self,
-        bbox: tuple[float, float, float, float] | None,
+        bbox: BBox | None,
         filters: dict[str, object] | None,
         limit: int,
         offset: int,
-    ) -> Sequence[Flight]:
-        query = select(Flight).options(selectinload(Flight.pilot))
+        after: tuple[datetime, int] | None = None,
+        fields: Sequence[str] | None = None,
+        sort: str = "recent",
+    ) -> Sequence[Flight] | Sequence[sa.Row]:
+        """List public flights, newest first.
+
+        Without ``fields`` the flights come back as plain rows of
+        ``FLIGHT_ROW_COLUMNS`` with the pilot nested under ``pilot``; no ORM
+        instances are built. With ``fields`` they are partially loaded
+        ``Flight`` instances.
+        """
+        if fields:
+            query = select(Flight)
+            # The sort key stays loaded so the caller can build the next cursor.
+            query = self._load_only(query, ["created_at", *fields])
+            if "pilot" in fields:
+                query = query.options(
+                    selectinload(Flight.pilot).options(
+                        so.load_only(*PILOT_SUMMARY_COLUMNS, raiseload=True),
+                        so.raiseload("*"),
+                    )
+                )
+        else:
+            query = self._row_query()
+        query = self._public_query(query, bbox, filters)
 
+        if after:
+            # Seek past the last row of the previous page instead of skipping
+            # rows, so every page is an index range scan regardless of depth.
+            created_at, flight_id = after
+            query = query.where(
+                sa.tuple_(Flight.created_at, Flight.id) < (created_at, flight_id)
+            )
+
+        q = filters.get("q") if filters else None
+        if sort == "relevance" and q:
+            rank = func.ts_rank_cd(Flight.search_vector, self._tsquery(q))
+            query = query.order_by(rank.desc())
+        query = query.order_by(Flight.created_at.desc(), Flight.id.desc())
+        if offset:
+            query = query.offset(offset)
+        query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        return result.scalars().all() if fields else result.all()
+
+    async def clusters(
+        self,
+        bbox: BBox | None,
+        filters: dict[str, object] | None,
+        zoom: int,
+        limit: int,
+    ) -> list[dict]:
+        """Group the public flights into map clusters for a zoom level.
+
+        Flights are grouped by their grid cell at ``zoom`` plus
+        ``CLUSTER_LEVEL_OFFSET``, at most ``CELL_BITS``. Only the ``limit``
+        largest clusters are returned; smaller ones are silently dropped.
+        Flights without a ``geo_cell`` aren't clustered.
+
+        :param bbox: Optional bounding box to restrict the flights to.
+        :param filters: The flight list filters.
+        :param zoom: The map zoom level.
+        :param limit: The number of clusters to return.
+
+        :return: Clusters with their ``count``, mean ``lat``/``lng`` and a
+            ``sample_flight_id``, largest first.
+        """
+        # Dropping the low bits of the Morton key groups flights by the
+        # enclosing grid cell at the requested level.
+        level = min(zoom + CLUSTER_LEVEL_OFFSET, CELL_BITS)
+        shift = sa.literal(2 * (CELL_BITS - level), sa.Integer)
+        cell = Flight.geo_cell.op(">>")(shift)
+
+        query = select(
+            func.count(Flight.id).label("count"),
+            func.avg(Flight.lat).label("lat"),
+            func.avg(Flight.lng).label("lng"),
+            func.min(Flight.id).label("sample_flight_id"),
+        ).where(Flight.geo_cell.is_not(None))
+        query = self._public_query(query, bbox, filters)
+        query = query.group_by(cell).order_by(sa.desc("count")).limit(limit)
+
+        result = await self.session.execute(query)
+        return [dict(row._mapping) for row in result]
+
+    async def stream_public(
+        self,
+        bbox: BBox | None,
+        filters: dict[str, object] | None,
+        batch_size: int,
+    ) -> AsyncIterator[Sequence[sa.Row]]:
+        """Stream every public flight matching the filters, newest first.
+
+        The rows are read through a server-side cursor, ``batch_size`` at a
+        time, so memory use does not grow with the number of flights.
+
+        :param bbox: Optional bounding box to restrict the flights to.
+        :param filters: The flight list filters.
+        :param batch_size: The number of rows fetched per round trip.
+
+        :return: Batches of rows shaped like those of ``list_public``.
+        """
+        query = self._public_query(self._row_query(), bbox, filters)
+        query = query.order_by(Flight.created_at.desc(), Flight.id.desc())
+        result = await self.session.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+    async def facet_counts(
+        self,
+        bbox: BBox | None,
+        filters: dict[str, object] | None,
+        facets: Sequence[str],
+    ) -> dict[str, list[dict]]:
+        """Count the flights matching the filters per value of each facet.
+
+        All facets are computed by one query grouped by GROUPING SETS, one
+        set per facet.
+
+        :param bbox: Optional bounding box to restrict the flights to.
+        :param filters: The flight list filters.
+        :param facets: Names of ``FLIGHT_FACETS`` to count.
+
+        :return: Facet name -> ``value``/``count`` rows, largest count first.
+        """
+        expressions = [FLIGHT_FACETS[facet] for facet in facets]
+        # grouping(expr) is 0 on the rows grouped by expr; the bits of the
+        # combined grouping() tell which facet a row belongs to.
+        query = select(
+            *(expr.label(f"facet_{i}") for i, expr in enumerate(expressions)),
+            func.grouping(*expressions).label("grouping"),
+            func.count(Flight.id).label("count"),
+        )
+        query = self._public_query(query, bbox, filters)
+        query = query.group_by(func.grouping_sets(*expressions)).order_by(
+            sa.desc("count")
+        )
+
+        counts: dict[str, list[dict]] = {facet: [] for facet in facets}
+        last_bit = len(facets) - 1
+        result = await self.session.execute(query)
+        for row in result:
+            for i, facet in enumerate(facets):
+                if not row.grouping >> (last_bit - i) & 1:
+                    counts[facet].append({"value": row[i], "count": row.count})
+                    break
+        return counts
+
+    async def tile_markers(
+        self,
+        bbox: BBox,
+        filters: dict[str, object] | None,
+        limit: int,
+    ) -> list[dict]:
+        query = select(
+            Flight.id,
+            Flight.lat,
+            Flight.lng,
+            Flight.theme,
+            User.country_code,
+        ).outerjoin(User, Flight.pilot_id == User.id)
+        query = self._public_query(query, bbox, filters)
+        query = query.order_by(Flight.created_at.desc(), Flight.id.desc()).limit(limit)
+
+        result = await self.session.execute(query)
+        return [dict(row._mapping) for row in result]
+
+    def _row_query(self):
+        return select(
+            *FLIGHT_ROW_COLUMNS, PilotBundle("pilot", *PILOT_SUMMARY_COLUMNS)
+        ).outerjoin(User, Flight.pilot_id == User.id)
+
+    def _public_query(
+        self, query, bbox: BBox | None, filters: dict[str, object] | None
+    ):
         status_filter = filters.get("status") if filters else None
         if status_filter is None:
             query = query.where(Flight.status == FlightStatus.APPROVED)
 
         if bbox:
-            min_lng, min_lat, max_lng, max_lat = bbox
-            query = query.where(
-                Flight.lat >= min_lat,
-                Flight.lat <= max_lat,
-                Flight.lng >= min_lng,
-                Flight.lng <= max_lng,
-            )
+            query = query.where(self._bbox_clause(bbox))
 
-        query = self._apply_filters(query, filters)
-        query = query.order_by(Flight.created_at.desc()).offset(offset).limit(limit)
+        return self._apply_filters(query, filters)
 
-        result = await self.session.execute(query)
-        return result.scalars().all()
+    def _tsquery(self, q: str):
+        return func.websearch_to_tsquery(sa.cast(SEARCH_CONFIG, REGCONFIG), q)
+
+    def _bbox_clause(self, bbox: BBox):
+        # The cell ranges drive an index range scan on ``geo_cell``; the exact
+        # lat/lng predicates then trim the points the coarse cells let in.
+        cell_ranges = sa.or_(
+            *(Flight.geo_cell.between(low, high) for low, high in bbox_cell_ranges(bbox))
+        )
+        exact = sa.or_(
+            *(
+                sa.and_(
+                    Flight.lat.between(min_lat, max_lat),
+                    Flight.lng.between(min_lng, max_lng),
+                )
+                for min_lng, min_lat, max_lng, max_lat in split_antimeridian(bbox)
+            )
+        )
+        return sa.and_(cell_ranges, exact)
 
     def _apply_filters(self, query, filters: dict[str, object] | None):
         if not filters:
@@ -56,11 +488,10 @@ class FlightRepository(BaseRepository[Flight]):
             query = query.where(Flight.theme == theme)
 
         if (pilot_name := filters.get("pilot_name")):
-            query = query.join(Flight.pilot).where(
-                sa.or_(
-                    User.username.ilike(f"%{pilot_name}%"),
-                    User.display_name.ilike(f"%{pilot_name}%"),
-                )
+            # A semi-join keeps the users lookup on its trigram indexes and
+            # leaves the outer query free to join users for its own columns.
+            query = query.where(
+                Flight.pilot_id.in_(select(User.id).where(name_match(pilot_name)))
             )
 
         if (tags := filters.get("tags")):
@@ -75,32 +506,95 @@ class FlightRepository(BaseRepository[Flight]):
             query = query.where(Flight.duration_seconds <= duration_max)
 
         if (q := filters.get("q")):
-            like = f"%{q}%"
-            query = query.where(
-                sa.or_(
-                    Flight.title.ilike(like),
-                    Flight.description.ilike(like),
-                )
-            )
+            query = query.where(Flight.search_vector.bool_op("@@")(self._tsquery(q)))
 
         if (status := filters.get("status")):
             query = query.where(Flight.status == status)
 
         return query
 
-    async def top_pilots(
+    async def is_approved(self, flight_id: int) -> bool:
+        """Check whether a flight exists and is approved.
+
+        :param flight_id: The flight id.
+
+        :return: True if the flight is approved.
+        """
+        result = await self.session.execute(
+            select(
+                sa.exists().where(
+                    Flight.id == flight_id, Flight.status == FlightStatus.APPROVED
+                )
+            )
+        )
+        return bool(result.scalar())
+
+    async def add_views(
+        self, counts: Mapping[int, int], batch_size: int = 10_000
+    ) -> int:
+        """Add view counts to many approved flights in one transaction.
+
+        The increments are joined as ``UPDATE ... FROM (VALUES ...)``, so a
+        batch costs one round trip however many flights it touches.
+
+        :param counts: The new views per flight id.
+        :param batch_size: The number of flights per statement; keeps the
+            bind parameters under the driver's limit.
+
+        :return: The number of flights updated.
+        """
+        items = sorted(counts.items())
+        updated = 0
+        for offset in range(0, len(items), batch_size):
+            increments = sa.values(
+                sa.column("id", sa.Integer),
+                sa.column("views", sa.Integer),
+                name="increments",
+            ).data(items[offset : offset + batch_size])
+            query = (
+                sa.update(Flight)
+                .where(
+                    Flight.id == increments.c.id,
+                    Flight.status == FlightStatus.APPROVED,
+                )
+                .values(
+                    views=func.coalesce(Flight.views, 0) + increments.c.views,
+                    # A view isn't an edit of the flight.
+                    updated_at=Flight.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(query)
+            updated += result.rowcount
+        await self.session.commit()
+        return updated
+
+    def _pilot_ranking(
         self,
         country_code: str | None,
         metric: str,
         start: datetime | None,
         end: datetime | None,
-        limit: int,
-    ) -> list[dict]:
-        metric_column = {
-            "flights": func.count(Flight.id),
-            "credits": func.coalesce(func.sum(Flight.credits), 0),
-            "views": func.coalesce(func.sum(Flight.views), 0),
-        }[metric]
+        after: tuple[int, int, int] | None = None,
+    ) -> tuple[sa.Select, tuple]:
+        """Rank the pilots over the daily rollups of a period.
+
+        ``rank`` is the dense rank by the metric, so tied pilots share it.
+        ``position`` is the place in the leaderboard, with ties broken by the
+        pilot id.
+
+        :param after: Only rank the pilots placed after this
+            ``(metric_value, pilot_id, rank)`` cursor. The window then starts
+            at the cursor, see ``_continue_ranks``.
+
+        :return: The ranking query and its ordering.
+        """
+        totals = self._rollup_period(
+            select(FlightDailyRollup.pilot_id, *ROLLUP_TOTALS.values()), start, end
+        )
+        totals = totals.group_by(FlightDailyRollup.pilot_id).subquery("totals")
+        metric_column = totals.c[ROLLUP_TOTALS[metric].name]
+        ordering = (sa.desc(metric_column), User.id)
 
         query = (
             select(
@@ -108,36 +602,116 @@ class FlightRepository(BaseRepository[Flight]):
                 User.username,
                 User.display_name,
                 User.country_code,
-                func.count(Flight.id).label("flights_count"),
-                func.coalesce(func.sum(Flight.credits), 0).label("total_credits"),
-                func.coalesce(func.sum(Flight.views), 0).label("total_views"),
+                totals.c.flights_count,
+                totals.c.total_credits,
+                totals.c.total_views,
                 metric_column.label("metric_value"),
+                func.dense_rank().over(order_by=sa.desc(metric_column)).label("rank"),
+                func.row_number().over(order_by=ordering).label("position"),
             )
-            .join(User, Flight.pilot_id == User.id)
-            .where(
-                Flight.status == FlightStatus.APPROVED,
-                User.role == Role.PILOT,
-            )
-            .group_by(
-                User.id,
-                User.username,
-                User.display_name,
-                User.country_code,
-            )
-            .order_by(sa.desc(metric_column))
-            .limit(limit)
+            .join(User, totals.c.pilot_id == User.id)
+            .where(User.role == Role.PILOT)
         )
-
         if country_code:
             query = query.where(User.country_code == country_code)
+        if after:
+            query = query.where(self._seek(metric_column, User.id, after))
+        return query, ordering
 
-        if start:
-            query = query.where(Flight.created_at >= start)
-        if end:
-            query = query.where(Flight.created_at < end)
+    async def top_pilots(
+        self,
+        country_code: str | None,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int,
+        after: tuple[int, int, int] | None = None,
+    ) -> list[dict]:
+        """Rank the pilots by a metric over their approved flights.
 
-        result = await self.session.execute(query)
-        return [dict(row._mapping) for row in result]
+        Reads the daily rollups, so the cost follows the number of pilot
+        days in the period rather than the number of flights. Later pages
+        seek past the last pilot of the previous one instead of skipping
+        rows, so they cost the same as the first.
+
+        :param country_code: Only rank pilots from this country.
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive); whole days only.
+        :param end: End of the period (exclusive); whole days only.
+        :param limit: The number of pilots to return.
+        :param after: The ``(metric_value, pilot_id, rank)`` of the last pilot
+            of the previous page.
+
+        :return: The top pilots with their ``rank``, best first.
+        """
+        query, ordering = self._pilot_ranking(country_code, metric, start, end, after)
+        result = await self.session.execute(query.order_by(*ordering).limit(limit))
+        return self._continue_ranks([dict(row._mapping) for row in result], after)
+
+    async def pilot_rank(
+        self,
+        pilot_id: int,
+        country_code: str | None,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        neighbours: int,
+    ) -> list[dict]:
+        """Find a pilot's place in a leaderboard, with the pilots around it.
+
+        The ranking is a window over the per-pilot totals in the database;
+        only the rows around the pilot are returned.
+
+        :param pilot_id: The pilot to look up.
+        :param country_code: Only rank pilots from this country.
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive); whole days only.
+        :param end: End of the period (exclusive); whole days only.
+        :param neighbours: The number of pilots to return on each side.
+
+        :return: The pilot and its neighbours with their ``rank`` and
+            ``position``, best first; empty if the pilot isn't ranked.
+        """
+        query, _ = self._pilot_ranking(country_code, metric, start, end)
+        return await self._around(query.cte("ranked"), "pilot_id", pilot_id, neighbours)
+
+    def _country_ranking(
+        self,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        after: tuple[int, str, int] | None = None,
+    ) -> tuple[sa.Select, tuple]:
+        """Rank the flight countries over the daily rollups of a period.
+
+        ``rank``, ``position`` and ``after`` are as in ``_pilot_ranking``;
+        ties are broken by the country code, ``""`` for unknown countries.
+
+        :return: The ranking query and its ordering.
+        """
+        metric_column = ROLLUP_TOTALS[metric].element
+        ordering = (sa.desc(metric_column), FlightDailyRollup.country_code)
+
+        query = self._rollup_period(
+            select(
+                func.nullif(FlightDailyRollup.country_code, "").label("country_code"),
+                *ROLLUP_TOTALS.values(),
+                func.count(sa.distinct(func.nullif(FlightDailyRollup.pilot_id, 0))).label(
+                    "unique_pilots"
+                ),
+                metric_column.label("metric_value"),
+                func.dense_rank().over(order_by=sa.desc(metric_column)).label("rank"),
+                func.row_number().over(order_by=ordering).label("position"),
+            ).group_by(FlightDailyRollup.country_code),
+            start,
+            end,
+        )
+        if after:
+            # The metric is an aggregate, so the seek filters the groups.
+            query = query.having(
+                self._seek(metric_column, FlightDailyRollup.country_code, after)
+            )
+        return query, ordering
 
     async def top_countries(
         self,
@@ -145,54 +719,395 @@ class FlightRepository(BaseRepository[Flight]):
         start: datetime | None,
         end: datetime | None,
         limit: int,
+        after: tuple[int, str, int] | None = None,
     ) -> list[dict]:
-        metric_column = {
-            "flights": func.count(Flight.id),
-            "credits": func.coalesce(func.sum(Flight.credits), 0),
-            "views": func.coalesce(func.sum(Flight.views), 0),
-        }[metric]
+        """Rank the flight countries by a metric over their approved flights.
+
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive); whole days only.
+        :param end: End of the period (exclusive); whole days only.
+        :param limit: The number of countries to return.
+        :param after: The ``(metric_value, country_code, rank)`` of the last
+            country of the previous page, with ``""`` for unknown countries.
+
+        :return: The top countries with their ``rank``, best first.
+        """
+        query, ordering = self._country_ranking(metric, start, end, after)
+        result = await self.session.execute(query.order_by(*ordering).limit(limit))
+        return self._continue_ranks([dict(row._mapping) for row in result], after)
+
+    async def country_rank(
+        self,
+        country_code: str,
+        metric: str,
+        start: datetime | None,
+        end: datetime | None,
+        neighbours: int,
+    ) -> list[dict]:
+        """Find a country's place in the leaderboard, with the countries around it.
+
+        :param country_code: The upper-case country code.
+        :param metric: ``flights``, ``credits`` or ``views``.
+        :param start: Start of the period (inclusive); whole days only.
+        :param end: End of the period (exclusive); whole days only.
+        :param neighbours: The number of countries to return on each side.
+
+        :return: The country and its neighbours with their ``rank`` and
+            ``position``, best first; empty if the country isn't ranked.
+        """
+        query, _ = self._country_ranking(metric, start, end)
+        return await self._around(
+            query.cte("ranked"), "country_code", country_code, neighbours
+        )
+
+    @staticmethod
+    def _seek(
+        metric: sa.ColumnElement, tiebreak: sa.ColumnElement, after: tuple
+    ) -> sa.ColumnElement[bool]:
+        # Leaderboards order by metric DESC, tiebreak ASC; the mixed directions
+        # rule out a row-value comparison.
+        metric_value, last, _ = after
+        return sa.or_(
+            metric < metric_value, sa.and_(metric == metric_value, tiebreak > last)
+        )
+
+    @staticmethod
+    def _continue_ranks(rows: list[dict], after: tuple | None) -> list[dict]:
+        """Shift the ranks of a page read past a seek cursor.
+
+        The rank window only sees the rows after the cursor, so its dense
+        ranks restart at 1. They continue from the cursor's rank instead,
+        sharing it while the metric is tied with the cursor's row.
+
+        :param rows: The page, with window ranks.
+        :param after: The ``(metric_value, key, rank)`` cursor, if any.
+
+        :return: The page with leaderboard ranks.
+        """
+        if not after or not rows:
+            return rows
+        metric_value, _, rank = after
+        offset = rank - 1 if rows[0]["metric_value"] == metric_value else rank
+        for row in rows:
+            row["rank"] += offset
+            # Positions restart with the window too and aren't meaningful here.
+            row.pop("position", None)
+        return rows
 
+    async def _around(
+        self, ranked: sa.CTE, key: str, value: object, neighbours: int
+    ) -> list[dict]:
+        position = select(ranked.c.position).where(ranked.c[key] == value)
+        position = position.scalar_subquery()
         query = (
-            select(
-                Flight.country_code,
-                func.count(Flight.id).label("flights_count"),
-                func.count(sa.distinct(Flight.pilot_id)).label("unique_pilots"),
-                func.coalesce(func.sum(Flight.credits), 0).label("total_credits"),
-                func.coalesce(func.sum(Flight.views), 0).label("total_views"),
-                metric_column.label("metric_value"),
+            select(ranked)
+            .where(
+                ranked.c.position.between(position - neighbours, position + neighbours)
             )
-            .where(Flight.status == FlightStatus.APPROVED)
-            .group_by(Flight.country_code)
-            .order_by(sa.desc(metric_column))
-            .limit(limit)
+            .order_by(ranked.c.position)
         )
+        result = await self.session.execute(query)
+        return [dict(row._mapping) for row in result]
+
+    async def country_stats(
+        self, country_code: str, start: datetime | None, end: datetime | None
+    ) -> dict[str, object]:
+        """Aggregate the approved flights of one country.
+
+        A range scan of ``ix_flights_country_code_status_created_at``; the
+        flights are read rather than the rollups for their bounding box.
+
+        :param country_code: The upper-case country code.
+        :param start: Start of the period (inclusive).
+        :param end: End of the period (exclusive).
 
+        :return: The ``flights_count``, ``unique_pilots``, ``total_credits``
+            and ``total_views`` of the country, and the ``min_lng``,
+            ``min_lat``, ``max_lng`` and ``max_lat`` of its flights (``None``
+            without flights).
+        """
+        query = select(
+            func.count().label("flights_count"),
+            func.count(sa.distinct(Flight.pilot_id)).label("unique_pilots"),
+            func.coalesce(func.sum(Flight.credits), 0).label("total_credits"),
+            func.coalesce(func.sum(Flight.views), 0).label("total_views"),
+            func.min(Flight.lng).label("min_lng"),
+            func.min(Flight.lat).label("min_lat"),
+            func.max(Flight.lng).label("max_lng"),
+            func.max(Flight.lat).label("max_lat"),
+        ).where(
+            Flight.country_code == country_code,
+            Flight.status == FlightStatus.APPROVED,
+        )
         if start:
             query = query.where(Flight.created_at >= start)
         if end:
             query = query.where(Flight.created_at < end)
 
+        result = await self.session.execute(query)
+        return dict(result.one()._mapping)
+
+    def _rollup_period(self, query, start: datetime | None, end: datetime | None):
+        if start:
+            query = query.where(FlightDailyRollup.day >= start.date())
+        if end:
+            query = query.where(FlightDailyRollup.day < end.date())
+        return query
+
+    async def rebuild_rollups(self) -> int:
+        """Recompute the daily rollups from the approved flights.
+
+        :return: The number of rollup rows written.
+        """
+        await self.session.execute(sa.text("LOCK TABLE flights IN SHARE MODE"))
+        await self.session.execute(sa.delete(FlightDailyRollup))
+        day = sa.cast(Flight.created_at, sa.Date)
+        pilot_id = func.coalesce(Flight.pilot_id, 0)
+        country_code = func.coalesce(Flight.country_code, "")
+        result = await self.session.execute(
+            sa.insert(FlightDailyRollup).from_select(
+                ["day", "pilot_id", "country_code", "flights", "credits", "views"],
+                select(
+                    day,
+                    pilot_id,
+                    country_code,
+                    func.count(),
+                    func.coalesce(func.sum(Flight.credits), 0),
+                    func.coalesce(func.sum(Flight.views), 0),
+                )
+                .where(Flight.status == FlightStatus.APPROVED)
+                .group_by(day, pilot_id, country_code),
+            )
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def backfill_geo_cells(self, batch_size: int = 1000) -> int:
+        """Populate ``geo_cell`` for rows written before the column existed.
+
+        :param batch_size: The number of rows to update per statement.
+
+        :return: The number of rows updated.
+        """
+        updated = 0
+        while True:
+            result = await self.session.execute(
+                select(Flight.id, Flight.lat, Flight.lng)
+                .where(Flight.geo_cell.is_(None))
+                .order_by(Flight.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                return updated
+
+            await self.session.execute(
+                sa.update(Flight),
+                [{"id": row.id, "geo_cell": cell_key(row.lat, row.lng)} for row in rows],
+            )
+            await self.session.commit()
+            updated += len(rows)
+
+    async def backfill_search_vectors(self, batch_size: int = 1000) -> int:
+        """Populate ``search_vector`` for rows written before its trigger existed.
+
+        The rows are touched with ``title = title``, so the trigger computes
+        their vectors.
+
+        :param batch_size: The number of rows to update per statement.
+
+        :return: The number of rows updated.
+        """
+        updated = 0
+        while True:
+            result = await self.session.execute(
+                select(Flight.id)
+                .where(Flight.search_vector.is_(None))
+                .order_by(Flight.id)
+                .limit(batch_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                return updated
+
+            await self.session.execute(
+                sa.update(Flight)
+                .where(Flight.id.in_(ids))
+                .values(title=Flight.title)
+            )
+            await self.session.commit()
+            updated += len(ids)
+
+    async def missing_country_id_range(self) -> tuple[int, int] | None:
+        """Return the lowest and highest id of the flights without a country.
+
+        :return: The id range, or ``None`` if every flight has a country.
+        """
+        result = await self.session.execute(
+            select(func.min(Flight.id), func.max(Flight.id)).where(
+                Flight.country_code.is_(None)
+            )
+        )
+        first, last = result.one()
+        return None if first is None else (first, last)
+
+    async def backfill_country_codes(
+        self, first_id: int, last_id: int, batch_size: int = 1000
+    ) -> int:
+        """Derive ``country_code`` from the coordinates of flights without one.
+
+        Walks the ids in ``[first_id, last_id]`` in batches, so disjoint ranges
+        can be backfilled in parallel; flights outside every country keep no
+        code and are not revisited.
+
+        :param first_id: The first flight id of the range.
+        :param last_id: The last flight id of the range.
+        :param batch_size: The number of flights to read per statement.
+
+        :return: The number of rows updated.
+        """
+        updated = 0
+        after = first_id - 1
+        while True:
+            result = await self.session.execute(
+                select(Flight.id, Flight.lat, Flight.lng)
+                .where(
+                    Flight.country_code.is_(None),
+                    Flight.id > after,
+                    Flight.id <= last_id,
+                )
+                .order_by(Flight.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                return updated
+
+            after = rows[-1].id
+            codes = await reverse_geocode_many((row.lat, row.lng) for row in rows)
+            values = [
+                {"id": row.id, "country_code": code}
+                for row, code in zip(rows, codes, strict=True)
+                if code
+            ]
+            if values:
+                await self.session.execute(sa.update(Flight), values)
+                await self.session.commit()
+                updated += len(values)
+
+    async def tag_counts(self, limit: int) -> list[dict]:
+        """Return the most used tags of approved flights.
+
+        :param limit: The number of tags to return.
+
+        :return: ``tag``/``count`` rows, most used first.
+        """
+        query = (
+            select(FlightTagCount.tag, FlightTagCount.count)
+            .order_by(FlightTagCount.count.desc(), FlightTagCount.tag)
+            .limit(limit)
+        )
         result = await self.session.execute(query)
         return [dict(row._mapping) for row in result]
 
+    async def related_tags(self, tag: str, limit: int) -> list[dict]:
+        """Return the tags most often found on approved flights next to ``tag``.
+
+        :param tag: The tag to find co-occurring tags for.
+        :param limit: The number of tags to return.
+
+        :return: ``tag``/``count`` rows, where ``count`` is the number of
+            flights carrying both tags.
+        """
+        query = (
+            select(FlightTagPair.other_tag.label("tag"), FlightTagPair.count)
+            .where(FlightTagPair.tag == tag)
+            .order_by(FlightTagPair.count.desc(), FlightTagPair.other_tag)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return [dict(row._mapping) for row in result]
+
+    async def rebuild_tag_stats(self) -> int:
+        """Recompute the tag statistics tables from the approved flights.
+
+        :return: The number of distinct tags counted.
+        """
+        flight_tags = (
+            select(Flight.id.label("flight_id"), func.unnest(Flight.tags).label("tag"))
+            .where(Flight.status == FlightStatus.APPROVED)
+            .distinct()
+            .subquery()
+        )
+        other = flight_tags.alias("other")
+
+        await self.session.execute(sa.delete(FlightTagPair))
+        await self.session.execute(sa.delete(FlightTagCount))
+        result = await self.session.execute(
+            sa.insert(FlightTagCount).from_select(
+                ["tag", "count"],
+                select(flight_tags.c.tag, func.count()).group_by(flight_tags.c.tag),
+            )
+        )
+        await self.session.execute(
+            sa.insert(FlightTagPair).from_select(
+                ["tag", "other_tag", "count"],
+                select(flight_tags.c.tag, other.c.tag, func.count())
+                .join(
+                    other,
+                    sa.and_(
+                        flight_tags.c.flight_id == other.c.flight_id,
+                        flight_tags.c.tag != other.c.tag,
+                    ),
+                )
+                .group_by(flight_tags.c.tag, other.c.tag),
+            )
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def status_counts(self) -> dict[FlightStatus, int]:
+        """Return the number of flights in each status from the counters.
+
+        :return: The count of every status, including empty ones.
+        """
+        result = await self.session.execute(
+            select(FlightStatusCount.status, FlightStatusCount.count)
+        )
+        counts = dict.fromkeys(FlightStatus, 0)
+        counts.update(result.tuples().all())
+        return counts
+
+    async def rebuild_status_counts(self) -> dict[FlightStatus, int]:
+        """Recount the flights of each status into the counters table.
+
+        :return: The count of every status.
+        """
+        await self.session.execute(sa.text("LOCK TABLE flights IN SHARE MODE"))
+        await self.session.execute(sa.delete(FlightStatusCount))
+        await self.session.execute(
+            sa.insert(FlightStatusCount).from_select(
+                ["status", "count"],
+                select(Flight.status, func.count()).group_by(Flight.status),
+            )
+        )
+        counts = await self.status_counts()
+        await self.session.commit()
+        return counts
+
     async def flights_per_day(
         self,
         start: date,
         end: date,
     ) -> list[dict[str, object]]:
-        date_expr = func.date(Flight.created_at)
         query = (
             select(
-                date_expr.label("date"),
-                func.count(Flight.id).label("count"),
-            )
-            .where(
-                Flight.created_at >= datetime.combine(start, datetime.min.time()),
-                Flight.created_at < datetime.combine(end, datetime.min.time()),
-                Flight.status == FlightStatus.APPROVED,
+                FlightDailyRollup.day.label("date"),
+                func.sum(FlightDailyRollup.flights).label("count"),
             )
-            .group_by(date_expr)
-            .order_by(date_expr)
+            .where(FlightDailyRollup.day >= start, FlightDailyRollup.day < end)
+            .group_by(FlightDailyRollup.day)
+            .order_by(FlightDailyRollup.day)
         )
         result = await self.session.execute(query)
         return [{"date": row.date.isoformat(), "count": row.count} for row in result]
@@ -1,12 +1,128 @@
-from collections.abc import Sequence
+from collections import Counter
+from collections.abc import Collection, Sequence
 import secrets
 from typing import Any
 
+import sqlalchemy as sa
+from sqlalchemy import func
 from sqlalchemy.future import select
 
-from app.models import Role
+from app.models import CreditEntry, CreditKind, Role
 from app.models.user import User
 from core.repository import BaseRepository
+from core.security import password_handler
+
+
+# pg_trgm cannot index patterns with fewer than three characters.
+TRIGRAM_MIN_LENGTH = 3
+USER_SEARCH_LIMIT = 20
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def name_match(term: str):
+    """Build a case-insensitive match of ``term`` on username or display name.
+
+    Long terms use a substring ILIKE served by the trigram indexes; shorter
+    ones fall back to a prefix match on the lower() expression indexes.
+
+    :param term: The search term.
+
+    :return: The SQL predicate.
+    """
+    escaped = _escape_like(term.lower())
+    if len(term) >= TRIGRAM_MIN_LENGTH:
+        pattern = f"%{escaped}%"
+        return sa.or_(
+            User.username.ilike(pattern, escape="\\"),
+            User.display_name.ilike(pattern, escape="\\"),
+        )
+    pattern = f"{escaped}%"
+    return sa.or_(
+        func.lower(User.username).like(pattern, escape="\\"),
+        func.lower(User.display_name).like(pattern, escape="\\"),
+    )
+
+
+def random_password_hash() -> str:
+    return password_handler.generate_password_hash(secrets.token_urlsafe(16))
+
+
+def pilot_updates(
+    user: User,
+    display_name: str | None,
+    email: str | None,
+    country_code: str | None,
+    social: dict[str, str],
+) -> dict[str, Any]:
+    """Collect the changes a pilot submission makes to an existing user.
+
+    The user is promoted to pilot, missing profile fields are filled in and
+    social links are replaced.
+
+    :param user: The existing user.
+    :param display_name: The submitted display name.
+    :param email: The submitted email.
+    :param country_code: The country of the submitted flight.
+    :param social: The submitted social links.
+
+    :return: The attributes to update.
+    """
+    updated: dict[str, Any] = {}
+    if user.role.value < Role.PILOT.value:
+        updated["role"] = Role.PILOT
+    if display_name and not user.display_name:
+        updated["display_name"] = display_name
+    if email and not user.email:
+        updated["email"] = email
+    if country_code and not user.country_code:
+        updated["country_code"] = country_code
+    if social.get("instagram") and social["instagram"] != user.instagram_url:
+        updated["instagram_url"] = social["instagram"]
+    if social.get("youtube") and social["youtube"] != user.youtube_url:
+        updated["youtube_url"] = social["youtube"]
+    if social.get("website") and social["website"] != user.website_url:
+        updated["website_url"] = social["website"]
+    return updated
+
+
+def new_pilot_attributes(
+    username: str | None,
+    email: str | None,
+    display_name: str | None,
+    country_code: str | None,
+    social: dict[str, str],
+    password_hash: str | None = None,
+) -> dict[str, Any]:
+    """Build the attributes of a pilot account created from a submission.
+
+    Without a username the local part of the email is used. The account gets
+    a random password; the pilot can't log in until it is reset.
+
+    :param username: The submitted username.
+    :param email: The submitted email.
+    :param display_name: The submitted display name.
+    :param country_code: The country of the submitted flight.
+    :param social: The submitted social links.
+    :param password_hash: The hash of the random password, to share one
+        hash between the pilots of a batch. Generated when omitted.
+
+    :return: The attributes of the new user.
+    """
+    generated_username = username or (email.split("@")[0] if email else "pilot")
+    return {
+        "username": generated_username,
+        "password_hash": password_hash or random_password_hash(),
+        "role": Role.PILOT,
+        "display_name": display_name or generated_username,
+        "email": email,
+        "country_code": country_code,
+        "instagram_url": social.get("instagram"),
+        "youtube_url": social.get("youtube"),
+        "website_url": social.get("website"),
+    }
 
 
 class UserRepository(BaseRepository[User]):
@@ -22,15 +138,25 @@ class UserRepository(BaseRepository[User]):
         )
         return result.scalar()
 
-    async def search_by_username(self, query: str) -> Sequence[User]:
-        """Get users by username using a query.
+    async def search_by_username(
+        self, query: str, limit: int = USER_SEARCH_LIMIT
+    ) -> Sequence[User]:
+        """Get users by username or display name using a query.
 
         :param query: The query to search for.
+        :param limit: The maximum number of users to return.
 
-        :return: A list of users that match the query.
+        :return: The best matching users, most similar first.
         """
+        similarity = func.greatest(
+            func.similarity(User.username, query),
+            func.similarity(func.coalesce(User.display_name, ""), query),
+        )
         result = await self.session.execute(
-            select(User).filter(User.username.ilike(f"%{query}%"))
+            select(User)
+            .filter(name_match(query))
+            .order_by(similarity.desc(), User.username)
+            .limit(limit)
         )
         return result.scalars().all()
 
@@ -55,38 +181,105 @@ class UserRepository(BaseRepository[User]):
             user = await self.get_by_email(email)
 
         if user:
-            updated: dict[str, Any] = {}
-            if user.role.value < Role.PILOT.value:
-                updated["role"] = Role.PILOT
-            if display_name and not user.display_name:
-                updated["display_name"] = display_name
-            if email and not user.email:
-                updated["email"] = email
-            if country_code and not user.country_code:
-                updated["country_code"] = country_code
-            if social.get("instagram") and social["instagram"] != user.instagram_url:
-                updated["instagram_url"] = social["instagram"]
-            if social.get("youtube") and social["youtube"] != user.youtube_url:
-                updated["youtube_url"] = social["youtube"]
-            if social.get("website") and social["website"] != user.website_url:
-                updated["website_url"] = social["website"]
-
+            updated = pilot_updates(user, display_name, email, country_code, social)
             if updated:
                 user = await self.update(user, updated)
             return user
 
-        generated_username = username or (email.split("@")[0] if email else "pilot")
-        random_password = secrets.token_urlsafe(16)
-
-        attributes: dict[str, Any] = {
-            "username": generated_username,
-            "password": random_password,
-            "role": Role.PILOT,
-            "display_name": display_name or generated_username,
-            "email": email,
-            "country_code": country_code,
-            "instagram_url": social.get("instagram"),
-            "youtube_url": social.get("youtube"),
-            "website_url": social.get("website"),
-        }
-        return await self.create(attributes)
+        return await self.create(
+            new_pilot_attributes(username, email, display_name, country_code, social)
+        )
+
+    async def award_credits(self, awards: Sequence[dict[str, int]]) -> None:
+        """Record flight credit awards and add them to the users' totals.
+
+        The ledger rows are one insert and the totals one ``UPDATE`` that
+        increments in SQL, so concurrent awards never overwrite each other.
+
+        :param awards: ``user_id``/``flight_id``/``amount`` of each award.
+        """
+        awards = [award for award in awards if award["amount"]]
+        if not awards:
+            return
+        totals: Counter[int] = Counter()
+        for award in awards:
+            totals[award["user_id"]] += award["amount"]
+
+        await self.session.execute(
+            sa.insert(CreditEntry),
+            [{**award, "kind": CreditKind.APPROVAL} for award in awards],
+        )
+        await self.session.execute(
+            sa.update(User)
+            .where(User.id.in_(totals))
+            .values(
+                total_credits=func.coalesce(User.total_credits, 0)
+                + sa.case(dict(totals), value=User.id)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def set_credits(self, user_id: int, total: int) -> None:
+        """Set the total of a user, recording the difference in the ledger.
+
+        :param user_id: The user.
+        :param total: The new total.
+        """
+        previous = (
+            select(User.id, User.total_credits)
+            .where(User.id == user_id)
+            .with_for_update()
+            .subquery("previous")
+        )
+        result = await self.session.execute(
+            sa.update(User)
+            .where(User.id == previous.c.id)
+            .values(total_credits=total)
+            .returning(previous.c.total_credits)
+            .execution_options(synchronize_session=False)
+        )
+        before = result.scalar()
+        if before is not None and before != total:
+            self.session.add(
+                CreditEntry(
+                    user_id=user_id, kind=CreditKind.ADJUSTMENT, amount=total - before
+                )
+            )
+
+    async def reconcile_credits(self) -> int:
+        """Recompute the total of every user from the credit ledger.
+
+        :return: The number of users whose total was wrong.
+        """
+        ledger_total = func.coalesce(
+            select(func.sum(CreditEntry.amount))
+            .where(CreditEntry.user_id == User.id)
+            .scalar_subquery(),
+            0,
+        )
+        result = await self.session.execute(
+            sa.update(User)
+            .where(User.total_credits.is_distinct_from(ledger_total))
+            .values(total_credits=ledger_total)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def get_pilot_candidates(
+        self, usernames: Collection[str], emails: Collection[str]
+    ) -> Sequence[User]:
+        """Get the users matching any of the usernames or emails in one query.
+
+        :param usernames: The usernames to match.
+        :param emails: The emails to match.
+
+        :return: The matching users.
+        """
+        if not usernames and not emails:
+            return []
+        result = await self.session.execute(
+            select(User)
+            .where(sa.or_(User.username.in_(usernames), User.email.in_(emails)))
+        )
+        return result.scalars().all()
@@ -1,9 +1,12 @@
 from .current_user import CurrentUser
-from .health import Health
+from .health import CacheStats, FlightViewStats, Health, LeaderboardCacheStats
 from .token import Token
 
 __all__ = [
     "Token",
     "CurrentUser",
     "Health",
+    "CacheStats",
+    "LeaderboardCacheStats",
+    "FlightViewStats",
 ]
@@ -4,3 +4,32 @@ from pydantic import BaseModel, Field
 class Health(BaseModel):
     version: str = Field(..., example="0.0.1")
     status: str = Field(..., example="OK")
+
+
+class CacheStats(BaseModel):
+    entries: int = Field(..., example=42)
+    hits: int = Field(..., example=1000)
+    misses: int = Field(..., example=100)
+    evictions: int = Field(..., example=0)
+    expirations: int = Field(..., example=58)
+    invalidations: int = Field(..., example=12)
+    stale_sets: int = Field(..., example=0)
+
+
+class LeaderboardCacheStats(BaseModel):
+    entries: int = Field(..., example=12)
+    hits: int = Field(..., example=1000)
+    stale_hits: int = Field(..., example=40)
+    misses: int = Field(..., example=12)
+    evictions: int = Field(..., example=0)
+    refreshes: int = Field(..., example=52)
+    refresh_failures: int = Field(..., example=0)
+
+
+class FlightViewStats(BaseModel):
+    pending_keys: int = Field(..., example=120)
+    pending: int = Field(..., example=3400)
+    written: int = Field(..., example=250000)
+    flushes: int = Field(..., example=360)
+    flush_failures: int = Field(..., example=0)
+    dropped: int = Field(..., example=0)
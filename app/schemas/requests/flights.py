@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import enum
+from typing import Any
+
 from pydantic import AnyHttpUrl, BaseModel, EmailStr, Field
 
 from app.models.flight import FlightStatus, FlightTheme
 
+FLIGHT_BATCH_LIMIT = 500
+
 
 class PilotSubmission(BaseModel):
     username: str | None = Field(
@@ -54,7 +59,19 @@ class FlightSubmissionRequest(BaseModel):
         default=None,
         min_length=2,
         max_length=2,
-        description="ISO 3166-1 alpha-2 country code (optional; can be derived later).",
+        description="ISO 3166-1 alpha-2 country code; derived from lat/lng if omitted.",
+    )
+
+
+class FlightBatchSubmissionRequest(BaseModel):
+    flights: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=FLIGHT_BATCH_LIMIT,
+        description=(
+            "FlightSubmissionRequest items. Each one is validated on its own, "
+            "so an invalid item doesn't reject the others."
+        ),
     )
 
 
@@ -73,3 +90,24 @@ class FlightUpdateRequest(BaseModel):
     rejected_reason: str | None = None
     pilot_id: int | None = None
 
+
+class ModerationAction(str, enum.Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+
+
+class FlightModerationItem(BaseModel):
+    id: int
+    action: ModerationAction
+    credits: int | None = Field(
+        default=None,
+        ge=0,
+        description="Credits awarded on approval; defaults to the flight's credits.",
+    )
+    rejected_reason: str | None = Field(default=None, max_length=255)
+
+
+class FlightModerationRequest(BaseModel):
+    items: list[FlightModerationItem] = Field(
+        ..., min_length=1, max_length=FLIGHT_BATCH_LIMIT
+    )
@@ -48,6 +48,37 @@ class FlightResponse(BaseResponse):
         from_attributes = True
 
 
+class FlightBatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    id: int | None = Field(default=None, description="The created flight")
+    error: str | None = Field(default=None, description="Why the item was skipped")
+
+
+class FlightBatchResponse(BaseModel):
+    created: int
+    failed: int
+    items: list[FlightBatchItemResult]
+
+
+class FlightModerationResult(BaseModel):
+    id: int
+    status: FlightStatus | None = Field(default=None, description="The status now")
+    updated: bool = Field(default=False, description="Whether this request changed it")
+    error: str | None = None
+
+
+class FlightModerationResponse(BaseModel):
+    updated: int = Field(..., description="Number of flights whose status changed")
+    failed: int
+    items: list[FlightModerationResult]
+
+
+class FlightStatusCountsResponse(BaseModel):
+    pending: int = 0
+    approved: int = 0
+    rejected: int = 0
+
+
 class FlightSummary(BaseModel):
     id: int
     title: str | None = None
@@ -61,3 +92,23 @@ class FlightSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FlightClusterResponse(BaseModel):
+    count: int = Field(..., description="Number of flights in the cell")
+    lat: float = Field(..., description="Centroid latitude")
+    lng: float = Field(..., description="Centroid longitude")
+    sample_flight_id: int = Field(..., description="One flight inside the cell")
+
+
+class FacetValueCount(BaseModel):
+    value: str | None = Field(..., description="Facet value; null for flights without one")
+    count: int
+
+
+class FlightTagCountResponse(BaseModel):
+    tag: str
+    count: int = Field(
+        ...,
+        description="Approved flights with the tag, and with the requested tag if any",
+    )
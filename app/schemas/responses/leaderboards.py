@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PilotLeaderboardEntry(BaseModel):
@@ -8,7 +8,7 @@ class PilotLeaderboardEntry(BaseModel):
     username: str | None = None
     display_name: str | None = None
     country_code: str | None = None
-    rank: int
+    rank: int = Field(..., description="Dense rank; tied pilots share it")
     metric_value: int
     flights_count: int
     total_credits: int
@@ -17,9 +17,29 @@ class PilotLeaderboardEntry(BaseModel):
 
 class CountryLeaderboardEntry(BaseModel):
     country_code: str | None
-    rank: int
+    rank: int = Field(..., description="Dense rank; tied countries share it")
     metric_value: int
     flights_count: int
     unique_pilots: int
     total_credits: int
     total_views: int
+
+
+class PilotRankResponse(BaseModel):
+    entry: PilotLeaderboardEntry
+    above: list[PilotLeaderboardEntry] = Field(
+        default_factory=list, description="Better placed pilots, best first"
+    )
+    below: list[PilotLeaderboardEntry] = Field(
+        default_factory=list, description="Lower placed pilots, best first"
+    )
+
+
+class CountryRankResponse(BaseModel):
+    entry: CountryLeaderboardEntry
+    above: list[CountryLeaderboardEntry] = Field(
+        default_factory=list, description="Better placed countries, best first"
+    )
+    below: list[CountryLeaderboardEntry] = Field(
+        default_factory=list, description="Lower placed countries, best first"
+    )
@@ -0,0 +1,78 @@
+"""Compare the ORM and row projection read paths of the public flight list.
+
+Both paths read the same page of approved flights and serialize it through
+``FlightResponse`` the way ``GET /flights`` does. Run against a seeded
+database (``python -m cli fake ...``)::
+
+    python -m benchmarks.flight_list --limit 1000 --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app.models import Flight
+from app.repositories import FlightRepository
+from app.schemas.responses.flights import FlightResponse
+from core.config import config
+
+FLIGHT_LIST = TypeAdapter(list[FlightResponse])
+
+
+async def orm_page(repository: FlightRepository, limit: int) -> list:
+    """The list query as it was before the row projection."""
+    query = select(Flight).options(selectinload(Flight.pilot))
+    query = repository._public_query(query, None, None)
+    query = query.order_by(Flight.created_at.desc(), Flight.id.desc()).limit(limit)
+    result = await repository.session.execute(query)
+    return result.scalars().all()
+
+
+async def row_page(repository: FlightRepository, limit: int) -> list:
+    return await repository.list_public(bbox=None, filters=None, limit=limit, offset=0)
+
+
+async def measure(async_session, read_page, limit: int, rounds: int) -> float:
+    """Return the rows per second read and serialized by ``read_page``."""
+    total_rows = 0
+    elapsed = 0.0
+    for _ in range(rounds):
+        # A fresh session per round keeps the identity map from serving
+        # already hydrated flights.
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            started = time.perf_counter()
+            page = await read_page(repository, limit)
+            FLIGHT_LIST.dump_json(FLIGHT_LIST.validate_python(page, from_attributes=True))
+            elapsed += time.perf_counter() - started
+        total_rows += len(page)
+    return total_rows / elapsed if elapsed else 0.0
+
+
+async def main(limit: int, rounds: int) -> None:
+    engine = create_async_engine(str(config.SQLALCHEMY_DATABASE_URI))
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        # One untimed round each to warm the connection pool and caches.
+        for read_page in (orm_page, row_page):
+            await measure(async_session, read_page, limit, 1)
+        for name, read_page in (("orm", orm_page), ("rows", row_page)):
+            rate = await measure(async_session, read_page, limit, rounds)
+            print(f"{name:>5}: {rate:,.0f} rows/s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1000, help="Flights per page")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed rounds per path")
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.rounds))
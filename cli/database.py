@@ -6,7 +6,8 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.models import Base, Role, User
+from app.models import Base, Flight, Role, User
+from app.repositories import FlightRepository, UserRepository
 from core.config import config
 from core.database.migration import prepare_database
 
@@ -88,6 +89,127 @@ async def async_view():
             print(table)
 
 
+async def async_backfill_geo_cells(batch_size: int):
+    """Helper function to populate missing flight geo cells asynchronously.
+
+    :param batch_size: The number of flights to update per statement.
+    """
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            updated = await repository.backfill_geo_cells(batch_size)
+    finally:
+        await engine.dispose()
+    print(f"Geo cells populated for {updated} flights.")
+
+
+async def async_backfill_search_vectors(batch_size: int):
+    """Helper function to populate missing flight search vectors asynchronously.
+
+    :param batch_size: The number of flights to update per statement.
+    """
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            updated = await repository.backfill_search_vectors(batch_size)
+    finally:
+        await engine.dispose()
+    print(f"Search vectors populated for {updated} flights.")
+
+
+async def async_backfill_country_codes(batch_size: int, workers: int):
+    """Helper function to derive missing flight country codes asynchronously.
+
+    :param batch_size: The number of flights to read per statement.
+    :param workers: The number of id ranges backfilled at the same time.
+    """
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def backfill(first_id: int, last_id: int) -> int:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            return await repository.backfill_country_codes(
+                first_id, last_id, batch_size
+            )
+
+    try:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            id_range = await repository.missing_country_id_range()
+        updated = 0
+        if id_range:
+            first, last = id_range
+            step = (last - first) // workers + 1
+            counts = await asyncio.gather(
+                *(
+                    backfill(low, min(low + step - 1, last))
+                    for low in range(first, last + 1, step)
+                )
+            )
+            updated = sum(counts)
+    finally:
+        await engine.dispose()
+    print(f"Country codes derived for {updated} flights.")
+
+
+async def async_rebuild_tag_stats():
+    """Helper function to recompute the flight tag statistics asynchronously."""
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            tags = await repository.rebuild_tag_stats()
+    finally:
+        await engine.dispose()
+    print(f"Tag statistics rebuilt for {tags} tags.")
+
+
+async def async_rebuild_rollups():
+    """Helper function to recompute the daily flight rollups asynchronously."""
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            rows = await repository.rebuild_rollups()
+    finally:
+        await engine.dispose()
+    print(f"Daily rollups rebuilt ({rows} rows).")
+
+
+async def async_rebuild_status_counts():
+    """Helper function to recount the flights of each status asynchronously."""
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            repository = FlightRepository(Flight, session)
+            counts = await repository.rebuild_status_counts()
+    finally:
+        await engine.dispose()
+    summary = ", ".join(f"{status.value}: {count}" for status, count in counts.items())
+    print(f"Status counts rebuilt ({summary}).")
+
+
+async def async_reconcile_credits():
+    """Helper function to recompute user credit totals from the ledger asynchronously."""
+    engine = get_async_engine()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            repository = UserRepository(User, session)
+            corrected = await repository.reconcile_credits()
+    finally:
+        await engine.dispose()
+    print(f"Credit totals corrected for {corrected} users.")
+
+
 @app.command()
 def init():
     """Initialize the database."""
@@ -109,5 +231,50 @@ def view():
     asyncio.run(async_view())
 
 
+@app.command("backfill-geo-cells")
+def backfill_geo_cells(batch_size: int = typer.Option(1000, min=1)):
+    """Populate the spatial cell key of flights created before it existed."""
+    asyncio.run(async_backfill_geo_cells(batch_size))
+
+
+@app.command("backfill-search-vectors")
+def backfill_search_vectors(batch_size: int = typer.Option(1000, min=1)):
+    """Populate the full-text search vector of flights created before it existed."""
+    asyncio.run(async_backfill_search_vectors(batch_size))
+
+
+@app.command("backfill-country-codes")
+def backfill_country_codes(
+    batch_size: int = typer.Option(1000, min=1),
+    workers: int = typer.Option(4, min=1),
+):
+    """Derive the country of flights submitted without one from their coordinates."""
+    asyncio.run(async_backfill_country_codes(batch_size, workers))
+
+
+@app.command("rebuild-tag-stats")
+def rebuild_tag_stats():
+    """Recompute the tag counts and co-occurrences of approved flights."""
+    asyncio.run(async_rebuild_tag_stats())
+
+
+@app.command("rebuild-rollups")
+def rebuild_rollups():
+    """Recompute the daily flight rollups behind the leaderboards."""
+    asyncio.run(async_rebuild_rollups())
+
+
+@app.command("rebuild-status-counts")
+def rebuild_status_counts():
+    """Recount the flights of each status behind the moderation counters."""
+    asyncio.run(async_rebuild_status_counts())
+
+
+@app.command("reconcile-credits")
+def reconcile_credits():
+    """Recompute every user's credit total from the credit ledger."""
+    asyncio.run(async_reconcile_credits())
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,26 @@
+from core.cache.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    cache_key,
+    response_cache,
+)
+from core.cache.stale_cache import (
+    StaleCache,
+    StaleEntry,
+    leaderboard_cache,
+    viewable_flights,
+)
+from core.cache.write_behind import WriteBehindCounter, flight_views
+
+__all__ = [
+    "CachedResponse",
+    "ResponseCache",
+    "StaleCache",
+    "StaleEntry",
+    "WriteBehindCounter",
+    "cache_key",
+    "flight_views",
+    "leaderboard_cache",
+    "response_cache",
+    "viewable_flights",
+]
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import gzip
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from starlette.responses import Response
+
+from core.config import config
+
+GZIP_LEVEL = 6
+# Appended inside the quotes of a strong ETag for the gzip representation.
+GZIP_ETAG_SUFFIX = "-gzip"
+
+
+def cache_key(*parts: Hashable, **params: Any) -> tuple:
+    """Build a cache key that ignores parameter order and unset values.
+
+    :param parts: Positional key parts, e.g. the endpoint name.
+    :param params: Request parameters; ``None`` values are dropped, enums are
+        reduced to their values and lists to sorted tuples.
+
+    :return: A hashable key.
+    """
+    normalized = []
+    for name, value in sorted(params.items()):
+        if value is None:
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, list | set):
+            value = tuple(sorted(value))
+        normalized.append((name, value))
+    return (*parts, tuple(normalized))
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    gzip_body: bytes
+    headers: Mapping[str, str]
+    expires_at: float
+    depends_on: Callable[[Any], bool] = field(repr=False)
+    # The table versions the body was read at, for its ETag.
+    versions: Mapping[str, int] | None = None
+
+    def render(
+        self,
+        accept_encoding: str | None,
+        hit: bool,
+        headers: Mapping[str, str] | None = None,
+    ) -> Response:
+        """Build the HTTP response, compressed if the client accepts gzip.
+
+        :param accept_encoding: The request's ``Accept-Encoding`` header.
+        :param hit: Whether the entry was served from the cache.
+        :param headers: Per-request headers, e.g. the validators.
+
+        :return: The response.
+        """
+        headers = {**self.headers, **(headers or {}), "Vary": "Accept-Encoding"}
+        headers["X-Cache"] = "HIT" if hit else "MISS"
+        body = self.body
+        if accept_encoding and "gzip" in accept_encoding.lower():
+            body = self.gzip_body
+            headers["Content-Encoding"] = "gzip"
+            if etag := headers.get("ETag"):
+                # A strong ETag names one representation, not the content.
+                headers["ETag"] = etag[:-1] + GZIP_ETAG_SUFFIX + '"'
+        return Response(body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """In-process LRU cache of encoded response bodies with a TTL.
+
+    Every entry carries a ``depends_on`` predicate; :meth:`invalidate` drops
+    the entries whose predicate accepts the changed object.
+
+    A body read while a write commits may reach :meth:`set` after that
+    write's invalidation. Readers take :attr:`generation` before reading and
+    pass it to :meth:`set`, which refuses bodies read before an invalidation.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+        self.generation = 0
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        """Return the live entry for ``key`` and mark it recently used.
+
+        :param key: The cache key.
+
+        :return: The entry, or ``None`` if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        key: Hashable,
+        body: bytes,
+        depends_on: Callable[[Any], bool],
+        headers: Mapping[str, str] | None = None,
+        versions: Mapping[str, int] | None = None,
+        generation: int | None = None,
+    ) -> CachedResponse:
+        """Store a response body, evicting the least recently used entries.
+
+        :param key: The cache key.
+        :param body: The encoded response body.
+        :param depends_on: Returns whether a changed object affects the entry.
+        :param headers: Extra response headers to replay with the body.
+        :param versions: The table versions the body was read at.
+        :param generation: :attr:`generation` before the body was read; the
+            body isn't stored if anything was invalidated since.
+
+        :return: The entry, stored unless it may be stale.
+        """
+        entry = CachedResponse(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=GZIP_LEVEL),
+            headers=dict(headers or {}),
+            expires_at=self.clock() + self.ttl,
+            depends_on=depends_on,
+            versions=versions,
+        )
+        if generation is not None and generation != self.generation:
+            self.stale_sets += 1
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, changed: Any) -> int:
+        """Drop every entry that depends on ``changed``.
+
+        :param changed: The changed object, passed to each entry's predicate.
+
+        :return: The number of entries dropped.
+        """
+        self.generation += 1
+        stale = [key for key, entry in self._entries.items() if entry.depends_on(changed)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache counters and current size."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_sets": self.stale_sets,
+        }
+
+
+response_cache: ResponseCache = ResponseCache(
+    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=config.RESPONSE_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class StaleEntry(Generic[T]):
+    value: T
+    version: Any
+    fresh_until: float
+
+
+class StaleCache:
+    """In-process LRU cache that serves stale values while refreshing them.
+
+    A value is fresh until its TTL passes. A stale value is returned at once
+    and one background task per key reloads it. If the reload fails, the last
+    good value keeps being served, so a slow or unavailable database only
+    delays freshness.
+
+    Loaders run after the request that triggered them has finished, so they
+    must not use the request's database session.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, StaleEntry] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    async def get(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[T]],
+        version: Any = None,
+    ) -> StaleEntry[T]:
+        """Return the entry for ``key``, loading it only if there is none.
+
+        :param key: The cache key.
+        :param load: Loads a fresh value.
+        :param version: The current version of the data behind the value,
+            stored with the entry when it is (re)loaded.
+
+        :return: The entry; possibly stale, with the version it was loaded at.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            # Concurrent misses share one load.
+            return await asyncio.shield(self._start_load(key, load, version))
+
+        self._entries.move_to_end(key)
+        if entry.fresh_until > self.clock():
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+            self.refresh(key, load, version)
+        return entry
+
+    def refresh(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]], version: Any = None
+    ) -> None:
+        """Reload ``key`` in the background unless a load is already running.
+
+        :param key: The cache key.
+        :param load: Loads a fresh value.
+        :param version: The version the value is loaded at.
+        """
+        task = self._start_load(key, load, version)
+        task.add_done_callback(self._log_failure)
+
+    def _start_load(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]], version: Any
+    ) -> asyncio.Task:
+        if (task := self._loading.get(key)) is None:
+            task = asyncio.ensure_future(self._load(key, load, version))
+            self._loading[key] = task
+        return task
+
+    async def _load(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]], version: Any
+    ) -> StaleEntry:
+        self.refreshes += 1
+        try:
+            value = await load()
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        finally:
+            del self._loading[key]
+
+        entry = StaleEntry(value, version, self.clock() + self.ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and (error := task.exception()):
+            logger.warning("Cache refresh failed; serving the last value: %r", error)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache counters and current size."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+leaderboard_cache: StaleCache = StaleCache(
+    max_entries=config.LEADERBOARD_CACHE_MAX_ENTRIES,
+    ttl=config.LEADERBOARD_CACHE_TTL_SECONDS,
+)
+
+viewable_flights: StaleCache = StaleCache(
+    max_entries=config.VIEWABLE_FLIGHTS_CACHE_MAX_ENTRIES,
+    ttl=config.VIEWABLE_FLIGHTS_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindCounter:
+    """In-process counters written to the database in periodic batches.
+
+    ``add`` only bumps an in-memory counter, so hot rows aren't updated once
+    per increment. The pending counts are handed to the writer every
+    ``interval`` seconds, or as soon as ``max_keys`` keys are pending, and on
+    ``stop``. A failed batch is merged back and retried with the next periodic
+    flush; until then no early flush is attempted. While the writer keeps
+    failing, increments of new keys beyond ``capacity`` are dropped and
+    counted. A crash loses everything still pending: one interval of
+    increments while the writer works, but up to ``capacity`` keys of
+    increments from all the failed intervals while it doesn't.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_keys: int,
+        capacity: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval
+        self.max_keys = max_keys
+        self.capacity = capacity or 10 * max_keys
+        self.clock = clock
+        self._pending: dict[Hashable, int] = {}
+        self._retry_at = 0.0
+        self._write: Callable[[dict[Hashable, int]], Awaitable[Any]] | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._early_flush: asyncio.Task | None = None
+        self.written = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.dropped = 0
+
+    def add(self, key: Hashable, amount: int = 1) -> None:
+        """Count ``amount`` more for ``key``.
+
+        :param key: The counted key, e.g. a flight id.
+        :param amount: The increment.
+        """
+        if key not in self._pending and len(self._pending) >= self.capacity:
+            self.dropped += amount
+            return
+        self._pending[key] = self._pending.get(key, 0) + amount
+        if (
+            len(self._pending) >= self.max_keys
+            and self._write is not None
+            and (self._early_flush is None or self._early_flush.done())
+            and self.clock() >= self._retry_at
+        ):
+            self._early_flush = asyncio.ensure_future(self.flush())
+            self._early_flush.add_done_callback(self._log_failure)
+
+    def start(self, write: Callable[[dict[Hashable, int]], Awaitable[Any]]) -> None:
+        """Start flushing the pending counts in the background.
+
+        :param write: Writes a batch of ``{key: increment}``; it must open its
+            own database session.
+        """
+        self._write = write
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flushes and write what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.error(
+                "Lost %d pending counts on shutdown",
+                sum(self._pending.values()),
+                exc_info=True,
+            )
+
+    async def flush(self) -> int:
+        """Write the pending counts as one batch.
+
+        :return: The number of keys written.
+        """
+        async with self._lock:
+            if not self._pending or self._write is None:
+                return 0
+            batch, self._pending = self._pending, {}
+            self.flushes += 1
+            try:
+                await self._write(batch)
+            except BaseException:
+                # Counted since the batch was taken; merge them back.
+                self.flush_failures += 1
+                self._retry_at = self.clock() + self.interval
+                for key, amount in batch.items():
+                    self._pending[key] = self._pending.get(key, 0) + amount
+                raise
+            self.written += sum(batch.values())
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.warning("Counter flush failed; retrying", exc_info=True)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and (error := task.exception()):
+            logger.warning("Counter flush failed; retrying: %r", error)
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the buffer."""
+        return {
+            "pending_keys": len(self._pending),
+            "pending": sum(self._pending.values()),
+            "written": self.written,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "dropped": self.dropped,
+        }
+
+
+flight_views: WriteBehindCounter = WriteBehindCounter(
+    interval=config.FLIGHT_VIEWS_FLUSH_SECONDS,
+    max_keys=config.FLIGHT_VIEWS_MAX_PENDING,
+)
@@ -32,6 +32,15 @@ class Config(BaseSettings):
     ADMIN_USERNAME: str
     ADMIN_PASSWORD: str
 
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    LEADERBOARD_CACHE_MAX_ENTRIES: int = 256
+    LEADERBOARD_CACHE_TTL_SECONDS: float = 60.0
+    FLIGHT_VIEWS_FLUSH_SECONDS: float = 5.0
+    FLIGHT_VIEWS_MAX_PENDING: int = 10_000
+    VIEWABLE_FLIGHTS_CACHE_MAX_ENTRIES: int = 50_000
+    VIEWABLE_FLIGHTS_CACHE_TTL_SECONDS: float = 300.0
+
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -41,17 +41,22 @@ class BaseController(Generic[ModelType]):
         return await self.repository.get_all(skip, limit)
 
     async def get_filtered(
-        self, filters: dict[str, Any] | None = None, skip: int = 0, limit: int = 100
+        self,
+        filters: dict[str, Any] | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Sequence[str] | None = None,
     ) -> Sequence[ModelType]:
         """Retrieves a filtered list of model instances based on provided filters.
 
         :param filters: A dictionary where keys are the model fields and values are the values to filter by.
         :param skip: The number of records to skip.
         :param limit: The number of records to return.
+        :param fields: Only load these columns of each record.
 
         :return: A list of model instances.
         """
-        return await self.repository.get_filtered(filters, skip, limit)
+        return await self.repository.get_filtered(filters, skip, limit, fields=fields)
 
     async def get_by_id(self, id_: int) -> ModelType | None:
         """Returns the model instance matching the id.
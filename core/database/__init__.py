@@ -1,6 +1,8 @@
 from core.database.session import (
     Base,
+    async_session_factory,
     get_session,
+    reader_session_factory,
     reset_session_context,
     session,
     set_session_context,
@@ -10,6 +12,8 @@ __all__ = [
     "Base",
     "session",
     "get_session",
+    "async_session_factory",
+    "reader_session_factory",
     "set_session_context",
     "reset_session_context",
 ]
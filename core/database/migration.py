@@ -10,11 +10,280 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.models import Base
+from app.models.flight import SEARCH_CONFIG
+from app.models.table_version import VIEWS_VERSION
 from core.config import config
 
 logger = logging.getLogger(__name__)
 DEFAULT_DB_NAME = "postgres"
 
+# Tables whose writes bump their row in ``table_versions``.
+VERSIONED_TABLES: tuple[str, ...] = ("flights", "users")
+
+# Columns whose updates alone don't bump the version. View counts are
+# flushed every few seconds (see ``FlightRepository.add_views``); bumping
+# for them would change every flights ETag as often. They bump
+# ``VIEWS_VERSION`` instead, which only the rankings depend on.
+UNVERSIONED_COLUMNS: dict[str, tuple[str, ...]] = {
+    "flights": ("views", "updated_at"),
+}
+
+
+def _versioned_events(table: str) -> str:
+    """Return the trigger events of writes that bump ``table``'s version."""
+    unversioned = UNVERSIONED_COLUMNS.get(table)
+    if not unversioned:
+        return "INSERT OR UPDATE OR DELETE OR TRUNCATE"
+    columns = ", ".join(
+        column.name
+        for column in Base.metadata.tables[table].columns
+        if column.name not in unversioned
+    )
+    return f"INSERT OR UPDATE OF {columns} OR DELETE OR TRUNCATE"
+
+
+# Extensions the models depend on, created before ``create_all``.
+SCHEMA_PREREQUISITES: tuple[str, ...] = ("CREATE EXTENSION IF NOT EXISTS pg_trgm",)
+
+# Idempotent DDL applied after ``create_all``. ``create_all`` only creates
+# missing tables, so columns and indexes added to existing tables go here.
+SCHEMA_UPGRADES: tuple[str, ...] = (
+    "CREATE INDEX IF NOT EXISTS ix_flights_status_created_at_id "
+    "ON flights (status, created_at, id)",
+    "ALTER TABLE flights ADD COLUMN IF NOT EXISTS geo_cell BIGINT",
+    "CREATE INDEX IF NOT EXISTS ix_flights_geo_cell ON flights (geo_cell)",
+    "ALTER TABLE flights ADD COLUMN IF NOT EXISTS search_vector TSVECTOR",
+    "CREATE INDEX IF NOT EXISTS ix_flights_search_vector "
+    "ON flights USING gin (search_vector)",
+    f"""
+    CREATE OR REPLACE FUNCTION flights_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A')
+            || setweight(
+                to_tsvector(
+                    '{SEARCH_CONFIG}', coalesce(array_to_string(NEW.tags, ' '), '')
+                ),
+                'B'
+            )
+            || setweight(
+                to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'C'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS flights_search_vector ON flights",
+    "CREATE TRIGGER flights_search_vector "
+    "BEFORE INSERT OR UPDATE OF title, description, tags ON flights "
+    "FOR EACH ROW EXECUTE FUNCTION flights_search_vector()",
+    "CREATE INDEX IF NOT EXISTS ix_users_username_trgm "
+    "ON users USING gin (username gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_display_name_trgm "
+    "ON users USING gin (display_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_username_lower "
+    "ON users (lower(username) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_display_name_lower "
+    "ON users (lower(display_name) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_flights_tags ON flights USING gin (tags)",
+    # Keeps flight_tag_counts and flight_tag_pairs in step with the tags of
+    # approved flights. Only the difference between the old and new tag sets
+    # is applied, in tag order so concurrent writers lock rows consistently.
+    """
+    CREATE OR REPLACE FUNCTION flights_tag_stats() RETURNS trigger AS $$
+    DECLARE
+        old_tags varchar[] := '{}';
+        new_tags varchar[] := '{}';
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.status = 'APPROVED' THEN
+            old_tags := ARRAY(SELECT DISTINCT t FROM unnest(OLD.tags) t ORDER BY t);
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.status = 'APPROVED' THEN
+            new_tags := ARRAY(SELECT DISTINCT t FROM unnest(NEW.tags) t ORDER BY t);
+        END IF;
+        IF old_tags = new_tags THEN
+            RETURN NULL;
+        END IF;
+
+        INSERT INTO flight_tag_counts AS c (tag, count)
+        SELECT tag, sum(delta) FROM (
+            SELECT unnest(old_tags) AS tag, -1 AS delta
+            UNION ALL
+            SELECT unnest(new_tags), 1
+        ) d
+        GROUP BY tag HAVING sum(delta) <> 0 ORDER BY tag
+        ON CONFLICT (tag) DO UPDATE SET count = c.count + EXCLUDED.count;
+
+        INSERT INTO flight_tag_pairs AS p (tag, other_tag, count)
+        SELECT tag, other_tag, sum(delta) FROM (
+            SELECT a.tag, b.tag AS other_tag, -1 AS delta
+            FROM unnest(old_tags) a(tag), unnest(old_tags) b(tag)
+            WHERE a.tag <> b.tag
+            UNION ALL
+            SELECT a.tag, b.tag, 1
+            FROM unnest(new_tags) a(tag), unnest(new_tags) b(tag)
+            WHERE a.tag <> b.tag
+        ) d
+        GROUP BY tag, other_tag HAVING sum(delta) <> 0 ORDER BY tag, other_tag
+        ON CONFLICT (tag, other_tag) DO UPDATE SET count = p.count + EXCLUDED.count;
+
+        DELETE FROM flight_tag_counts
+        WHERE tag = ANY(old_tags) AND count <= 0;
+        DELETE FROM flight_tag_pairs
+        WHERE tag = ANY(old_tags) AND count <= 0;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS flights_tag_stats ON flights",
+    "CREATE TRIGGER flights_tag_stats "
+    "AFTER INSERT OR DELETE OR UPDATE OF status, tags ON flights "
+    "FOR EACH ROW EXECUTE FUNCTION flights_tag_stats()",
+    # Keeps flight_status_counts in step with the flights table.
+    """
+    CREATE OR REPLACE FUNCTION flights_status_counts() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE flight_status_counts SET count = count - 1
+            WHERE status = OLD.status;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO flight_status_counts AS c (status, count)
+            VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = c.count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS flights_status_counts ON flights",
+    "CREATE TRIGGER flights_status_counts "
+    "AFTER INSERT OR DELETE OR UPDATE OF status ON flights "
+    "FOR EACH ROW EXECUTE FUNCTION flights_status_counts()",
+    # Counts the flights written before the trigger existed. Once a flight
+    # exists the counters are never empty, so this is a no-op afterwards.
+    """
+    INSERT INTO flight_status_counts (status, count)
+    SELECT status, count(*) FROM flights
+    WHERE NOT EXISTS (SELECT 1 FROM flight_status_counts)
+    GROUP BY status
+    """,
+    # Keeps flight_daily_rollups in step with the approved flights: the old
+    # state of a row is taken out of its rollup and the new one added.
+    """
+    CREATE OR REPLACE FUNCTION flights_daily_rollup() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.status = 'APPROVED' THEN
+            INSERT INTO flight_daily_rollups AS r
+                (day, pilot_id, country_code, flights, credits, views)
+            VALUES (
+                OLD.created_at::date,
+                coalesce(OLD.pilot_id, 0),
+                coalesce(OLD.country_code, ''),
+                -1,
+                -coalesce(OLD.credits, 0),
+                -coalesce(OLD.views, 0)
+            )
+            ON CONFLICT (day, pilot_id, country_code) DO UPDATE SET
+                flights = r.flights + EXCLUDED.flights,
+                credits = r.credits + EXCLUDED.credits,
+                views = r.views + EXCLUDED.views;
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.status = 'APPROVED' THEN
+            INSERT INTO flight_daily_rollups AS r
+                (day, pilot_id, country_code, flights, credits, views)
+            VALUES (
+                NEW.created_at::date,
+                coalesce(NEW.pilot_id, 0),
+                coalesce(NEW.country_code, ''),
+                1,
+                coalesce(NEW.credits, 0),
+                coalesce(NEW.views, 0)
+            )
+            ON CONFLICT (day, pilot_id, country_code) DO UPDATE SET
+                flights = r.flights + EXCLUDED.flights,
+                credits = r.credits + EXCLUDED.credits,
+                views = r.views + EXCLUDED.views;
+        END IF;
+        IF TG_OP <> 'INSERT' AND OLD.status = 'APPROVED' THEN
+            DELETE FROM flight_daily_rollups
+            WHERE day = OLD.created_at::date
+              AND pilot_id = coalesce(OLD.pilot_id, 0)
+              AND country_code = coalesce(OLD.country_code, '')
+              AND flights <= 0;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS flights_daily_rollup ON flights",
+    "CREATE TRIGGER flights_daily_rollup "
+    "AFTER INSERT OR DELETE "
+    "OR UPDATE OF status, pilot_id, country_code, credits, views, created_at "
+    "ON flights FOR EACH ROW EXECUTE FUNCTION flights_daily_rollup()",
+    # Rolls up the flights approved before the trigger existed. Once a
+    # flight is approved the rollups are never empty, so this is a no-op
+    # afterwards.
+    """
+    INSERT INTO flight_daily_rollups
+        (day, pilot_id, country_code, flights, credits, views)
+    SELECT created_at::date, coalesce(pilot_id, 0), coalesce(country_code, ''),
+           count(*), coalesce(sum(credits), 0), coalesce(sum(views), 0)
+    FROM flights
+    WHERE status = 'APPROVED'
+      AND NOT EXISTS (SELECT 1 FROM flight_daily_rollups)
+    GROUP BY 1, 2, 3
+    """,
+    # Opens the credit ledger with the totals kept before it existed; users
+    # with entries are skipped, so this is a no-op afterwards.
+    """
+    INSERT INTO credit_entries (user_id, kind, amount, created_at)
+    SELECT u.id, 'OPENING_BALANCE', u.total_credits, now() AT TIME ZONE 'utc'
+    FROM users u
+    WHERE u.total_credits <> 0
+      AND NOT EXISTS (SELECT 1 FROM credit_entries e WHERE e.user_id = u.id)
+    """,
+    # Country codes are written upper-case; this folds older rows, and the
+    # rollup trigger moves their totals along. A no-op afterwards.
+    "UPDATE flights SET country_code = upper(country_code) "
+    "WHERE country_code <> upper(country_code)",
+    "UPDATE users SET country_code = upper(country_code) "
+    "WHERE country_code <> upper(country_code)",
+    "CREATE INDEX IF NOT EXISTS ix_flights_country_code_status_created_at "
+    "ON flights (country_code, status, created_at)",
+    # Superseded by the index above, which has country_code as its prefix.
+    "DROP INDEX IF EXISTS ix_flights_country_code",
+    # The bump commits with the write itself, so a version is never visible
+    # before the data it stands for. A trigger argument names a version other
+    # than the table's own.
+    """
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO table_versions AS v (name, version)
+        VALUES (coalesce(TG_ARGV[0], TG_TABLE_NAME), 1)
+        ON CONFLICT (name) DO UPDATE SET version = v.version + 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        statement
+        for table in VERSIONED_TABLES
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_table_version ON {table}",
+            f"CREATE TRIGGER {table}_table_version "
+            f"AFTER {_versioned_events(table)} ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+        )
+    ),
+    "DROP TRIGGER IF EXISTS flights_views_version ON flights",
+    "CREATE TRIGGER flights_views_version AFTER UPDATE OF views ON flights "
+    f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version('{VIEWS_VERSION}')",
+)
+
 
 def _build_sync_url() -> URL:
     """Convert the configured async URL into a sync-compatible one."""
@@ -71,7 +340,11 @@ async def run_schema_migrations() -> None:
     engine = create_async_engine(str(config.SQLALCHEMY_DATABASE_URI))
     try:
         async with engine.begin() as connection:
+            for statement in SCHEMA_PREREQUISITES:
+                await connection.execute(text(statement))
             await connection.run_sync(Base.metadata.create_all)
+            for statement in SCHEMA_UPGRADES:
+                await connection.execute(text(statement))
         logger.info("Database schema is up to date.")
     finally:
         await engine.dispose()
@@ -57,6 +57,13 @@ async_session_factory = sessionmaker(
     expire_on_commit=False,
 )
 
+# Sessions holding a single reader connection, for reads run side by side.
+reader_session_factory = sessionmaker(
+    class_=AsyncSession,
+    bind=engines["reader"],
+    expire_on_commit=False,
+)
+
 session: AsyncSession | async_scoped_session = async_scoped_session(
     session_factory=async_session_factory,
     scopefunc=get_session_context,
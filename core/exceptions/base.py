@@ -33,3 +33,13 @@ class ForbiddenException(CustomException):
     status_code = HTTPStatus.FORBIDDEN
     message = HTTPStatus.FORBIDDEN.name
     description = HTTPStatus.FORBIDDEN.description
+
+
+class NotModifiedException(CustomException):
+    status_code = HTTPStatus.NOT_MODIFIED
+    message = HTTPStatus.NOT_MODIFIED.name
+    description = HTTPStatus.NOT_MODIFIED.description
+
+    def __init__(self, headers=None):
+        super().__init__()
+        self.headers = headers or {}
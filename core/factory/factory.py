@@ -5,6 +5,12 @@ from fastapi import Depends
 from app.controllers import FlightController, UserController
 from app.models import Flight, User
 from app.repositories import FlightRepository, UserRepository
+from core.cache import (
+    flight_views,
+    leaderboard_cache,
+    response_cache,
+    viewable_flights,
+)
 from core.database import get_session
 
 
@@ -21,4 +27,8 @@ class Factory:
         return FlightController(
             flight_repository=self.flight_repository(db_session=db_session),
             user_repository=self.user_repository(db_session=db_session),
+            response_cache=response_cache,
+            leaderboard_cache=leaderboard_cache,
+            flight_views=flight_views,
+            viewable_flights=viewable_flights,
         )
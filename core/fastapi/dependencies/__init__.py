@@ -1,9 +1,22 @@
 from core.fastapi.dependencies.authentication import AuthenticationRequired
+from core.fastapi.dependencies.conditional import (
+    Validators,
+    conditional_get,
+    etag_for,
+    table_versions,
+)
 from core.fastapi.dependencies.current_user import get_current_user
 from core.fastapi.dependencies.logging import Logging
+from core.fastapi.dependencies.sparse_fields import serialize_sparse, sparse_fields
 
 __all__ = [
     "Logging",
     "get_current_user",
     "AuthenticationRequired",
+    "sparse_fields",
+    "serialize_sparse",
+    "conditional_get",
+    "Validators",
+    "etag_for",
+    "table_versions",
 ]
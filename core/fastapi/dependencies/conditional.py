@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache.response_cache import GZIP_ETAG_SUFFIX
+from core.config import config
+from core.database import get_session
+from core.exceptions import NotModifiedException
+
+_TABLE_VERSIONS = text(
+    "SELECT name, version FROM table_versions WHERE name IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+
+@dataclass(slots=True)
+class Validators:
+    etag: str
+    versions: dict[str, int]
+    headers: dict[str, str]
+
+    def retag(
+        self, request: Request, response: Response, versions: dict[str, int] | None
+    ) -> None:
+        """Point the ETag at ``versions`` when the body was read at older ones.
+
+        :param request: The request being answered.
+        :param response: The response to set the header on.
+        :param versions: The table versions the body was read at, if known.
+        """
+        if versions is not None and versions != self.versions:
+            response.headers["ETag"] = etag_for(request, versions)
+
+    def headers_for(
+        self, request: Request, versions: Mapping[str, int] | None
+    ) -> dict[str, str]:
+        """Return the validator headers of a body read at ``versions``.
+
+        :param request: The request being answered.
+        :param versions: The table versions the body was read at, if known.
+
+        :return: ``headers``, with the ETag of ``versions`` if they differ.
+        """
+        if versions is None or versions == self.versions:
+            return self.headers
+        return {**self.headers, "ETag": etag_for(request, versions)}
+
+
+def _matches(if_none_match: str, etag: str) -> str | None:
+    """Return the tag of ``If-None-Match`` that is current, if any.
+
+    Comparison is weak, as RFC 9110 requires for ``If-None-Match``; the
+    gzip representation of the same content carries a suffixed tag.
+    """
+    current = (etag, etag[:-1] + GZIP_ETAG_SUFFIX + '"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*":
+            return etag
+        if candidate in current:
+            return candidate
+    return None
+
+
+async def table_versions(
+    session: AsyncSession, tables: Iterable[str]
+) -> dict[str, int]:
+    """Read the ``table_versions`` counters of ``tables``.
+
+    :param session: The session to read with.
+    :param tables: The table names.
+
+    :return: The version of each table; 0 for tables never written.
+    """
+    tables = list(tables)
+    result = await session.execute(_TABLE_VERSIONS, {"names": tables})
+    return dict.fromkeys(tables, 0) | dict(result.tuples().all())
+
+
+def etag_for(request: Request, versions: Mapping[str, int]) -> str:
+    """Build the ETag of the response to ``request`` read at ``versions``.
+
+    :param request: The request being answered.
+    :param versions: The table versions the response was read at.
+
+    :return: The quoted ETag.
+    """
+    state = (
+        config.RELEASE_VERSION,
+        date.today().isoformat(),
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        sorted(versions.items()),
+    )
+    return f'"{hashlib.sha1(repr(state).encode()).hexdigest()}"'
+
+
+def conditional_get(
+    *tables: str, max_age: int, stale_while_revalidate: int
+) -> Callable[..., Awaitable[Validators]]:
+    """Build a dependency answering ``If-None-Match`` before the query runs.
+
+    The ETag hashes the request URL, the release, the current date (for
+    periods ending "today") and the ``table_versions`` of ``tables``.
+
+    :param tables: The tables the response is read from.
+    :param max_age: Seconds clients and proxies may reuse the response.
+    :param stale_while_revalidate: Seconds a stale response may be served
+        while it is revalidated in the background.
+
+    :return: A dependency raising ``NotModifiedException`` on a match and
+        otherwise setting ``ETag`` and ``Cache-Control`` on the response.
+    """
+    cache_control = (
+        f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+    )
+
+    async def check(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_session),
+    ) -> Validators:
+        versions = await table_versions(session, tables)
+        etag = etag_for(request, versions)
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (matched := _matches(if_none_match, etag)):
+            raise NotModifiedException(headers={**headers, "ETag": matched})
+
+        response.headers.update(headers)
+        return Validators(etag=etag, versions=versions, headers=headers)
+
+    return check
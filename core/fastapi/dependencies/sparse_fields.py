@@ -0,0 +1,64 @@
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Query
+from pydantic import BaseModel, TypeAdapter
+
+from core.exceptions import BadRequestException
+
+
+def sparse_fields(model: type[BaseModel]) -> Callable[..., list[str] | None]:
+    """Build a dependency parsing a ``fields=a,b,c`` query parameter.
+
+    :param model: The response model whose fields may be requested.
+
+    :return: A dependency returning the requested field names (always
+        including ``id``), or ``None`` when the full model is wanted.
+    """
+    allowed = set(model.model_fields)
+
+    def parse_fields(
+        fields: str | None = Query(
+            None,
+            description="Comma-separated list of fields to return, e.g. 'id,title'",
+        ),
+    ) -> list[str] | None:
+        if not fields:
+            return None
+        requested = dict.fromkeys(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [field for field in requested if field not in allowed]
+        if unknown:
+            raise BadRequestException(f"Unknown fields: {', '.join(unknown)}")
+        return ["id", *(field for field in requested if field != "id")]
+
+    return parse_fields
+
+
+@lru_cache(maxsize=256)
+def _field_adapter(model: type[BaseModel], field: str) -> TypeAdapter:
+    return TypeAdapter(model.model_fields[field].annotation)
+
+
+def serialize_sparse(
+    model: type[BaseModel], objects: Iterable[Any], fields: list[str]
+) -> list[dict[str, Any]]:
+    """Serialize only ``fields`` of each object the way ``model`` would.
+
+    :param model: The response model the fields belong to.
+    :param objects: The objects to read the fields from.
+    :param fields: The field names to serialize.
+
+    :return: JSON-compatible dictionaries.
+    """
+    adapters = [(field, _field_adapter(model, field)) for field in fields]
+    return [
+        {
+            field: adapter.dump_python(
+                adapter.validate_python(getattr(obj, field), from_attributes=True),
+                mode="json",
+            )
+            for field, adapter in adapters
+        }
+        for obj in objects
+    ]
@@ -7,10 +7,10 @@ from typing import Any
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from core.exceptions import CustomException
+from core.exceptions import CustomException, NotModifiedException
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +34,13 @@ def _stringify_detail(detail: Any) -> str:
 def register_exception_handlers(app: FastAPI) -> None:
     """Attach JSON exception handlers to the provided FastAPI app."""
 
+    @app.exception_handler(NotModifiedException)
+    async def handle_not_modified(
+        request: Request, exc: NotModifiedException  # noqa: ARG001
+    ):
+        # A 304 carries the validators but never a body.
+        return Response(status_code=int(exc.status_code), headers=exc.headers)
+
     @app.exception_handler(CustomException)
     async def handle_custom_exception(
         request: Request, exc: CustomException  # noqa: ARG001
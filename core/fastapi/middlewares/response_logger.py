@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from starlette.datastructures import Headers
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+MAX_LOGGED_BODY_BYTES = 4096
+
 
 class ResponseInfo(BaseModel):
     headers: Headers | None = Field(default=None, title="Response header")
@@ -37,8 +39,13 @@ class ResponseLoggerMiddleware:
                 response_info.headers = Headers(raw=message.get("headers"))
                 response_info.status_code = message.get("status")
             elif message.get("type") == "http.response.body":
-                if body := message.get("body"):
-                    response_info.body += body.decode("utf8")
+                # Only the head of the body is kept, so streamed responses
+                # don't accumulate in memory.
+                remaining = MAX_LOGGED_BODY_BYTES - len(response_info.body)
+                if (body := message.get("body")) and remaining > 0:
+                    response_info.body += body[:remaining].decode(
+                        "utf8", errors="replace"
+                    )
 
             await send(message)
 
@@ -0,0 +1,45 @@
+from core.geo.cells import (
+    CELL_BITS,
+    BBox,
+    bbox_cell_ranges,
+    cell_key,
+    split_antimeridian,
+)
+from core.geo.countries import (
+    COUNTRY_NAMES,
+    CountryIndex,
+    country_index,
+    load_country_index,
+    normalize_country_code,
+    reverse_geocode,
+    reverse_geocode_many,
+)
+from core.geo.tiles import (
+    MAX_TILE_ZOOM,
+    TILE_MEDIA_TYPE,
+    TileMarker,
+    decode_tile,
+    encode_tile,
+    tile_bbox,
+)
+
+__all__ = [
+    "BBox",
+    "CELL_BITS",
+    "cell_key",
+    "bbox_cell_ranges",
+    "split_antimeridian",
+    "COUNTRY_NAMES",
+    "CountryIndex",
+    "country_index",
+    "load_country_index",
+    "normalize_country_code",
+    "reverse_geocode",
+    "reverse_geocode_many",
+    "MAX_TILE_ZOOM",
+    "TILE_MEDIA_TYPE",
+    "TileMarker",
+    "tile_bbox",
+    "encode_tile",
+    "decode_tile",
+]
@@ -0,0 +1,96 @@
+"""Z-order (Morton) cell keys over a fixed lat/lng grid.
+
+Every point is quantized onto a ``2**CELL_BITS`` x ``2**CELL_BITS`` grid and
+the two grid coordinates are bit-interleaved into one integer. Points that
+are close on the map share long key prefixes, so a bounding box can be
+covered by a handful of contiguous key ranges that a btree index scans
+directly.
+"""
+
+from __future__ import annotations
+
+BBox = tuple[float, float, float, float]
+
+CELL_BITS = 16
+_GRID_SIZE = 1 << CELL_BITS
+
+
+def _quantize(value: float, low: float, span: float) -> int:
+    index = int((value - low) / span * _GRID_SIZE)
+    return min(max(index, 0), _GRID_SIZE - 1)
+
+
+def _interleave(x: int, y: int) -> int:
+    key = 0
+    for bit in range(CELL_BITS):
+        key |= ((x >> bit) & 1) << (2 * bit)
+        key |= ((y >> bit) & 1) << (2 * bit + 1)
+    return key
+
+
+def cell_key(lat: float, lng: float) -> int:
+    """Return the Morton cell key for a coordinate.
+
+    :param lat: Latitude in degrees.
+    :param lng: Longitude in degrees.
+
+    :return: The cell key.
+    """
+    return _interleave(_quantize(lng, -180.0, 360.0), _quantize(lat, -90.0, 180.0))
+
+
+def split_antimeridian(bbox: BBox) -> list[BBox]:
+    """Split a bbox crossing the antimeridian into two regular ones.
+
+    A bbox crosses the antimeridian when its ``min_lng`` is greater than its
+    ``max_lng`` (e.g. ``170,-10,-170,10``).
+
+    :param bbox: The bbox as ``(min_lng, min_lat, max_lng, max_lat)``.
+
+    :return: One or two bboxes that do not cross the antimeridian.
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if min_lng <= max_lng:
+        return [bbox]
+    return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+
+
+def bbox_cell_ranges(bbox: BBox, max_cells: int = 16) -> list[tuple[int, int]]:
+    """Cover a bbox with inclusive ranges of cell keys.
+
+    The cover picks the finest grid level at which the bbox spans at most
+    ``max_cells`` cells, so the ranges may include points slightly outside
+    the bbox; callers keep the exact lat/lng predicates as a recheck.
+
+    :param bbox: The bbox as ``(min_lng, min_lat, max_lng, max_lat)``.
+    :param max_cells: Upper bound on cells per (non-wrapping) bbox part.
+
+    :return: Sorted, merged ``(low, high)`` key ranges.
+    """
+    ranges: list[tuple[int, int]] = []
+    for min_lng, min_lat, max_lng, max_lat in split_antimeridian(bbox):
+        x0 = _quantize(min_lng, -180.0, 360.0)
+        x1 = _quantize(max_lng, -180.0, 360.0)
+        y0 = _quantize(min_lat, -90.0, 180.0)
+        y1 = _quantize(max_lat, -90.0, 180.0)
+
+        shift = 0
+        while ((x1 >> shift) - (x0 >> shift) + 1) * (
+            (y1 >> shift) - (y0 >> shift) + 1
+        ) > max_cells:
+            shift += 1
+
+        width = 1 << (2 * shift)
+        for cx in range(x0 >> shift, (x1 >> shift) + 1):
+            for cy in range(y0 >> shift, (y1 >> shift) + 1):
+                low = _interleave(cx, cy) << (2 * shift)
+                ranges.append((low, low + width - 1))
+
+    ranges.sort()
+    merged: list[tuple[int, int]] = []
+    for low, high in ranges:
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
@@ -0,0 +1,444 @@
+"""ISO 3166-1 alpha-2 country codes and an offline reverse geocoder.
+
+Country boundaries are read from ``data/countries.geojson``, the Natural
+Earth admin-0 countries layer (see the README), on the first lookup. Each
+country's edges are bucketed into one-degree latitude bands, and each
+one-degree cell lists the countries whose bounding box overlaps it, so a
+point-in-polygon test only walks the few edges near the point.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BOUNDARIES_PATH = Path(__file__).parent / "data" / "countries.geojson"
+# Feature properties holding the alpha-2 code, most specific first. Natural
+# Earth sets ISO_A2 to -99 for a few disputed areas; ISO_A2_EH fills them.
+CODE_PROPERTIES = ("ISO_A2_EH", "ISO_A2", "iso_a2")
+
+# Edges are (lat1, lng1, lat2, lng2).
+Edge = tuple[float, float, float, float]
+# A ring is a closed list of (lng, lat) positions, as in GeoJSON.
+Ring = Sequence[Sequence[float]]
+
+COUNTRY_NAMES: dict[str, str] = {
+    "AD": "Andorra",
+    "AE": "United Arab Emirates",
+    "AF": "Afghanistan",
+    "AG": "Antigua and Barbuda",
+    "AI": "Anguilla",
+    "AL": "Albania",
+    "AM": "Armenia",
+    "AO": "Angola",
+    "AQ": "Antarctica",
+    "AR": "Argentina",
+    "AS": "American Samoa",
+    "AT": "Austria",
+    "AU": "Australia",
+    "AW": "Aruba",
+    "AX": "Åland Islands",
+    "AZ": "Azerbaijan",
+    "BA": "Bosnia and Herzegovina",
+    "BB": "Barbados",
+    "BD": "Bangladesh",
+    "BE": "Belgium",
+    "BF": "Burkina Faso",
+    "BG": "Bulgaria",
+    "BH": "Bahrain",
+    "BI": "Burundi",
+    "BJ": "Benin",
+    "BL": "Saint Barthélemy",
+    "BM": "Bermuda",
+    "BN": "Brunei",
+    "BO": "Bolivia",
+    "BQ": "Caribbean Netherlands",
+    "BR": "Brazil",
+    "BS": "Bahamas",
+    "BT": "Bhutan",
+    "BV": "Bouvet Island",
+    "BW": "Botswana",
+    "BY": "Belarus",
+    "BZ": "Belize",
+    "CA": "Canada",
+    "CC": "Cocos (Keeling) Islands",
+    "CD": "DR Congo",
+    "CF": "Central African Republic",
+    "CG": "Republic of the Congo",
+    "CH": "Switzerland",
+    "CI": "Côte d'Ivoire",
+    "CK": "Cook Islands",
+    "CL": "Chile",
+    "CM": "Cameroon",
+    "CN": "China",
+    "CO": "Colombia",
+    "CR": "Costa Rica",
+    "CU": "Cuba",
+    "CV": "Cape Verde",
+    "CW": "Curaçao",
+    "CX": "Christmas Island",
+    "CY": "Cyprus",
+    "CZ": "Czechia",
+    "DE": "Germany",
+    "DJ": "Djibouti",
+    "DK": "Denmark",
+    "DM": "Dominica",
+    "DO": "Dominican Republic",
+    "DZ": "Algeria",
+    "EC": "Ecuador",
+    "EE": "Estonia",
+    "EG": "Egypt",
+    "EH": "Western Sahara",
+    "ER": "Eritrea",
+    "ES": "Spain",
+    "ET": "Ethiopia",
+    "FI": "Finland",
+    "FJ": "Fiji",
+    "FK": "Falkland Islands",
+    "FM": "Micronesia",
+    "FO": "Faroe Islands",
+    "FR": "France",
+    "GA": "Gabon",
+    "GB": "United Kingdom",
+    "GD": "Grenada",
+    "GE": "Georgia",
+    "GF": "French Guiana",
+    "GG": "Guernsey",
+    "GH": "Ghana",
+    "GI": "Gibraltar",
+    "GL": "Greenland",
+    "GM": "Gambia",
+    "GN": "Guinea",
+    "GP": "Guadeloupe",
+    "GQ": "Equatorial Guinea",
+    "GR": "Greece",
+    "GS": "South Georgia and the South Sandwich Islands",
+    "GT": "Guatemala",
+    "GU": "Guam",
+    "GW": "Guinea-Bissau",
+    "GY": "Guyana",
+    "HK": "Hong Kong",
+    "HM": "Heard Island and McDonald Islands",
+    "HN": "Honduras",
+    "HR": "Croatia",
+    "HT": "Haiti",
+    "HU": "Hungary",
+    "ID": "Indonesia",
+    "IE": "Ireland",
+    "IL": "Israel",
+    "IM": "Isle of Man",
+    "IN": "India",
+    "IO": "British Indian Ocean Territory",
+    "IQ": "Iraq",
+    "IR": "Iran",
+    "IS": "Iceland",
+    "IT": "Italy",
+    "JE": "Jersey",
+    "JM": "Jamaica",
+    "JO": "Jordan",
+    "JP": "Japan",
+    "KE": "Kenya",
+    "KG": "Kyrgyzstan",
+    "KH": "Cambodia",
+    "KI": "Kiribati",
+    "KM": "Comoros",
+    "KN": "Saint Kitts and Nevis",
+    "KP": "North Korea",
+    "KR": "South Korea",
+    "KW": "Kuwait",
+    "KY": "Cayman Islands",
+    "KZ": "Kazakhstan",
+    "LA": "Laos",
+    "LB": "Lebanon",
+    "LC": "Saint Lucia",
+    "LI": "Liechtenstein",
+    "LK": "Sri Lanka",
+    "LR": "Liberia",
+    "LS": "Lesotho",
+    "LT": "Lithuania",
+    "LU": "Luxembourg",
+    "LV": "Latvia",
+    "LY": "Libya",
+    "MA": "Morocco",
+    "MC": "Monaco",
+    "MD": "Moldova",
+    "ME": "Montenegro",
+    "MF": "Saint Martin",
+    "MG": "Madagascar",
+    "MH": "Marshall Islands",
+    "MK": "North Macedonia",
+    "ML": "Mali",
+    "MM": "Myanmar",
+    "MN": "Mongolia",
+    "MO": "Macao",
+    "MP": "Northern Mariana Islands",
+    "MQ": "Martinique",
+    "MR": "Mauritania",
+    "MS": "Montserrat",
+    "MT": "Malta",
+    "MU": "Mauritius",
+    "MV": "Maldives",
+    "MW": "Malawi",
+    "MX": "Mexico",
+    "MY": "Malaysia",
+    "MZ": "Mozambique",
+    "NA": "Namibia",
+    "NC": "New Caledonia",
+    "NE": "Niger",
+    "NF": "Norfolk Island",
+    "NG": "Nigeria",
+    "NI": "Nicaragua",
+    "NL": "Netherlands",
+    "NO": "Norway",
+    "NP": "Nepal",
+    "NR": "Nauru",
+    "NU": "Niue",
+    "NZ": "New Zealand",
+    "OM": "Oman",
+    "PA": "Panama",
+    "PE": "Peru",
+    "PF": "French Polynesia",
+    "PG": "Papua New Guinea",
+    "PH": "Philippines",
+    "PK": "Pakistan",
+    "PL": "Poland",
+    "PM": "Saint Pierre and Miquelon",
+    "PN": "Pitcairn Islands",
+    "PR": "Puerto Rico",
+    "PS": "Palestine",
+    "PT": "Portugal",
+    "PW": "Palau",
+    "PY": "Paraguay",
+    "QA": "Qatar",
+    "RE": "Réunion",
+    "RO": "Romania",
+    "RS": "Serbia",
+    "RU": "Russia",
+    "RW": "Rwanda",
+    "SA": "Saudi Arabia",
+    "SB": "Solomon Islands",
+    "SC": "Seychelles",
+    "SD": "Sudan",
+    "SE": "Sweden",
+    "SG": "Singapore",
+    "SH": "Saint Helena, Ascension and Tristan da Cunha",
+    "SI": "Slovenia",
+    "SJ": "Svalbard and Jan Mayen",
+    "SK": "Slovakia",
+    "SL": "Sierra Leone",
+    "SM": "San Marino",
+    "SN": "Senegal",
+    "SO": "Somalia",
+    "SR": "Suriname",
+    "SS": "South Sudan",
+    "ST": "São Tomé and Príncipe",
+    "SV": "El Salvador",
+    "SX": "Sint Maarten",
+    "SY": "Syria",
+    "SZ": "Eswatini",
+    "TC": "Turks and Caicos Islands",
+    "TD": "Chad",
+    "TF": "French Southern Territories",
+    "TG": "Togo",
+    "TH": "Thailand",
+    "TJ": "Tajikistan",
+    "TK": "Tokelau",
+    "TL": "Timor-Leste",
+    "TM": "Turkmenistan",
+    "TN": "Tunisia",
+    "TO": "Tonga",
+    "TR": "Türkiye",
+    "TT": "Trinidad and Tobago",
+    "TV": "Tuvalu",
+    "TW": "Taiwan",
+    "TZ": "Tanzania",
+    "UA": "Ukraine",
+    "UG": "Uganda",
+    "UM": "United States Minor Outlying Islands",
+    "US": "United States",
+    "UY": "Uruguay",
+    "UZ": "Uzbekistan",
+    "VA": "Vatican City",
+    "VC": "Saint Vincent and the Grenadines",
+    "VE": "Venezuela",
+    "VG": "British Virgin Islands",
+    "VI": "United States Virgin Islands",
+    "VN": "Vietnam",
+    "VU": "Vanuatu",
+    "WF": "Wallis and Futuna",
+    "WS": "Samoa",
+    "XK": "Kosovo",
+    "YE": "Yemen",
+    "YT": "Mayotte",
+    "ZA": "South Africa",
+    "ZM": "Zambia",
+    "ZW": "Zimbabwe",
+}
+
+
+def normalize_country_code(code: str | None) -> str | None:
+    """Return the canonical, upper-case form of a country code.
+
+    Codes are stored upper-case so equality filters can use the plain
+    ``country_code`` indexes.
+
+    :param code: The code as submitted, e.g. ``"gr"``.
+
+    :return: The upper-case code, or ``None`` for a missing or blank code.
+    """
+    if code is None:
+        return None
+    return code.strip().upper() or None
+
+
+class CountryIndex:
+    """Point-in-polygon lookup over country boundaries."""
+
+    def __init__(self, countries: Iterable[tuple[str, Iterable[Ring]]]):
+        """Index the rings of each country.
+
+        :param countries: ``(code, rings)`` pairs. The rings of a country are
+            its outer boundaries and holes alike; a point is inside when a ray
+            from it crosses the rings an odd number of times.
+        """
+        self._edges: dict[tuple[str, int], list[Edge]] = defaultdict(list)
+        self._cells: dict[tuple[int, int], list[str]] = defaultdict(list)
+        for code, rings in countries:
+            self._add(code, rings)
+
+    def _add(self, code: str, rings: Iterable[Ring]) -> None:
+        min_lat = min_lng = math.inf
+        max_lat = max_lng = -math.inf
+        for ring in rings:
+            edges = zip(ring, ring[1:], strict=False)
+            for (lng1, lat1, *_), (lng2, lat2, *_) in edges:
+                if lat1 == lat2:
+                    continue  # Horizontal edges never cross the ray.
+                low, high = sorted((lat1, lat2))
+                for band in range(math.floor(low), math.floor(high) + 1):
+                    self._edges[code, band].append((lat1, lng1, lat2, lng2))
+                min_lat, max_lat = min(min_lat, low), max(max_lat, high)
+                min_lng = min(min_lng, lng1, lng2)
+                max_lng = max(max_lng, lng1, lng2)
+        if min_lat > max_lat:
+            return
+
+        for lat in range(math.floor(min_lat), math.floor(max_lat) + 1):
+            for lng in range(math.floor(min_lng), math.floor(max_lng) + 1):
+                cell = self._cells[lat, lng]
+                if code not in cell:
+                    cell.append(code)
+
+    def lookup(self, lat: float, lng: float) -> str | None:
+        """Return the code of the country containing a point.
+
+        :param lat: The latitude.
+        :param lng: The longitude.
+
+        :return: The country code, or ``None`` at sea or outside the data.
+        """
+        band = math.floor(lat)
+        for code in self._cells.get((band, math.floor(lng)), ()):
+            inside = False
+            for lat1, lng1, lat2, lng2 in self._edges[code, band]:
+                if (lat1 > lat) != (lat2 > lat):
+                    crossing = lng1 + (lat - lat1) * (lng2 - lng1) / (lat2 - lat1)
+                    if crossing > lng:
+                        inside = not inside
+            if inside:
+                return code
+        return None
+
+
+def _feature_rings(geometry: dict) -> list[Ring]:
+    if geometry["type"] == "Polygon":
+        return list(geometry["coordinates"])
+    if geometry["type"] == "MultiPolygon":
+        return [ring for polygon in geometry["coordinates"] for ring in polygon]
+    return []
+
+
+def load_country_index(path: Path) -> CountryIndex:
+    """Build a ``CountryIndex`` from a GeoJSON ``FeatureCollection``.
+
+    :param path: The GeoJSON file; features without a valid alpha-2 code in
+        ``CODE_PROPERTIES`` are skipped.
+
+    :return: The index.
+    """
+    with path.open(encoding="utf-8") as file:
+        features = json.load(file)["features"]
+
+    def countries():
+        for feature in features:
+            properties = feature.get("properties") or {}
+            codes = (properties.get(name) for name in CODE_PROPERTIES)
+            code = next((c for c in codes if c in COUNTRY_NAMES), None)
+            if code and feature.get("geometry"):
+                yield code, _feature_rings(feature["geometry"])
+
+    return CountryIndex(countries())
+
+
+_index: CountryIndex | None = None
+_index_lock = threading.Lock()
+
+
+def country_index() -> CountryIndex:
+    """Return the shared index, building it on first use.
+
+    Without a boundaries file the index is empty and every lookup misses.
+    """
+    global _index
+    if _index is not None:
+        return _index
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = load_country_index(BOUNDARIES_PATH)
+            except FileNotFoundError:
+                logger.warning(
+                    "No country boundaries at %s; country codes can't be derived",
+                    BOUNDARIES_PATH,
+                )
+                _index = CountryIndex(())
+        return _index
+
+
+def reverse_geocode(lat: float, lng: float) -> str | None:
+    """Return the code of the country containing a point, offline.
+
+    :param lat: The latitude.
+    :param lng: The longitude.
+
+    :return: The country code, or ``None`` if it can't be derived.
+    """
+    return country_index().lookup(lat, lng)
+
+
+async def reverse_geocode_many(
+    points: Iterable[tuple[float, float]],
+) -> list[str | None]:
+    """Return the country codes of many points without blocking the event loop.
+
+    The lookups, and building the index on first use, run in one worker
+    thread.
+
+    :param points: The ``(lat, lng)`` of each point.
+
+    :return: The country code of each point, in order.
+    """
+    points = list(points)
+    if not points:
+        return []
+    return await asyncio.to_thread(
+        lambda: [reverse_geocode(lat, lng) for lat, lng in points]
+    )
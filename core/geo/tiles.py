@@ -0,0 +1,124 @@
+"""Slippy-map tile addressing and the compact marker encoding for tiles.
+
+A tile body is a fixed header followed by one fixed-size record per marker.
+Coordinates are quantized to 16 bits relative to the tile bounds, which is
+finer than a pixel at any zoom level a 256/512px tile is rendered at::
+
+    header  <BBIII  version, z, x, y, marker count
+    marker  <IHHB2s flight id, x, y (0 = west/south edge), theme index,
+                    pilot country code (NUL bytes when unknown)
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from core.geo.cells import BBox
+
+TILE_FORMAT_VERSION = 1
+TILE_MEDIA_TYPE = "application/vnd.skyflow.tile"
+MAX_TILE_ZOOM = 22
+
+_HEADER = struct.Struct("<BBIII")
+_MARKER = struct.Struct("<IHHB2s")
+_QUANTIZATION = (1 << 16) - 1
+
+
+class TileMarker(NamedTuple):
+    id: int
+    lat: float
+    lng: float
+    theme: int
+    country_code: str | None
+
+
+def _tile_lat(y: int, n: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
+def tile_bbox(z: int, x: int, y: int) -> BBox:
+    """Return the bbox covered by a Web Mercator tile.
+
+    :param z: The zoom level.
+    :param x: The tile column.
+    :param y: The tile row, counted from the north.
+
+    :return: The bbox as ``(min_lng, min_lat, max_lng, max_lat)``.
+    """
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        raise ValueError(f"Tile zoom must be within [0, {MAX_TILE_ZOOM}]")
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile coordinates must be within [0, {n - 1}] at zoom {z}")
+    return (
+        x / n * 360.0 - 180.0,
+        _tile_lat(y + 1, n),
+        (x + 1) / n * 360.0 - 180.0,
+        _tile_lat(y, n),
+    )
+
+
+def _quantize(value: float, low: float, high: float) -> int:
+    span = high - low
+    if span <= 0:
+        return 0
+    return min(max(round((value - low) / span * _QUANTIZATION), 0), _QUANTIZATION)
+
+
+def encode_tile(z: int, x: int, y: int, markers: Iterable[TileMarker]) -> bytes:
+    """Encode the markers of a tile into the compact binary format.
+
+    :param z: The zoom level.
+    :param x: The tile column.
+    :param y: The tile row.
+    :param markers: The markers inside the tile.
+
+    :return: The encoded tile body.
+    """
+    min_lng, min_lat, max_lng, max_lat = tile_bbox(z, x, y)
+    body = bytearray()
+    count = 0
+    for marker in markers:
+        country = (marker.country_code or "").encode("ascii", "replace")[:2]
+        body += _MARKER.pack(
+            marker.id,
+            _quantize(marker.lng, min_lng, max_lng),
+            _quantize(marker.lat, min_lat, max_lat),
+            marker.theme,
+            country.ljust(2, b"\0"),
+        )
+        count += 1
+    return _HEADER.pack(TILE_FORMAT_VERSION, z, x, y, count) + bytes(body)
+
+
+def decode_tile(data: bytes) -> tuple[tuple[int, int, int], list[TileMarker]]:
+    """Decode a tile body produced by :func:`encode_tile`.
+
+    :param data: The encoded tile body.
+
+    :return: The ``(z, x, y)`` tile address and its markers.
+    """
+    version, z, x, y, count = _HEADER.unpack_from(data)
+    if version != TILE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported tile format version {version}")
+    min_lng, min_lat, max_lng, max_lat = tile_bbox(z, x, y)
+
+    markers: list[TileMarker] = []
+    for index in range(count):
+        flight_id, qx, qy, theme, country = _MARKER.unpack_from(
+            data, _HEADER.size + index * _MARKER.size
+        )
+        markers.append(
+            TileMarker(
+                id=flight_id,
+                lat=min_lat + qy / _QUANTIZATION * (max_lat - min_lat),
+                lng=min_lng + qx / _QUANTIZATION * (max_lng - min_lng),
+                theme=theme,
+                country_code=country.rstrip(b"\0").decode("ascii") or None,
+            )
+        )
+    return (z, x, y), markers
+
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any
+
+from core.exceptions import BadRequestException
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque token.
+
+    :param values: The sort key values, in ordering order.
+
+    :return: A URL-safe cursor string.
+    """
+    payload = json.dumps(list(values), default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    :param cursor: The opaque cursor string.
+    :param size: The number of values the cursor must contain.
+
+    :return: The decoded sort key values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequestException("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequestException("Invalid cursor")
+    return values
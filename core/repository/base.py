@@ -1,13 +1,17 @@
-from collections.abc import Sequence
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy import Select
+from sqlalchemy import Select, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload
 from sqlalchemy.sql.expression import select
 
-from core.database import Base
+from core.database import Base, reader_session_factory
 
 ModelType = TypeVar("ModelType", bound=Base)
+ResultType = TypeVar("ResultType")
+RepositoryType = TypeVar("RepositoryType", bound="BaseRepository")
 
 
 class BaseRepository(Generic[ModelType]):
@@ -24,11 +28,21 @@ class BaseRepository(Generic[ModelType]):
 
         :return: The created model instance.
         """
+        model = self.add(attributes)
+        await self.session.commit()
+        return model
+
+    def add(self, attributes: dict[str, Any] | None = None) -> ModelType:
+        """Stages a new model instance without committing.
+
+        :param attributes: The attributes to create the model with.
+
+        :return: The pending model instance.
+        """
         if attributes is None:
             attributes = {}
         model = self.model_class(**attributes)
         self.session.add(model)
-        await self.session.commit()
         return model
 
     async def get_all(self, skip: int = 0, limit: int = 100) -> Sequence[ModelType]:
@@ -45,17 +59,24 @@ class BaseRepository(Generic[ModelType]):
         return await self._all_unique(query)
 
     async def get_filtered(
-        self, filters: dict[str, Any] | None = None, skip: int = 0, limit: int = 100
+        self,
+        filters: dict[str, Any] | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Sequence[str] | None = None,
     ) -> Sequence[ModelType]:
         """Retrieves a filtered list of model instances based on provided filters.
 
         :param filters: A dictionary where keys are the model fields and values are the values to filter by.
         :param skip: The number of records to skip.
         :param limit: The number of records to return.
+        :param fields: Only load these columns; every other attribute raises on access.
 
         :return: A list of model instances.
         """
         query = select(self.model_class)
+        if fields:
+            query = self._load_only(query, fields)
         if filters:
             for field, value in filters.items():
                 if isinstance(value, tuple | list) and len(value) == 2:
@@ -112,6 +133,41 @@ class BaseRepository(Generic[ModelType]):
         await self.session.delete(model)
         await self.session.commit()
 
+    async def concurrently(
+        self: RepositoryType,
+        *reads: Callable[[RepositoryType], Awaitable[ResultType]],
+    ) -> list[ResultType]:
+        """Runs independent reads at the same time.
+
+        Each read gets a copy of this repository bound to its own session on
+        a pooled reader connection, so the reads take as long as the slowest
+        one. They don't see uncommitted changes of this session.
+
+        :param reads: Callables taking a repository and awaiting one read.
+
+        :return: The result of each read, in order.
+        """
+
+        async def run(read):
+            async with reader_session_factory() as session:
+                return await read(type(self)(self.model_class, session))
+
+        return list(await asyncio.gather(*(run(read) for read in reads)))
+
+    def _load_only(self, query: Select, fields: Sequence[str]) -> Select:
+        """Restricts the SELECT list of the query to the given columns.
+
+        :param query: The query to restrict.
+        :param fields: The attribute names to load; non-column names are ignored.
+
+        :return: The restricted query.
+        """
+        columns = inspect(self.model_class).column_attrs
+        attributes = [
+            getattr(self.model_class, field) for field in fields if field in columns
+        ]
+        return query.options(load_only(*attributes, raiseload=True), raiseload("*"))
+
     async def _all(self, query: Select) -> Sequence[ModelType]:
         """Returns all results from the query.
 
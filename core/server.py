@@ -1,3 +1,6 @@
+import asyncio
+import logging
+
 from fastapi import Depends, FastAPI
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
@@ -5,15 +8,40 @@ from fastapi.responses import RedirectResponse
 from starlette.middleware.authentication import AuthenticationMiddleware
 
 from api import router
+from app.controllers.flight import LEADERBOARD_TABLES
+from core.cache import flight_views
 from core.config import config
+from core.database import async_session_factory, reader_session_factory
 from core.database.migration import prepare_database
-from core.fastapi.dependencies import Logging
+from core.factory import Factory
+from core.fastapi.dependencies import Logging, table_versions
 from core.fastapi.exception_handlers import register_exception_handlers
 from core.fastapi.middlewares import (
     AuthenticationBackend,
     ResponseLoggerMiddleware,
     SQLAlchemyMiddleware,
 )
+from core.geo import country_index
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_leaderboard_cache() -> None:
+    """Load the default rankings so the first visitors don't wait for them."""
+    try:
+        async with reader_session_factory() as session:
+            versions = await table_versions(session, LEADERBOARD_TABLES)
+            controller = Factory().get_flight_controller(db_session=session)
+            await controller.warm_leaderboards(versions)
+    except Exception:
+        logger.warning("Could not warm the leaderboard cache", exc_info=True)
+
+
+async def write_flight_views(counts: dict[int, int]) -> None:
+    """Add a batch of buffered flight views in a session of its own."""
+    async with async_session_factory() as session:
+        controller = Factory().get_flight_controller(db_session=session)
+        await controller.write_views(counts)
 
 
 def init_routers(app_: FastAPI) -> None:
@@ -35,6 +63,22 @@ def init_listeners(app_: FastAPI) -> None:
     async def ensure_database_ready():
         await prepare_database()
 
+    @app_.on_event("startup")
+    async def warm_caches():
+        # Startup doesn't wait for these; keep references to the tasks.
+        app_.state.cache_warmup = asyncio.create_task(warm_leaderboard_cache())
+        app_.state.geocoder_warmup = asyncio.create_task(
+            asyncio.to_thread(country_index)
+        )
+
+    @app_.on_event("startup")
+    async def start_view_counter():
+        flight_views.start(write_flight_views)
+
+    @app_.on_event("shutdown")
+    async def flush_view_counter():
+        await flight_views.stop()
+
 
 def make_middleware() -> list[Middleware]:
     """Create the middleware for the FastAPI application.
@@ -48,6 +92,7 @@ def make_middleware() -> list[Middleware]:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=["X-Next-Cursor"],
         ),
         Middleware(SQLAlchemyMiddleware),
         Middleware(ResponseLoggerMiddleware),
@@ -1,6 +1,25 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
 import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
 
-from api.v1.flights import _parse_bbox
+from api.v1.flights import (
+    EXPORT_CSV_COLUMNS,
+    _csv_chunks,
+    _ndjson_chunks,
+    _parse_bbox,
+    _parse_flight_cursor,
+    flights_router,
+)
+from app.controllers import FlightController
+from app.repositories.flights import MAX_CLUSTER_ZOOM
+from core.database import get_session
+from core.exceptions import BadRequestException
+from core.fastapi.exception_handlers import register_exception_handlers
+from core.pagination import encode_cursor
 
 
 def test_parse_bbox_returns_float_tuple():
@@ -16,3 +35,136 @@ def test_parse_bbox_rejects_invalid_payload_counts(raw: str):
 def test_parse_bbox_requires_numeric_values():
     with pytest.raises(ValueError):
         _parse_bbox("west,2,3,4")
+
+
+def test_parse_flight_cursor_returns_seek_key():
+    created_at = datetime(2024, 1, 2, 3, 4, 5)
+
+    assert _parse_flight_cursor(encode_cursor(created_at, 7)) == (created_at, 7)
+
+
+def test_parse_flight_cursor_rejects_bad_timestamp():
+    with pytest.raises(BadRequestException):
+        _parse_flight_cursor(encode_cursor("yesterday", 7))
+
+
+def test_parse_bbox_accepts_antimeridian_crossing():
+    assert _parse_bbox("170,-10,-170,10") == (170.0, -10.0, -170.0, 10.0)
+
+
+@pytest.mark.parametrize("raw", ["0,10,5,5", "0,-95,5,5", "-190,0,5,5"])
+def test_parse_bbox_rejects_out_of_range_values(raw: str):
+    with pytest.raises(ValueError):
+        _parse_bbox(raw)
+
+
+def _export_row(**overrides):
+    row = {
+        "id": 3,
+        "created_at": datetime(2024, 1, 2, 3, 4, 5),
+        "updated_at": datetime(2024, 1, 2, 3, 4, 5),
+        "status": "approved",
+        "video_url": "https://example.com/v.mp4",
+        "lat": 1.5,
+        "lng": 2.5,
+        "tags": ["night", "city"],
+        "credits": 10,
+        "views": 0,
+        "likes": 0,
+        "pilot": SimpleNamespace(
+            id=9, username="ace", display_name=None, country_code="DE", email=None
+        ),
+    }
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+async def _batches(*batches):
+    for batch in batches:
+        yield batch
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_writes_one_line_per_flight():
+    chunks = [
+        chunk
+        async for chunk in _ndjson_chunks(
+            _batches([_export_row(), _export_row(id=4)], [_export_row(id=5)])
+        )
+    ]
+
+    assert len(chunks) == 2
+    assert [line.count(b"\n") for line in chunks] == [2, 1]
+    assert b'"pilot":{"id":9' in chunks[0]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_flattens_pilot_and_tags():
+    chunks = [
+        chunk
+        async for chunk in _csv_chunks(
+            _batches([_export_row()], [_export_row(id=4, pilot=None)])
+        )
+    ]
+
+    header, first = chunks[0].splitlines()
+    assert header.split(",") == EXPORT_CSV_COLUMNS
+    record = dict(zip(EXPORT_CSV_COLUMNS, first.split(","), strict=True))
+    assert record["tags"] == "night;city"
+    assert record["pilot_username"] == "ace"
+    assert chunks[1].split(",")[0] == "4"
+
+
+@pytest.fixture()
+def clusters_client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    app = FastAPI()
+    register_exception_handlers(app)
+    app.include_router(flights_router)
+
+    async def fake_session():
+        yield SimpleNamespace()
+
+    app.dependency_overrides[get_session] = fake_session
+    list_clusters = AsyncMock(return_value=[])
+    monkeypatch.setattr(FlightController, "list_clusters", list_clusters)
+
+    client = TestClient(app)
+    client.list_clusters = list_clusters
+    return client
+
+
+@pytest.mark.parametrize("zoom", ["", "-1", str(MAX_CLUSTER_ZOOM + 1)])
+def test_clusters_reject_zoom_levels_out_of_range(
+    clusters_client: TestClient, zoom: str
+):
+    params = {"zoom": zoom} if zoom else {}
+
+    response = clusters_client.get("/flights/clusters", params=params)
+
+    assert response.status_code == 422
+    clusters_client.list_clusters.assert_not_awaited()
+
+
+def test_clusters_reject_a_malformed_bbox(clusters_client: TestClient):
+    response = clusters_client.get(
+        "/flights/clusters", params={"zoom": 3, "bbox": "1,2,3"}
+    )
+
+    assert response.status_code == 400
+    clusters_client.list_clusters.assert_not_awaited()
+
+
+def test_clusters_pass_the_zoom_and_bbox_to_the_controller(
+    clusters_client: TestClient,
+):
+    response = clusters_client.get(
+        "/flights/clusters",
+        params={"zoom": MAX_CLUSTER_ZOOM, "bbox": "20,35,28,41", "limit": 10},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == []
+    kwargs = clusters_client.list_clusters.await_args.kwargs
+    assert kwargs["zoom"] == MAX_CLUSTER_ZOOM
+    assert kwargs["bbox"] == (20.0, 35.0, 28.0, 41.0)
+    assert kwargs["limit"] == 10
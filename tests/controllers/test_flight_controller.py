@@ -1,12 +1,22 @@
+from datetime import datetime
 from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
+from sqlalchemy.exc import IntegrityError
 
 from app.controllers import FlightController
+from app.models import Role
 from app.models.flight import FlightStatus, FlightTheme
-from app.schemas.requests.flights import FlightSubmissionRequest, PilotSubmission
-from core.exceptions import BadRequestException
+from app.schemas.requests.flights import (
+    FlightModerationItem,
+    FlightSubmissionRequest,
+    ModerationAction,
+    PilotSubmission,
+)
+from core.cache import StaleCache
+from core.exceptions import BadRequestException, NotFoundException
+from core.geo import decode_tile, tile_bbox
 
 
 def make_controller(
@@ -101,6 +111,303 @@ async def test_submit_flight_without_pilot_leaves_pilot_id_null():
     assert attrs["video_url"] == "https://youtu.be/foo"
 
 
+@pytest.mark.asyncio
+async def test_submit_flight_derives_missing_country_from_coordinates(monkeypatch):
+    monkeypatch.setattr("core.geo.countries.reverse_geocode", lambda lat, lng: "GR")
+    flight_repo = SimpleNamespace(create=AsyncMock(return_value=SimpleNamespace(id=5)))
+    pilot = SimpleNamespace(id=77)
+    user_repo = SimpleNamespace(get_or_create_pilot=AsyncMock(return_value=pilot))
+    controller = make_controller(flight_repo=flight_repo, user_repo=user_repo)
+
+    await controller.submit_flight(
+        FlightSubmissionRequest(
+            video_url="https://youtu.be/foo",
+            lat=37.98,
+            lng=23.72,
+            pilot=PilotSubmission(username="ace"),
+        )
+    )
+
+    assert flight_repo.create.await_args.args[0]["country_code"] == "GR"
+    assert user_repo.get_or_create_pilot.await_args.kwargs["country_code"] == "GR"
+
+
+def _submission(pilot: PilotSubmission | None = None) -> FlightSubmissionRequest:
+    return FlightSubmissionRequest(
+        video_url="https://youtu.be/foo", lat=1.0, lng=2.0, pilot=pilot, country_code="DE"
+    )
+
+
+@pytest.mark.asyncio
+async def test_submit_flights_resolves_pilots_once_and_reports_item_errors():
+    existing = SimpleNamespace(
+        id=5,
+        username="ace",
+        email=None,
+        role=Role.USER,
+        display_name="Ace",
+        country_code=None,
+        instagram_url=None,
+        youtube_url=None,
+        website_url=None,
+    )
+    taken = SimpleNamespace(id=6, username="jo", email="other@example.com")
+    staged = []
+
+    def add(attributes):
+        staged.append(SimpleNamespace(id=None, **attributes))
+        return staged[-1]
+
+    async def flush():
+        for index, user in enumerate(staged):
+            user.id = 100 + index
+
+    session = SimpleNamespace(flush=AsyncMock(side_effect=flush), commit=AsyncMock())
+    flight_repo = SimpleNamespace(
+        session=session,
+        insert_many=AsyncMock(
+            side_effect=lambda rows: [
+                SimpleNamespace(id=10 + index, **row) for index, row in enumerate(rows)
+            ]
+        ),
+    )
+    user_repo = SimpleNamespace(
+        session=session,
+        get_pilot_candidates=AsyncMock(return_value=[existing, taken]),
+        add=Mock(side_effect=add),
+    )
+    controller = make_controller(flight_repo=flight_repo, user_repo=user_repo)
+
+    results = await controller.submit_flights(
+        [
+            _submission(PilotSubmission(username="ace", email="ace@example.com")),
+            _submission(PilotSubmission(email="new@example.com")),
+            _submission(PilotSubmission(name="Nobody")),
+            _submission(PilotSubmission(email="jo@example.com")),
+            _submission(PilotSubmission(username="new")),
+            _submission(),
+        ]
+    )
+
+    assert results == [
+        {"id": 10, "error": None},
+        {"id": 11, "error": None},
+        {"id": None, "error": "The pilot needs a username or an email"},
+        {"id": None, "error": "Username 'jo' is already taken"},
+        {"id": 12, "error": None},
+        {"id": 13, "error": None},
+    ]
+    user_repo.get_pilot_candidates.assert_awaited_once_with(
+        {"ace", "new", "jo"}, {"ace@example.com", "new@example.com", "jo@example.com"}
+    )
+    assert existing.role == Role.PILOT
+    assert existing.email == "ace@example.com"
+    assert len(staged) == 1
+    rows = flight_repo.insert_many.await_args.args[0]
+    assert [row["pilot_id"] for row in rows] == [5, 100, 100, None]
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_moderate_groups_updates_and_aggregates_pilot_credits():
+    def row(id_, pilot_id, credits, status):
+        return SimpleNamespace(
+            id=id_, pilot_id=pilot_id, credits=credits, status=status
+        )
+
+    flight_repo = SimpleNamespace(
+        session=SimpleNamespace(commit=AsyncMock()),
+        moderate=AsyncMock(
+            side_effect=[
+                [
+                    row(1, 7, 5, FlightStatus.APPROVED),
+                    row(2, 7, 5, FlightStatus.APPROVED),
+                ],
+                [row(4, 8, 0, FlightStatus.REJECTED)],
+            ]
+        ),
+        statuses=AsyncMock(return_value={3: FlightStatus.APPROVED}),
+    )
+    user_repo = SimpleNamespace(award_credits=AsyncMock())
+    controller = make_controller(flight_repo=flight_repo, user_repo=user_repo)
+
+    results = await controller.moderate(
+        [
+            FlightModerationItem(id=1, action=ModerationAction.APPROVE, credits=5),
+            FlightModerationItem(id=2, action=ModerationAction.APPROVE, credits=5),
+            FlightModerationItem(id=3, action=ModerationAction.APPROVE, credits=5),
+            FlightModerationItem(id=4, action=ModerationAction.REJECT),
+            FlightModerationItem(id=9, action=ModerationAction.REJECT),
+        ]
+    )
+
+    assert [call.args[0] for call in flight_repo.moderate.await_args_list] == [
+        [1, 2, 3],
+        [4, 9],
+    ]
+    approve_values = flight_repo.moderate.await_args_list[0].args[1]
+    assert approve_values["credits"] == 5
+    user_repo.award_credits.assert_awaited_once_with(
+        [
+            {"user_id": 7, "flight_id": 1, "amount": 5},
+            {"user_id": 7, "flight_id": 2, "amount": 5},
+        ]
+    )
+    flight_repo.statuses.assert_awaited_once_with([3, 9])
+    assert results == [
+        {"id": 1, "status": FlightStatus.APPROVED, "updated": True},
+        {"id": 2, "status": FlightStatus.APPROVED, "updated": True},
+        {"id": 3, "status": FlightStatus.APPROVED, "updated": False},
+        {"id": 4, "status": FlightStatus.REJECTED, "updated": True},
+        {"id": 9, "error": "Flight not found"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_approve_awards_credits_without_loading_the_pilot():
+    flight = SimpleNamespace(
+        id=3,
+        pilot_id=7,
+        status=FlightStatus.PENDING,
+        credits=0,
+        approved_at=None,
+        rejected_reason="blurry",
+    )
+    session = SimpleNamespace(add=Mock(), commit=AsyncMock())
+    flight_repo = SimpleNamespace(session=session)
+    user_repo = SimpleNamespace(award_credits=AsyncMock(), get_by=AsyncMock())
+    controller = make_controller(flight_repo=flight_repo, user_repo=user_repo)
+    controller.get_by_id = AsyncMock(return_value=flight)
+
+    await controller.approve(3, credits=12)
+
+    user_repo.get_by.assert_not_awaited()
+    user_repo.award_credits.assert_awaited_once_with(
+        [{"user_id": 7, "flight_id": 3, "amount": 12}]
+    )
+    assert flight.status == FlightStatus.APPROVED
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_moderate_rejects_duplicate_ids():
+    controller = make_controller()
+
+    with pytest.raises(BadRequestException):
+        await controller.moderate(
+            [
+                FlightModerationItem(id=1, action=ModerationAction.APPROVE),
+                FlightModerationItem(id=1, action=ModerationAction.REJECT),
+            ]
+        )
+
+
+@pytest.mark.asyncio
+async def test_stats_overview_reads_status_counters_instead_of_flights():
+    flight_repo = SimpleNamespace(
+        flights_per_day=AsyncMock(return_value=[]),
+        top_countries=AsyncMock(return_value=[]),
+        top_pilots=AsyncMock(return_value=[]),
+        status_counts=AsyncMock(
+            return_value={
+                FlightStatus.PENDING: 4,
+                FlightStatus.APPROVED: 9,
+                FlightStatus.REJECTED: 0,
+            }
+        ),
+        get_filtered=AsyncMock(),
+    )
+
+    async def concurrently(*reads):
+        return [await read(flight_repo) for read in reads]
+
+    flight_repo.concurrently = concurrently
+    controller = make_controller(flight_repo=flight_repo)
+
+    overview = await controller.stats_overview(
+        start=datetime(2024, 1, 1).date(),
+        end=datetime(2024, 2, 1).date(),
+        metric="flights",
+        top_limit=5,
+    )
+
+    assert overview["pending_flights"] == 4
+    assert overview["status_counts"] == {"pending": 4, "approved": 9, "rejected": 0}
+    flight_repo.get_filtered.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_top_pilots_are_read_once_per_key_while_fresh():
+    flight_repo = SimpleNamespace(top_pilots=AsyncMock(return_value=[{"pilot_id": 1}]))
+
+    async def concurrently(*reads):
+        return [await read(flight_repo) for read in reads]
+
+    flight_repo.concurrently = concurrently
+    controller = FlightController(
+        flight_repository=flight_repo,
+        user_repository=SimpleNamespace(),
+        leaderboard_cache=StaleCache(max_entries=8, ttl=60),
+    )
+    versions = {"flights": 3, "users": 1}
+
+    first = await controller.top_pilots(None, "credits", None, None, 50, versions)
+    second = await controller.top_pilots(None, "credits", None, None, 50, versions)
+    other = await controller.top_pilots("GR", "credits", None, None, 50, versions)
+
+    assert first.value == second.value == other.value == [{"pilot_id": 1}]
+    assert first.version == versions
+    assert flight_repo.top_pilots.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_top_pilot_pages_are_cached_per_cursor():
+    flight_repo = SimpleNamespace(top_pilots=AsyncMock(return_value=[{"pilot_id": 1}]))
+
+    async def concurrently(*reads):
+        return [await read(flight_repo) for read in reads]
+
+    flight_repo.concurrently = concurrently
+    controller = FlightController(
+        flight_repository=flight_repo,
+        user_repository=SimpleNamespace(),
+        leaderboard_cache=StaleCache(max_entries=8, ttl=60),
+    )
+    versions = {"flights": 3, "users": 1}
+
+    await controller.top_pilots(None, "credits", None, None, 50, versions)
+    await controller.top_pilots(
+        None, "credits", None, None, 50, versions, after=(40, 7, 120)
+    )
+
+    assert flight_repo.top_pilots.await_count == 2
+    assert flight_repo.top_pilots.await_args.kwargs["after"] == (40, 7, 120)
+
+
+@pytest.mark.asyncio
+async def test_pilot_rank_splits_neighbours_around_the_pilot():
+    rows = [
+        {"pilot_id": 3, "rank": 4},
+        {"pilot_id": 7, "rank": 4},
+        {"pilot_id": 1, "rank": 5},
+    ]
+    flight_repo = SimpleNamespace(pilot_rank=AsyncMock(return_value=rows))
+    controller = make_controller(flight_repo=flight_repo)
+
+    ranked = await controller.pilot_rank(7, None, "credits", None, None, 1)
+
+    assert ranked == {"entry": rows[1], "above": [rows[0]], "below": [rows[2]]}
+
+
+@pytest.mark.asyncio
+async def test_pilot_rank_of_an_unranked_pilot_is_not_found():
+    flight_repo = SimpleNamespace(pilot_rank=AsyncMock(return_value=[]))
+    controller = make_controller(flight_repo=flight_repo)
+
+    with pytest.raises(NotFoundException):
+        await controller.pilot_rank(7, None, "credits", None, None, 1)
+
+
 @pytest.mark.parametrize("metric", ["flights", "credits", "views"])
 def test_validate_metric_accepts_allowed_values(metric: str):
     controller = make_controller()
@@ -139,3 +446,236 @@ async def test_update_flight_updates_when_no_status_change():
     controller.get_by_id.assert_awaited_once_with(9)
     flight_repo.update.assert_awaited_once_with("flight", {"title": "New title"})
     assert result == "updated"
+
+
+@pytest.mark.asyncio
+async def test_render_tile_encodes_marker_rows():
+    flight_repo = SimpleNamespace()
+    flight_repo.tile_markers = AsyncMock(
+        return_value=[
+            {"id": 5, "lat": 0.5, "lng": 0.5, "theme": FlightTheme.RACING, "country_code": "DE"},
+            {"id": 6, "lat": 1.0, "lng": 1.0, "theme": None, "country_code": None},
+        ]
+    )
+    controller = make_controller(flight_repo=flight_repo)
+
+    body = await controller.render_tile(1, 1, 0, {"status": FlightStatus.APPROVED})
+
+    _, markers = decode_tile(body)
+    assert [m.id for m in markers] == [5, 6]
+    assert markers[0].theme == list(FlightTheme).index(FlightTheme.RACING) + 1
+    assert markers[0].country_code == "DE"
+    assert markers[1].theme == 0
+    assert flight_repo.tile_markers.await_args.kwargs["bbox"] == tile_bbox(1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_render_tile_rejects_out_of_range_address():
+    controller = make_controller()
+
+    with pytest.raises(BadRequestException):
+        await controller.render_tile(2, 4, 0, None)
+
+
+@pytest.mark.asyncio
+async def test_list_public_rejects_cursor_with_relevance_sort():
+    controller = make_controller()
+
+    with pytest.raises(BadRequestException):
+        await controller.list_public(
+            bbox=None,
+            filters={"q": "sunset"},
+            limit=10,
+            offset=0,
+            after=(datetime(2024, 1, 1), 5),
+            sort="relevance",
+        )
+
+
+@pytest.mark.asyncio
+async def test_list_tags_returns_top_tags_without_a_tag():
+    flight_repo = SimpleNamespace()
+    flight_repo.tag_counts = AsyncMock(return_value=[{"tag": "urban", "count": 4}])
+    flight_repo.related_tags = AsyncMock()
+    controller = make_controller(flight_repo=flight_repo)
+
+    result = await controller.list_tags(tag=None, limit=10)
+
+    assert result == [{"tag": "urban", "count": 4}]
+    flight_repo.tag_counts.assert_awaited_once_with(10)
+    flight_repo.related_tags.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_list_tags_returns_co_occurring_tags_for_a_tag():
+    flight_repo = SimpleNamespace()
+    flight_repo.tag_counts = AsyncMock()
+    flight_repo.related_tags = AsyncMock(return_value=[{"tag": "night", "count": 2}])
+    controller = make_controller(flight_repo=flight_repo)
+
+    result = await controller.list_tags(tag="urban", limit=5)
+
+    assert result == [{"tag": "night", "count": 2}]
+    flight_repo.related_tags.assert_awaited_once_with("urban", 5)
+    flight_repo.tag_counts.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_facet_counts_deduplicates_requested_facets():
+    flight_repo = SimpleNamespace()
+    flight_repo.facet_counts = AsyncMock(return_value={"theme": [], "country": []})
+    controller = make_controller(flight_repo=flight_repo)
+
+    await controller.facet_counts(
+        bbox=None, filters=None, facets=["theme", "country", "theme"]
+    )
+
+    flight_repo.facet_counts.assert_awaited_once_with(
+        bbox=None, filters=None, facets=["theme", "country"]
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("facet", ["pilot", "status"])
+async def test_facet_counts_rejects_unknown_facets(facet: str):
+    flight_repo = SimpleNamespace()
+    flight_repo.facet_counts = AsyncMock()
+    controller = make_controller(flight_repo=flight_repo)
+
+    with pytest.raises(BadRequestException):
+        await controller.facet_counts(bbox=None, filters=None, facets=[facet])
+
+    flight_repo.facet_counts.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reject_invalidates_cached_responses_for_old_and_new_state():
+    flight = SimpleNamespace(
+        id=4,
+        status=FlightStatus.APPROVED,
+        country_code="DE",
+        drone_type=None,
+        theme=None,
+        tags=[],
+        duration_seconds=None,
+        lat=0.0,
+        lng=0.0,
+        rejected_reason=None,
+        approved_at=datetime(2024, 1, 1),
+    )
+    session = SimpleNamespace(add=lambda obj: None, commit=AsyncMock())
+    flight_repo = SimpleNamespace(session=session)
+    cache = SimpleNamespace(invalidate=Mock())
+    controller = FlightController(
+        flight_repository=flight_repo,
+        user_repository=SimpleNamespace(),
+        response_cache=cache,
+    )
+    controller.get_by_id = AsyncMock(return_value=flight)
+
+    await controller.reject(4, "blurry")
+
+    statuses = [call.args[0]["status"] for call in cache.invalidate.call_args_list]
+    assert statuses == [FlightStatus.APPROVED, FlightStatus.REJECTED]
+
+
+@pytest.mark.asyncio
+async def test_record_view_only_buffers_approved_flights():
+    approved = {1}
+    flight_repo = SimpleNamespace(
+        is_approved=AsyncMock(side_effect=lambda flight_id: flight_id in approved)
+    )
+
+    async def concurrently(*reads):
+        return [await read(flight_repo) for read in reads]
+
+    flight_repo.concurrently = concurrently
+    flight_views = SimpleNamespace(add=Mock())
+    controller = FlightController(
+        flight_repository=flight_repo,
+        user_repository=SimpleNamespace(),
+        flight_views=flight_views,
+        viewable_flights=StaleCache(max_entries=8, ttl=60),
+    )
+
+    await controller.record_view(1)
+    await controller.record_view(1)
+    for flight_id in (2, 999):
+        with pytest.raises(NotFoundException):
+            await controller.record_view(flight_id)
+
+    assert [call.args for call in flight_views.add.call_args_list] == [(1,), (1,)]
+    assert flight_repo.is_approved.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_submit_flights_resolves_again_after_a_concurrent_pilot_insert():
+    raced = SimpleNamespace(
+        id=8,
+        username="new",
+        email="new@example.com",
+        role=Role.PILOT,
+        display_name=None,
+        country_code="DE",
+        instagram_url=None,
+        youtube_url=None,
+        website_url=None,
+    )
+    taken = SimpleNamespace(id=9, username="jo", email="other@example.com")
+    session = SimpleNamespace(
+        flush=AsyncMock(side_effect=[IntegrityError("INSERT", {}, Exception()), None]),
+        commit=AsyncMock(),
+        rollback=AsyncMock(),
+    )
+    flight_repo = SimpleNamespace(
+        session=session,
+        insert_many=AsyncMock(
+            side_effect=lambda rows: [
+                SimpleNamespace(id=10 + index, **row) for index, row in enumerate(rows)
+            ]
+        ),
+    )
+    user_repo = SimpleNamespace(
+        session=session,
+        get_pilot_candidates=AsyncMock(side_effect=[[], [raced, taken]]),
+        add=Mock(side_effect=lambda attributes: SimpleNamespace(id=None, **attributes)),
+    )
+    controller = make_controller(flight_repo=flight_repo, user_repo=user_repo)
+
+    results = await controller.submit_flights(
+        [
+            _submission(PilotSubmission(username="new")),
+            _submission(PilotSubmission(email="jo@example.com")),
+        ]
+    )
+
+    assert results == [
+        {"id": 10, "error": None},
+        {"id": None, "error": "Username 'jo' is already taken"},
+    ]
+    session.rollback.assert_awaited_once()
+    assert user_repo.get_pilot_candidates.await_count == 2
+    rows = flight_repo.insert_many.await_args.args[0]
+    assert [row["pilot_id"] for row in rows] == [8]
+    flight_repo.insert_many.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_submit_flights_gives_up_after_a_second_integrity_error():
+    session = SimpleNamespace(
+        flush=AsyncMock(side_effect=IntegrityError("INSERT", {}, Exception())),
+        rollback=AsyncMock(),
+    )
+    user_repo = SimpleNamespace(
+        session=session,
+        get_pilot_candidates=AsyncMock(return_value=[]),
+        add=Mock(side_effect=lambda attributes: SimpleNamespace(id=None, **attributes)),
+    )
+    controller = make_controller(
+        flight_repo=SimpleNamespace(session=session), user_repo=user_repo
+    )
+
+    with pytest.raises(BadRequestException):
+        await controller.submit_flights([_submission(PilotSubmission(username="new"))])
+
+    assert session.rollback.await_count == 2
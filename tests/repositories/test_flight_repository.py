@@ -0,0 +1,334 @@
+import re
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models import Flight
+from app.models.flight import FlightStatus, FlightTheme
+from app.repositories.flights import FlightRepository, matches_public_filters
+from core.database.migration import UNVERSIONED_COLUMNS
+from core.geo import CELL_BITS
+
+
+class FacetRow(tuple):
+    """Stands in for a result row of the GROUPING SETS query."""
+
+    def __new__(cls, values, grouping, count):
+        row = super().__new__(cls, values)
+        row.grouping = grouping
+        row.count = count
+        return row
+
+
+@pytest.mark.asyncio
+async def test_facet_counts_assigns_rows_to_facets_by_grouping_bits():
+    rows = [
+        FacetRow(("urban", None, None), grouping=0b011, count=5),
+        FacetRow((None, None, "60-180"), grouping=0b110, count=4),
+        FacetRow((None, "US", None), grouping=0b101, count=3),
+        FacetRow((None, None, None), grouping=0b110, count=1),
+    ]
+    session = SimpleNamespace(execute=AsyncMock(return_value=rows))
+    repository = FlightRepository(Flight, session)
+
+    counts = await repository.facet_counts(
+        bbox=None, filters=None, facets=["theme", "country", "duration"]
+    )
+
+    assert counts == {
+        "theme": [{"value": "urban", "count": 5}],
+        "country": [{"value": "US", "count": 3}],
+        "duration": [
+            {"value": "60-180", "count": 4},
+            {"value": None, "count": 1},
+        ],
+    }
+    sql = str(session.execute.await_args.args[0])
+    assert "GROUP BY GROUPING SETS" in sql
+
+
+@pytest.mark.asyncio
+async def test_list_public_selects_response_columns_without_orm_entities():
+    result = SimpleNamespace(all=lambda: ["row"])
+    session = SimpleNamespace(execute=AsyncMock(return_value=result))
+    repository = FlightRepository(Flight, session)
+
+    rows = await repository.list_public(bbox=None, filters=None, limit=10, offset=0)
+
+    assert rows == ["row"]
+    query = session.execute.await_args.args[0]
+    assert "LEFT OUTER JOIN users" in str(query)
+    assert "search_vector" not in str(query)
+    assert not any(
+        description.get("entity") is Flight and description["expr"] is Flight
+        for description in query.column_descriptions
+    )
+
+
+def _snapshot(**overrides):
+    flight = {
+        "id": 1,
+        "status": FlightStatus.APPROVED,
+        "country_code": "DE",
+        "drone_type": "fpv",
+        "theme": FlightTheme.URBAN,
+        "tags": ["night", "city"],
+        "duration_seconds": 120,
+        "lat": 10.0,
+        "lng": 175.0,
+    }
+    flight.update(overrides)
+    return flight
+
+
+@pytest.mark.parametrize(
+    ("bbox", "filters", "expected"),
+    [
+        (None, None, True),
+        (None, {"status": FlightStatus.PENDING}, False),
+        (None, {"country": "DE", "theme": FlightTheme.URBAN}, True),
+        (None, {"drone_type": "cinewhoop"}, False),
+        (None, {"tags": ["night"]}, True),
+        (None, {"tags": ["night", "snow"]}, False),
+        (None, {"duration_min": 60, "duration_max": 120}, True),
+        (None, {"duration_min": 121}, False),
+        (None, {"q": "anything", "pilot_name": "anyone"}, True),
+        ((170.0, 0.0, -170.0, 20.0), None, True),
+        ((-10.0, 0.0, 10.0, 20.0), None, False),
+    ],
+)
+def test_matches_public_filters(bbox, filters, expected):
+    assert matches_public_filters(_snapshot(), bbox, filters) is expected
+
+
+def test_matches_public_filters_rejects_unknown_duration_when_bounded():
+    flight = _snapshot(duration_seconds=None)
+
+    assert matches_public_filters(flight, None, {"duration_max": 60}) is False
+
+
+@pytest.mark.asyncio
+async def test_stream_public_yields_cursor_partitions_in_batches():
+    async def partitions():
+        yield ["first", "second"]
+        yield ["third"]
+
+    result = SimpleNamespace(partitions=partitions)
+    session = SimpleNamespace(stream=AsyncMock(return_value=result))
+    repository = FlightRepository(Flight, session)
+
+    batches = [
+        batch
+        async for batch in repository.stream_public(
+            bbox=None, filters={"country": "DE"}, batch_size=2
+        )
+    ]
+
+    assert batches == [["first", "second"], ["third"]]
+    query = session.stream.await_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 2
+    assert "ORDER BY flights.created_at DESC, flights.id DESC" in str(query)
+
+
+@pytest.mark.asyncio
+async def test_status_counts_fills_statuses_without_a_counter_row():
+    result = SimpleNamespace(
+        tuples=lambda: SimpleNamespace(all=lambda: [(FlightStatus.PENDING, 3)])
+    )
+    session = SimpleNamespace(execute=AsyncMock(return_value=result))
+    repository = FlightRepository(Flight, session)
+
+    counts = await repository.status_counts()
+
+    assert counts == {
+        FlightStatus.PENDING: 3,
+        FlightStatus.APPROVED: 0,
+        FlightStatus.REJECTED: 0,
+    }
+    assert "FROM flight_status_counts" in str(session.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_leaderboards_rank_from_daily_rollups_not_flights():
+    session = SimpleNamespace(execute=AsyncMock(return_value=[]))
+    repository = FlightRepository(Flight, session)
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+
+    await repository.top_pilots(
+        country_code="DE", metric="views", start=start, end=end, limit=5
+    )
+    await repository.top_countries(metric="credits", start=start, end=end, limit=5)
+
+    for call in session.execute.await_args_list:
+        sql = str(call.args[0])
+        assert "flight_daily_rollups.day >=" in sql
+        assert "FROM flights" not in sql
+    pilots_sql = str(session.execute.await_args_list[0].args[0])
+    assert "ORDER BY totals.total_views DESC" in pilots_sql
+
+
+@pytest.mark.asyncio
+async def test_country_stats_aggregates_one_country_with_its_bounding_box():
+    row = SimpleNamespace(
+        _mapping={"flights_count": 2, "min_lng": 20.1, "max_lat": 41.0}
+    )
+    session = SimpleNamespace(
+        execute=AsyncMock(return_value=SimpleNamespace(one=lambda: row))
+    )
+    repository = FlightRepository(Flight, session)
+
+    stats = await repository.country_stats("GR", datetime(2024, 1, 1), None)
+
+    assert stats["flights_count"] == 2
+    sql = str(session.execute.await_args.args[0])
+    assert "flights.country_code = :country_code_1" in sql
+    assert "upper(" not in sql
+    assert "min(flights.lng)" in sql
+    assert "flights.created_at >=" in sql
+    assert "flights.created_at <" not in sql
+
+
+@pytest.mark.asyncio
+async def test_pilot_rank_windows_the_ranking_around_the_pilot():
+    session = SimpleNamespace(execute=AsyncMock(return_value=[]))
+    repository = FlightRepository(Flight, session)
+
+    await repository.pilot_rank(
+        7, country_code=None, metric="credits", start=None, end=None, neighbours=2
+    )
+
+    sql = str(session.execute.await_args.args[0])
+    assert sql.startswith("WITH ranked AS")
+    assert "dense_rank() OVER (ORDER BY totals.total_credits DESC) AS rank" in sql
+    assert "ranked.position BETWEEN" in sql
+    assert "LIMIT" not in sql
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_pages_seek_past_the_cursor_and_continue_its_ranks():
+    rows = [
+        SimpleNamespace(_mapping={"metric_value": 40, "rank": 1, "position": 1}),
+        SimpleNamespace(_mapping={"metric_value": 30, "rank": 2, "position": 2}),
+    ]
+    session = SimpleNamespace(execute=AsyncMock(side_effect=[rows, rows]))
+    repository = FlightRepository(Flight, session)
+
+    tied = await repository.top_pilots(
+        None, "credits", None, None, limit=2, after=(40, 7, 120)
+    )
+    after_tie = await repository.top_countries(
+        "flights", None, None, limit=2, after=(50, "DE", 12)
+    )
+
+    assert [row["rank"] for row in tied] == [120, 121]
+    assert [row["rank"] for row in after_tie] == [13, 14]
+    assert "position" not in tied[0]
+    pilots_sql, countries_sql = (
+        str(call.args[0]) for call in session.execute.await_args_list
+    )
+    assert "totals.total_credits < :" in pilots_sql
+    assert "users.id > :" in pilots_sql
+    assert "OFFSET" not in pilots_sql
+    assert "HAVING sum(flight_daily_rollups.flights) < :" in countries_sql
+    assert "flight_daily_rollups.country_code > :" in countries_sql
+
+
+@pytest.mark.asyncio
+async def test_add_views_joins_the_increments_as_values():
+    session = SimpleNamespace(
+        execute=AsyncMock(return_value=SimpleNamespace(rowcount=2)),
+        commit=AsyncMock(),
+    )
+    repository = FlightRepository(Flight, session)
+
+    updated = await repository.add_views({9: 1, 3: 40})
+
+    assert updated == 2
+    session.commit.assert_awaited_once()
+    sql = str(session.execute.await_args.args[0])
+    assert "FROM (VALUES" in sql
+    assert "flights.id = increments.id" in sql
+    assert "coalesce(flights.views" in sql
+    assert "updated_at=flights.updated_at" in sql
+    # Flushes must not bump the flights version, or every ETag churns.
+    assigned = re.findall(r"(\w+)=", sql.split(" SET ")[1].split(" FROM ")[0])
+    assert set(assigned) <= set(UNVERSIONED_COLUMNS["flights"])
+
+
+@pytest.mark.asyncio
+async def test_clusters_group_by_the_shifted_cell_of_the_zoom_level():
+    session = SimpleNamespace(execute=AsyncMock(return_value=[]))
+    repository = FlightRepository(Flight, session)
+
+    await repository.clusters(
+        bbox=(20.0, 35.0, 28.0, 41.0), filters={"country": "GR"}, zoom=3, limit=50
+    )
+
+    compiled = session.execute.await_args.args[0].compile()
+    sql = str(compiled)
+    params = compiled.params
+    assert "GROUP BY flights.geo_cell >> :" in sql
+    assert "flights.geo_cell IS NOT NULL" in sql
+    assert "ORDER BY count DESC" in sql
+    assert "flights.geo_cell BETWEEN" in sql
+    assert "flights.country_code = :country_code_1" in sql
+    assert "flights.status = :status_1" in sql
+    assert params["country_code_1"] == "GR"
+    # Level 3 + CLUSTER_LEVEL_OFFSET keeps 5 of the 16 bits per axis.
+    assert 2 * (CELL_BITS - 5) in params.values()
+    assert "LIMIT :" in sql
+    assert 50 in params.values()
+
+
+@pytest.mark.asyncio
+async def test_clusters_clamp_the_level_at_the_cell_resolution():
+    session = SimpleNamespace(execute=AsyncMock(return_value=[]))
+    repository = FlightRepository(Flight, session)
+
+    await repository.clusters(bbox=None, filters=None, zoom=CELL_BITS + 4, limit=7)
+
+    params = session.execute.await_args.args[0].compile().params
+    assert sorted(value for value in params.values() if isinstance(value, int)) == [
+        0,
+        7,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_is_approved_checks_existence_and_status():
+    result = SimpleNamespace(scalar=lambda: True)
+    session = SimpleNamespace(execute=AsyncMock(return_value=result))
+    repository = FlightRepository(Flight, session)
+
+    assert await repository.is_approved(5) is True
+
+    sql = str(session.execute.await_args.args[0])
+    assert "EXISTS (SELECT" in sql
+    assert "flights.id = :id_1" in sql
+    assert "flights.status = :status_1" in sql
+
+
+@pytest.mark.asyncio
+async def test_backfill_search_vectors_touches_titles_in_batches():
+    results = [
+        SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [3, 4])),
+        None,
+        SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [])),
+    ]
+    session = SimpleNamespace(
+        execute=AsyncMock(side_effect=results), commit=AsyncMock()
+    )
+    repository = FlightRepository(Flight, session)
+
+    assert await repository.backfill_search_vectors(batch_size=2) == 2
+
+    select_sql, update_sql, _ = (
+        str(call.args[0]) for call in session.execute.await_args_list
+    )
+    assert "flights.search_vector IS NULL" in select_sql
+    assert "LIMIT :param_1" in select_sql
+    assert "SET title=flights.title" in update_sql
+    assert "flights.id IN (__[POSTCOMPILE_id_1])" in update_sql
+    session.commit.assert_awaited_once()
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import CreditKind, User
+from app.repositories.users import UserRepository, name_match
+
+
+def _sql(clause) -> str:
+    return str(
+        clause.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_name_match_uses_substring_ilike_for_trigram_sized_terms():
+    sql = _sql(name_match("Ace"))
+
+    assert "users.username ILIKE '%%ace%%'" in sql
+    assert "users.display_name ILIKE '%%ace%%'" in sql
+
+
+def test_name_match_uses_lowercase_prefix_for_short_terms():
+    sql = _sql(name_match("Ac"))
+
+    assert "lower(users.username) LIKE 'ac%%'" in sql
+    assert "ILIKE" not in sql
+
+
+def test_name_match_escapes_like_wildcards():
+    sql = _sql(name_match("a_b%"))
+
+    assert "'%%a\\_b\\%%%%'" in sql
+
+
+@pytest.mark.asyncio
+async def test_award_credits_appends_ledger_rows_and_increments_totals_in_sql():
+    session = SimpleNamespace(execute=AsyncMock())
+    repository = UserRepository(User, session)
+
+    await repository.award_credits(
+        [
+            {"user_id": 1, "flight_id": 10, "amount": 5},
+            {"user_id": 1, "flight_id": 11, "amount": 3},
+            {"user_id": 2, "flight_id": 12, "amount": 0},
+        ]
+    )
+
+    (insert, entries), (update,) = (
+        call.args for call in session.execute.await_args_list
+    )
+    assert insert.table.name == "credit_entries"
+    assert [entry["flight_id"] for entry in entries] == [10, 11]
+    assert {entry["kind"] for entry in entries} == {CreditKind.APPROVAL}
+    sql = _sql(update)
+    assert "coalesce(users.total_credits, 0) + CASE users.id WHEN 1 THEN 8 END" in sql
+    assert "users.id IN (1)" in sql
+
+
+@pytest.mark.asyncio
+async def test_award_credits_skips_empty_awards():
+    session = SimpleNamespace(execute=AsyncMock())
+    repository = UserRepository(User, session)
+
+    await repository.award_credits([{"user_id": 1, "flight_id": 10, "amount": 0}])
+
+    session.execute.assert_not_awaited()
@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import Flight
+from app.repositories import FlightRepository
+from core.repository import base
+
+
+class FakeSession:
+    def __init__(self, sessions: list["FakeSession"]):
+        sessions.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_concurrently_runs_reads_side_by_side_on_their_own_sessions(monkeypatch):
+    sessions: list[FakeSession] = []
+    monkeypatch.setattr(base, "reader_session_factory", lambda: FakeSession(sessions))
+    repository = FlightRepository(Flight, SimpleNamespace())
+    started = asyncio.Event()
+    running = 0
+
+    async def read(repo, value):
+        nonlocal running
+        running += 1
+        if running == 2:
+            started.set()
+        # Only returns once both reads are in flight at the same time.
+        await asyncio.wait_for(started.wait(), timeout=1)
+        return value, repo.session
+
+    (first, first_session), (second, second_session) = await repository.concurrently(
+        lambda repo: read(repo, "first"), lambda repo: read(repo, "second")
+    )
+
+    assert (first, second) == ("first", "second")
+    assert first_session is not second_session
+    assert {first_session, second_session} == set(sessions)
+    assert all(session.closed for session in sessions)
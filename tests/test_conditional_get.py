@@ -0,0 +1,173 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.controllers.flight import LEADERBOARD_TABLES
+from app.models.table_version import VIEWS_VERSION
+from core.database import get_session
+from core.fastapi.dependencies import Validators, conditional_get
+from core.fastapi.dependencies.conditional import _matches
+from core.fastapi.exception_handlers import register_exception_handlers
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def tuples(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+@pytest.fixture()
+def versions() -> dict[str, int]:
+    return {"flights": 3}
+
+
+@pytest.fixture()
+def test_client(versions: dict[str, int]) -> TestClient:
+    app = FastAPI()
+    register_exception_handlers(app)
+    calls = SimpleNamespace(count=0)
+
+    async def fake_session():
+        yield SimpleNamespace(
+            execute=AsyncMock(side_effect=lambda *_: FakeResult(list(versions.items())))
+        )
+
+    app.dependency_overrides[get_session] = fake_session
+
+    @app.get(
+        "/items",
+        dependencies=[
+            Depends(
+                conditional_get(
+                    "flights", "users", max_age=5, stale_while_revalidate=30
+                )
+            )
+        ],
+    )
+    async def items():
+        calls.count += 1
+        return [1, 2]
+
+    client = TestClient(app)
+    client.calls = calls
+    return client
+
+
+def test_response_carries_etag_and_cache_control(test_client: TestClient):
+    response = test_client.get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert (
+        response.headers["cache-control"]
+        == "public, max-age=5, stale-while-revalidate=30"
+    )
+
+
+def test_matching_if_none_match_returns_304_without_running_the_endpoint(
+    test_client: TestClient,
+):
+    etag = test_client.get("/items").headers["etag"]
+
+    response = test_client.get("/items", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert test_client.calls.count == 1
+
+
+def test_table_version_change_produces_a_new_etag(
+    test_client: TestClient, versions: dict[str, int]
+):
+    etag = test_client.get("/items").headers["etag"]
+    versions["flights"] += 1
+
+    response = test_client.get("/items", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_query_string_is_part_of_the_etag(test_client: TestClient):
+    first = test_client.get("/items?limit=1").headers["etag"]
+    second = test_client.get("/items?limit=2").headers["etag"]
+
+    assert first != second
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ('"abc"', '"abc"'),
+        ('W/"abc"', '"abc"'),
+        ('"other", "abc-gzip"', '"abc-gzip"'),
+        ("*", '"abc"'),
+        ('"other"', None),
+    ],
+)
+def test_matches_compares_weakly_and_accepts_gzip_variant(header, expected):
+    assert _matches(header, '"abc"') == expected
+
+
+def test_a_body_read_at_older_versions_carries_their_etag(versions: dict[str, int]):
+    app = FastAPI()
+    check = conditional_get("flights", max_age=5, stale_while_revalidate=30)
+    read_at = dict(versions)
+
+    async def fake_session():
+        yield SimpleNamespace(
+            execute=AsyncMock(side_effect=lambda *_: FakeResult(list(versions.items())))
+        )
+
+    app.dependency_overrides[get_session] = fake_session
+
+    @app.get("/items")
+    async def items(request: Request, validators: Validators = Depends(check)):
+        return Response(b"[]", headers=validators.headers_for(request, read_at))
+
+    client = TestClient(app)
+    old_etag = client.get("/items").headers["etag"]
+    versions["flights"] += 1
+
+    response = client.get("/items")
+
+    assert response.headers["etag"] == old_etag
+    revalidated = client.get("/items", headers={"If-None-Match": old_etag})
+    assert revalidated.status_code == 200
+
+
+def test_a_views_flush_changes_the_leaderboard_etag(versions: dict[str, int]):
+    app = FastAPI()
+    check = conditional_get(*LEADERBOARD_TABLES, max_age=30, stale_while_revalidate=300)
+
+    async def fake_session():
+        yield SimpleNamespace(
+            execute=AsyncMock(side_effect=lambda *_: FakeResult(list(versions.items())))
+        )
+
+    app.dependency_overrides[get_session] = fake_session
+
+    @app.get("/leaderboards/pilots", dependencies=[Depends(check)])
+    async def pilots():
+        return []
+
+    client = TestClient(app)
+    etag = client.get("/leaderboards/pilots?metric=views").headers["etag"]
+    # A flush bumps only the views version, not the flights one.
+    versions[VIEWS_VERSION] = versions.get(VIEWS_VERSION, 0) + 1
+
+    response = client.get(
+        "/leaderboards/pilots?metric=views", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from core.geo import bbox_cell_ranges, cell_key, split_antimeridian
+
+
+def _covered(key: int, ranges: list[tuple[int, int]]) -> bool:
+    return any(low <= key <= high for low, high in ranges)
+
+
+def test_cell_key_preserves_locality():
+    athens = cell_key(37.98, 23.72)
+
+    assert cell_key(37.981, 23.721) >> 8 == athens >> 8
+    assert cell_key(-33.86, 151.2) >> 8 != athens >> 8
+
+
+def test_cell_key_clamps_the_grid_edges():
+    assert cell_key(90, 180) == (1 << 32) - 1
+    assert cell_key(-90, -180) == 0
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [
+        (23.5, 37.8, 23.9, 38.1),
+        (-10.0, 35.0, 30.0, 60.0),
+        (-180.0, -90.0, 180.0, 90.0),
+        (170.0, -20.0, -170.0, 5.0),
+    ],
+)
+def test_bbox_cell_ranges_cover_every_point_inside(bbox):
+    rng = random.Random(7)
+    ranges = bbox_cell_ranges(bbox)
+
+    for part in split_antimeridian(bbox):
+        min_lng, min_lat, max_lng, max_lat = part
+        for _ in range(200):
+            lat = rng.uniform(min_lat, max_lat)
+            lng = rng.uniform(min_lng, max_lng)
+            assert _covered(cell_key(lat, lng), ranges)
+
+
+def test_bbox_cell_ranges_are_sorted_and_disjoint():
+    ranges = bbox_cell_ranges((-10.0, 35.0, 30.0, 60.0))
+
+    for (_, high), (low, _) in zip(ranges[:-1], ranges[1:], strict=True):
+        assert high + 1 < low
+
+
+def test_split_antimeridian_wraps_boxes_crossing_180():
+    assert split_antimeridian((170.0, -5.0, -170.0, 5.0)) == [
+        (170.0, -5.0, 180.0, 5.0),
+        (-180.0, -5.0, -170.0, 5.0),
+    ]
+    assert split_antimeridian((1.0, 2.0, 3.0, 4.0)) == [(1.0, 2.0, 3.0, 4.0)]
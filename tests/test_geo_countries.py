@@ -0,0 +1,79 @@
+import json
+import threading
+
+import pytest
+
+from core.geo import (
+    CountryIndex,
+    load_country_index,
+    normalize_country_code,
+    reverse_geocode_many,
+)
+
+SQUARE = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+HOLE = [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]]
+ISLAND = [[20, 0.5], [21, 0.5], [21, 1.5], [20, 1.5], [20, 0.5]]
+
+
+@pytest.mark.parametrize(
+    ("code", "expected"), [("gr", "GR"), (" De ", "DE"), ("", None), (None, None)]
+)
+def test_normalize_country_code(code, expected):
+    assert normalize_country_code(code) == expected
+
+
+@pytest.mark.parametrize(
+    ("lat", "lng", "expected"),
+    [
+        (1.0, 1.0, "DE"),
+        (9.5, 9.5, "DE"),
+        (5.0, 5.0, "LS"),
+        (1.0, 20.5, "DE"),
+        (1.0, 15.0, None),
+        (-1.0, 1.0, None),
+    ],
+)
+def test_country_index_looks_up_polygons_with_holes_and_parts(lat, lng, expected):
+    index = CountryIndex([("DE", [SQUARE, HOLE, ISLAND]), ("LS", [HOLE])])
+
+    assert index.lookup(lat, lng) == expected
+
+
+def test_load_country_index_reads_geojson_features(tmp_path):
+    path = tmp_path / "countries.geojson"
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"ISO_A2": "-99", "ISO_A2_EH": "FR"},
+            "geometry": {"type": "MultiPolygon", "coordinates": [[SQUARE]]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"ISO_A2": "-99"},
+            "geometry": {"type": "Polygon", "coordinates": [ISLAND]},
+        },
+    ]
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    index = load_country_index(path)
+
+    assert index.lookup(5.0, 5.0) == "FR"
+    assert index.lookup(1.0, 20.5) is None
+
+
+@pytest.mark.asyncio
+async def test_reverse_geocode_many_looks_up_off_the_event_loop(monkeypatch):
+    threads = set()
+
+    def reverse_geocode(lat, _lng):
+        threads.add(threading.get_ident())
+        return "FR" if lat > 0 else None
+
+    monkeypatch.setattr("core.geo.countries.reverse_geocode", reverse_geocode)
+
+    codes = await reverse_geocode_many([(5.0, 5.0), (-5.0, 5.0)])
+
+    assert codes == ["FR", None]
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
+    assert await reverse_geocode_many([]) == []
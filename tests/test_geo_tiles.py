@@ -0,0 +1,51 @@
+import pytest
+
+from core.geo import TileMarker, decode_tile, encode_tile, tile_bbox
+
+
+def test_tile_bbox_of_zoom_zero_covers_the_mercator_world():
+    min_lng, min_lat, max_lng, max_lat = tile_bbox(0, 0, 0)
+
+    assert (min_lng, max_lng) == (-180.0, 180.0)
+    assert min_lat == pytest.approx(-85.0511, abs=1e-4)
+    assert max_lat == pytest.approx(85.0511, abs=1e-4)
+
+
+def test_tile_bbox_rows_count_from_the_north():
+    _, south, _, north = tile_bbox(1, 0, 0)
+
+    assert south == pytest.approx(0.0)
+    assert north > 0
+
+
+@pytest.mark.parametrize("address", [(1, 2, 0), (3, 0, -1), (23, 0, 0)])
+def test_tile_bbox_rejects_invalid_addresses(address):
+    with pytest.raises(ValueError):
+        tile_bbox(*address)
+
+
+def test_encoded_tile_round_trips_markers_within_quantization_error():
+    z, x, y = 10, 581, 395
+    min_lng, min_lat, max_lng, max_lat = tile_bbox(z, x, y)
+    markers = [
+        TileMarker(id=1, lat=min_lat, lng=min_lng, theme=0, country_code=None),
+        TileMarker(
+            id=70000,
+            lat=(min_lat + max_lat) / 2,
+            lng=(min_lng + max_lng) / 3 * 1.5,
+            theme=3,
+            country_code="GR",
+        ),
+    ]
+
+    body = encode_tile(z, x, y, markers)
+    address, decoded = decode_tile(body)
+
+    assert address == (z, x, y)
+    assert len(body) == 14 + 11 * len(markers)
+    for original, restored in zip(markers, decoded, strict=True):
+        assert restored.id == original.id
+        assert restored.theme == original.theme
+        assert restored.country_code == original.country_code
+        assert restored.lat == pytest.approx(original.lat, abs=(max_lat - min_lat) / 65535)
+        assert restored.lng == pytest.approx(original.lng, abs=(max_lng - min_lng) / 65535)
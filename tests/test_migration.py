@@ -5,6 +5,8 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 from sqlalchemy.exc import OperationalError
 
+from app.controllers.flight import LEADERBOARD_TABLES
+from app.models.table_version import VIEWS_VERSION
 from core.config import Config
 from core.database import migration
 
@@ -95,3 +97,40 @@ async def test_prepare_database_runs_creation_and_migrations(monkeypatch: pytest
 
     ensure.assert_called_once()
     run_migrations.assert_awaited_once()
+
+
+def test_only_view_flushes_skip_the_flights_version_bump():
+    triggers = {
+        table: next(
+            statement
+            for statement in migration.SCHEMA_UPGRADES
+            if f"CREATE TRIGGER {table}_table_version" in statement
+        )
+        for table in migration.VERSIONED_TABLES
+    }
+
+    updated_of = triggers["flights"].split("UPDATE OF ")[1].split(" OR ")[0]
+    columns = set(updated_of.split(", "))
+    assert not columns & {"views", "updated_at"}
+    assert {"status", "credits", "pilot_id", "country_code", "title"} <= columns
+    assert "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON users" in triggers["users"]
+
+
+def test_view_flushes_bump_their_own_version():
+    trigger = next(
+        statement
+        for statement in migration.SCHEMA_UPGRADES
+        if "CREATE TRIGGER flights_views_version" in statement
+    )
+
+    assert "AFTER UPDATE OF views ON flights" in trigger
+    assert f"bump_table_version('{VIEWS_VERSION}')" in trigger
+    assert VIEWS_VERSION in LEADERBOARD_TABLES
+
+
+def test_startup_upgrades_dont_rewrite_rows():
+    assert not [
+        statement
+        for statement in migration.SCHEMA_UPGRADES
+        if statement.lstrip().upper().startswith("UPDATE")
+    ]
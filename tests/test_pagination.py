@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+
+from core.exceptions import BadRequestException
+from core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_sort_key():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+    cursor = encode_cursor(created_at, 42)
+
+    assert decode_cursor(cursor, size=2) == [created_at.isoformat(), 42]
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("a/b+c?", 1)
+
+    assert "=" not in cursor
+    assert "/" not in cursor
+    assert "+" not in cursor
+
+
+@pytest.mark.parametrize("raw", ["not-a-cursor", encode_cursor(1, 2, 3), ""])
+def test_decode_cursor_rejects_malformed_tokens(raw: str):
+    with pytest.raises(BadRequestException):
+        decode_cursor(raw, size=2)
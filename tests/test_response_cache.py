@@ -0,0 +1,99 @@
+import gzip
+
+from app.models.flight import FlightTheme
+from core.cache import ResponseCache, cache_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def never(_changed: object) -> bool:
+    return False
+
+
+def test_cache_key_ignores_order_unset_values_and_enum_types():
+    first = cache_key("flights", theme=FlightTheme.URBAN, tags=["b", "a"], q=None)
+    second = cache_key("flights", tags=["a", "b"], theme="urban")
+
+    assert first == second
+    assert hash(first) == hash(second)
+
+
+def test_get_counts_hits_and_misses():
+    cache = ResponseCache(max_entries=4, ttl=10)
+    cache.set("k", b"[]", depends_on=never)
+
+    assert cache.get("k").body == b"[]"
+    assert cache.get("other") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=4, ttl=10, clock=clock)
+    cache.set("k", b"[]", depends_on=never)
+
+    clock.now = 10
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, ttl=10)
+    cache.set("a", b"a", depends_on=never)
+    cache.set("b", b"b", depends_on=never)
+    cache.get("a")
+    cache.set("c", b"c", depends_on=never)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_drops_only_dependent_entries():
+    cache = ResponseCache(max_entries=4, ttl=10)
+    cache.set("flight:1", b"1", depends_on=lambda changed: changed["id"] == 1)
+    cache.set("flight:2", b"2", depends_on=lambda changed: changed["id"] == 2)
+
+    assert cache.invalidate({"id": 1}) == 1
+    assert cache.get("flight:1") is None
+    assert cache.get("flight:2") is not None
+
+
+def test_render_serves_precompressed_body_when_gzip_is_accepted():
+    cache = ResponseCache(max_entries=4, ttl=10)
+    entry = cache.set("k", b'{"a":1}', depends_on=never, headers={"X-Next-Cursor": "c"})
+
+    compressed = entry.render("gzip, deflate", hit=True)
+    plain = entry.render(None, hit=False)
+
+    assert gzip.decompress(compressed.body) == b'{"a":1}'
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["x-cache"] == "HIT"
+    assert compressed.headers["x-next-cursor"] == "c"
+    assert plain.body == b'{"a":1}'
+    assert "content-encoding" not in plain.headers
+
+
+def test_set_refuses_bodies_read_before_an_invalidation():
+    cache = ResponseCache(max_entries=4, ttl=10)
+    generation = cache.generation
+    # A write commits and invalidates while the body is being read.
+    cache.invalidate({"id": 1})
+
+    entry = cache.set("flight:1", b"old", depends_on=never, generation=generation)
+
+    assert entry.body == b"old"
+    assert cache.get("flight:1") is None
+    assert cache.stats()["stale_sets"] == 1
+
+    cache.set("flight:1", b"new", depends_on=never, generation=cache.generation)
+    assert cache.get("flight:1").body == b"new"
@@ -0,0 +1,54 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.flight import FlightStatus
+from app.schemas.responses.flights import FlightResponse
+from core.exceptions import BadRequestException
+from core.fastapi.dependencies import serialize_sparse, sparse_fields
+
+
+def test_sparse_fields_always_includes_id_and_deduplicates():
+    parse = sparse_fields(FlightResponse)
+
+    assert parse("lat, lng,lat,id") == ["id", "lat", "lng"]
+    assert parse(None) is None
+
+
+def test_sparse_fields_rejects_unknown_fields():
+    parse = sparse_fields(FlightResponse)
+
+    with pytest.raises(BadRequestException):
+        parse("id,password_hash")
+
+
+def test_serialize_sparse_uses_response_model_types():
+    pilot = SimpleNamespace(
+        id=3, username="ace", display_name=None, country_code="GR", email=None
+    )
+    flight = SimpleNamespace(
+        id=1,
+        status=FlightStatus.APPROVED,
+        approved_at=datetime(2024, 3, 1, 10, 0),
+        pilot=pilot,
+    )
+
+    rows = serialize_sparse(
+        FlightResponse, [flight], ["id", "status", "approved_at", "pilot"]
+    )
+
+    assert rows == [
+        {
+            "id": 1,
+            "status": "approved",
+            "approved_at": "2024-03-01T10:00:00",
+            "pilot": {
+                "id": 3,
+                "username": "ace",
+                "display_name": None,
+                "country_code": "GR",
+                "email": None,
+            },
+        }
+    ]
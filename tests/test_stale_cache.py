@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from core.cache import StaleCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    def __init__(self, *values: object) -> None:
+        self.values = list(values)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> object:
+        self.calls += 1
+        await self.release.wait()
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_are_served_without_reloading():
+    cache = StaleCache(max_entries=4, ttl=10, clock=FakeClock())
+    load = Loader([1])
+
+    first = await cache.get("k", load, version={"flights": 1})
+    second = await cache.get("k", load, version={"flights": 2})
+
+    assert first is second
+    assert second.value == [1]
+    assert second.version == {"flights": 1}
+    assert load.calls == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_one_refresh_runs():
+    clock = FakeClock()
+    cache = StaleCache(max_entries=4, ttl=10, clock=clock)
+    load = Loader("old", "new")
+    await cache.get("k", load, version=1)
+    clock.now = 11
+    load.release.clear()
+
+    served = [(await cache.get("k", load, version=2)).value for _ in range(3)]
+    load.release.set()
+    await asyncio.sleep(0)
+
+    assert served == ["old", "old", "old"]
+    assert load.calls == 2
+    refreshed = await cache.get("k", load, version=2)
+    assert (refreshed.value, refreshed.version) == ("new", 2)
+    assert cache.stats()["stale_hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_the_last_good_value():
+    clock = FakeClock()
+    cache = StaleCache(max_entries=4, ttl=10, clock=clock)
+    load = Loader("good", ConnectionError("down"), ConnectionError("down"))
+    await cache.get("k", load)
+    clock.now = 11
+
+    assert (await cache.get("k", load)).value == "good"
+    await asyncio.sleep(0)
+
+    assert (await cache.get("k", load)).value == "good"
+    assert cache.stats()["refresh_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = StaleCache(max_entries=4, ttl=10, clock=FakeClock())
+    load = Loader("value")
+    load.release.clear()
+
+    pending = [asyncio.create_task(cache.get("k", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    load.release.set()
+    entries = await asyncio.gather(*pending)
+
+    assert [entry.value for entry in entries] == ["value"] * 3
+    assert load.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted():
+    cache = StaleCache(max_entries=2, ttl=10, clock=FakeClock())
+    await cache.get("a", Loader(1))
+    await cache.get("b", Loader(2))
+    await cache.get("a", Loader())
+    await cache.get("c", Loader(3))
+
+    load = Loader(4)
+    await cache.get("b", load)
+
+    assert load.calls == 1
+    assert cache.stats()["evictions"] == 2
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from core.cache import WriteBehindCounter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Writer:
+    def __init__(self, *failures: Exception) -> None:
+        self.failures = list(failures)
+        self.batches: list[dict] = []
+
+    async def __call__(self, batch: dict) -> None:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.batches.append(batch)
+
+
+@pytest.mark.asyncio
+async def test_increments_are_written_as_one_batch_per_flush():
+    counter = WriteBehindCounter(interval=60, max_keys=100)
+    write = Writer()
+    counter.start(write)
+
+    for flight_id in (1, 2, 1, 1):
+        counter.add(flight_id)
+    await counter.flush()
+    await counter.flush()
+    await counter.stop()
+
+    assert write.batches == [{1: 3, 2: 1}]
+    assert counter.stats()["written"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_merged_back_and_retried():
+    counter = WriteBehindCounter(interval=60, max_keys=100)
+    write = Writer(ConnectionError("database down"))
+    counter.start(write)
+
+    counter.add(1, 2)
+    with pytest.raises(ConnectionError):
+        await counter.flush()
+    counter.add(1)
+    await counter.stop()
+
+    assert write.batches == [{1: 3}]
+    assert counter.stats()["flush_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_counts_are_flushed_periodically_and_when_full():
+    counter = WriteBehindCounter(interval=0.01, max_keys=2)
+    write = Writer()
+    counter.start(write)
+
+    counter.add(1)
+    counter.add(2)
+    await asyncio.sleep(0)
+    assert write.batches == [{1: 1, 2: 1}]
+
+    counter.add(3)
+    await asyncio.sleep(0.05)
+    assert write.batches[-1] == {3: 1}
+    await counter.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_flushes_back_off_and_overflowing_keys_are_dropped():
+    clock = FakeClock()
+    counter = WriteBehindCounter(interval=60, max_keys=2, capacity=3, clock=clock)
+    write = Writer(ConnectionError("database down"))
+    counter.start(write)
+
+    counter.add(1)
+    counter.add(2)
+    await asyncio.sleep(0)
+    for flight_id in (3, 4, 5, 1):
+        counter.add(flight_id)
+    await asyncio.sleep(0)
+
+    stats = counter.stats()
+    assert stats["flush_failures"] == 1
+    assert stats["dropped"] == 2
+    assert stats["pending"] == 4
+
+    clock.now = 60
+    counter.add(1)
+    await asyncio.sleep(0)
+    assert write.batches == [{1: 3, 2: 1, 3: 1}]
+    await counter.stop()